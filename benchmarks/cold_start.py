@@ -0,0 +1,79 @@
+"""
+Cold start time of the command line entry point.
+
+Every case runs in a fresh interpreter and is timed from process start to exit; the median over `--repeat`
+runs is compared with its target, and the heavy packages the case imported are listed:
+
+    python benchmarks/cold_start.py --repeat 5
+
+Exits with status 1 when a case is over its target, so it can gate CI. Without a terminal the MetaTrader5
+module is replaced by the fake one (see `fake_mt5.py`) before the command's modules are imported.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Packages only the backtest, optimize and plotting paths should load
+HEAVY = ("backtesting", "bokeh", "matplotlib", "scipy", "talib")
+
+PRELUDE = f"""
+import sys
+sys.path[:0] = [{str(ROOT / "src")!r}, {str(ROOT)!r}]
+try:
+    import MetaTrader5
+except ImportError:
+    from fake_mt5 import FakeTerminal, install
+    install(FakeTerminal({{}}))
+"""
+
+# (name, code run in the fresh interpreter, target median seconds or None)
+CASES = [
+    ("cli --help", "import cli\ncli.build_parser().format_help()", 0.15),
+    # Everything `cli.py live` imports before entering the scheduling loop
+    ("live", PRELUDE + "import cli\nimport main", 1.0),
+    ("backtest", PRELUDE + "import cli\nimport backtest.rsi", None),
+]
+
+REPORT = f"\nimport json\nprint(json.dumps(sorted(m for m in {HEAVY!r} if m in sys.modules)))"
+
+
+def measure(code: str, repeat: int) -> tuple[float, list[str]]:
+    """Median wall time of running `code` in a fresh interpreter, and the heavy packages it imported."""
+    times = []
+    heavy = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", f"import sys\nsys.path.insert(0, {str(ROOT / 'src')!r})\n"
+                                                       + code + REPORT],
+                                capture_output=True, text=True, check=True)
+        times.append(time.perf_counter() - started)
+        heavy = json.loads(result.stdout.strip().splitlines()[-1])
+    return statistics.median(times), heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case")
+    args = parser.parse_args()
+
+    baseline, _ = measure("pass", args.repeat)
+    report = {"interpreter": baseline, "cases": []}
+    failed = False
+    for name, code, target in CASES:
+        seconds, heavy = measure(code, args.repeat)
+        over = target is not None and seconds > target
+        failed |= over
+        report["cases"].append({"name": name, "seconds": seconds, "target": target, "over_target": over,
+                                "heavy_imports": heavy})
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Load test of the live RSI loop against the fake MetaTrader5 terminal.
+
+Replays synthetic M1 bars for many symbols at an accelerated clock and runs one scheduler cycle of
+`main.rsi_strategy` per simulated minute, just after the minute closes, as `main()` does with `schedule`:
+
+    python benchmarks/live_load.py --symbols 200 --speed 1000 --minutes 60 --latency 0.0002
+
+Reports decisions per second (strategy evaluations completed per second of cycle time), the cycle time
+distribution, the orders sent and the per-stage latency summary, as JSON.
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT / "src"), str(ROOT)]
+
+import numpy as np  # noqa: E402
+
+from fake_mt5 import FakeTerminal, install  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=100, help="Number of symbols traded")
+    parser.add_argument("--speed", type=float, default=1000, help="Simulated seconds per real second")
+    parser.add_argument("--minutes", type=int, default=30, help="Simulated minutes to replay")
+    parser.add_argument("--workers", type=int, default=8, help="Scheduler threads")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds each terminal call takes")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Probability that a terminal call fails")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="JSON file to write (default: stdout)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="[%(levelname)s]: %(asctime)s - %(message)s")
+    logger.setLevel(logging.INFO)
+    # Late jobs are counted in the report rather than logged one by one
+    logging.getLogger("live.scheduler").setLevel(logging.ERROR)
+
+    symbols = [f"SYM{i:04d}" for i in range(args.symbols)]
+    terminal = FakeTerminal.synthetic(symbols, n_bars=args.minutes + 200, seed=args.seed, speed=None,
+                                      latency=args.latency, failure_rate=args.failure_rate)
+    install(terminal)
+
+    # Imported once the fake terminal serves MetaTrader5
+    import latency
+    import main as live_main
+    from live import MultiSymbolScheduler, StrategyJob
+    from metatrader import MT5Connection
+
+    latency.recorder.sample_rate = 1.0
+    decisions = []
+
+    def strategy(*strategy_args, **kwargs):
+        live_main.rsi_strategy(*strategy_args, **kwargs)
+        decisions.append(1)
+
+    params = {"risk_per_trade": 0.02, "reward_to_risk_ratio": 1, "timeperiod": 10, "lower_bound": 30,
+              "upper_bound": 55}
+    jobs = [StrategyJob(symbol, live_main.mt5.TIMEFRAME_M1, params) for symbol in symbols]
+    scheduler = MultiSymbolScheduler(strategy, jobs, max_workers=args.workers,
+                                     cycle_deadline=55 / args.speed)
+
+    # Leave enough closed bars to warm up the RSI, then start the clock one second after a minute closes
+    terminal.advance(60 * (live_main.RSI_WARMUP_BARS + 1) + 1)
+    terminal.set_speed(args.speed)
+
+    cycle_times = []
+    late_jobs = 0
+    missed_minutes = 0
+    with MT5Connection(0, "", "") as connection:
+        next_minute = terminal.now()
+        for _ in range(args.minutes):
+            started = time.monotonic()
+            late_jobs += scheduler.run_cycle(connection)
+            cycle_times.append(time.monotonic() - started)
+
+            # Wait for the next ":01"; minutes that passed during the cycle are skipped like `schedule` does
+            next_minute += 60
+            while terminal.now() >= next_minute + 60:
+                next_minute += 60
+                missed_minutes += 1
+            time.sleep(max(next_minute - terminal.now(), 0) / args.speed)
+    scheduler.shutdown()
+
+    cycle_times = np.array(cycle_times)
+    report = {
+        "symbols": args.symbols,
+        "speed": args.speed,
+        "minutes": args.minutes,
+        "workers": args.workers,
+        "latency": args.latency,
+        "failure_rate": args.failure_rate,
+        "decisions": len(decisions),
+        "decisions_per_second": len(decisions) / cycle_times.sum(),
+        "cycle_p50": float(np.percentile(cycle_times, 50)),
+        "cycle_max": float(cycle_times.max()),
+        "late_jobs": late_jobs,
+        "missed_minutes": missed_minutes,
+        "orders": len(terminal.orders),
+        "terminal_calls": terminal.calls,
+        "stages": _per_stage(latency.recorder.summary()),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+
+
+def _per_stage(summary: dict) -> dict:
+    """Merge the per-symbol latency stats into one entry per stage (count-weighted p50, worst p99 and max)."""
+    merged = {}
+    for (stage, _), stats in summary.items():
+        entry = merged.setdefault(stage, {"count": 0, "p50": 0.0, "p99": 0.0, "max": 0.0})
+        entry["p50"] = (entry["p50"] * entry["count"] + stats["p50"] * stats["count"]) / (
+                entry["count"] + stats["count"])
+        entry["count"] += stats["count"]
+        entry["p99"] = max(entry["p99"], stats["p99"])
+        entry["max"] = max(entry["max"], stats["max"])
+    return merged
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Offline benchmark suite for the backtest engines, strategies and data processing.
+
+Every benchmark runs on seeded synthetic bars (see `synthetic.py`), so results are reproducible without a
+terminal or data files. For each benchmark and size the best wall time over `--repeat` runs is reported
+together with the throughput and the peak memory traced by `tracemalloc` in a separate run:
+
+    python benchmarks/run.py --sizes 1e4 1e5 1e6 1e7 --output benchmarks/results/<commit>.json
+
+Slow engines are capped at a maximum number of bars; larger sizes are recorded as skipped unless
+`--no-limits` is given.
+"""
+import argparse
+import contextlib
+import gc
+import importlib.util
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT / "src"), str(ROOT)]
+
+# backtrade_rsi_1 reports its progress through tqdm
+os.environ.setdefault("TQDM_DISABLE", "1")
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from synthetic import synthetic_frame, synthetic_rates, synthetic_ticks  # noqa: E402
+
+try:
+    import MetaTrader5  # noqa: E402, F401
+except ImportError:
+    # Without a terminal (e.g. on Linux), the modules importing MetaTrader5 run against the fake one
+    from fake_mt5 import FakeTerminal, install  # noqa: E402
+
+    install(FakeTerminal({}))
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    # Called with the number of bars; returns the function to time, so data preparation is not timed
+    setup: Callable[[int], Callable[[], object]]
+    max_bars: int | None = None
+
+
+def _backtrade():
+    """Import `backtrade.py`, whose directory name is not a valid package name."""
+    spec = importlib.util.spec_from_file_location("backtrade", ROOT / "src" / "mtang-backtrade" / "backtrade.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# Bars volatile enough for the 10% SL/TP of backtrade_rsi_1 and the absolute prominence of SupportResistance
+WIDE_VOLATILITY = 2e-3
+
+
+def _lowercase_frame(n_bars: int) -> pd.DataFrame:
+    rates = synthetic_rates(n_bars)
+    return pd.DataFrame({name: rates[name] for name in ("time", "open", "high", "low", "close")})
+
+
+def setup_backtrade_rsi_1(n_bars):
+    rates = synthetic_frame(n_bars, volatility=WIDE_VOLATILITY)
+    backtrade = _backtrade()
+    return lambda: backtrade.backtrade_rsi_1(rates, 14, 30, 70)
+
+
+def setup_backtrade_rsi_2(n_bars):
+    rates = synthetic_frame(n_bars)
+    backtrade = _backtrade()
+    return lambda: backtrade.backtrade_rsi_2(rates, 14, 30, 70)
+
+
+def setup_sweep_rsi_oscillator(n_bars):
+    from backtest.sweep import sweep_rsi_oscillator
+
+    rates = synthetic_frame(n_bars)
+    return lambda: sweep_rsi_oscillator(rates, upper_bound=range(50, 90, 10), lower_bound=range(10, 45, 10),
+                                        rsi_window=range(10, 20, 4))
+
+
+def setup_portfolio_rsi(n_bars):
+    from backtest.portfolio import Universe, backtest_portfolio, rsi_signals
+
+    # A 40-symbol universe of `n_bars` bars each
+    frames = {f"SYM{seed}": synthetic_frame(n_bars, seed=seed) for seed in range(40)}
+
+    def run():
+        universe = Universe.from_frames(frames)
+        return backtest_portfolio(universe, *rsi_signals(universe, 10, 25, 55))
+
+    return run
+
+
+def setup_support_resistance(n_bars):
+    from ta import calculate_support_resistance
+
+    rates = _lowercase_frame(n_bars)
+    return lambda: calculate_support_resistance(rates)
+
+
+def setup_pivot_points(n_bars):
+    from ta import calculate_pivot_points
+
+    rates = _lowercase_frame(n_bars)
+    return lambda: calculate_pivot_points(rates)
+
+
+def setup_check_rsi_signal(n_bars):
+    from ta import check_rsi_signal
+
+    rates = synthetic_frame(n_bars)
+    return lambda: check_rsi_signal(rates)
+
+
+def setup_process_rates(n_bars):
+    from metatrader import MT5Connection
+
+    rates = synthetic_rates(n_bars)
+    return lambda: MT5Connection._process_rates(pd.DataFrame(rates))
+
+
+def setup_process_rates_compact(n_bars):
+    from metatrader import MT5Connection
+
+    rates = synthetic_rates(n_bars)
+    return lambda: MT5Connection._process_rates(rates, compact=True)
+
+
+def setup_tick_backtest(n_ticks):
+    from backtest.tick_engine import M1RsiCrossSignal, run_tick_backtest
+
+    ticks = synthetic_ticks(n_ticks)
+    return lambda: run_tick_backtest(ticks, M1RsiCrossSignal(14, 30, 70), sl_distance=0.0005, tp_distance=0.0005)
+
+
+def _setup_backtest(strategy_name: str, cash: float, **data_kwargs):
+    def setup(n_bars):
+        from backtesting import Backtest
+
+        import backtest.strategies
+        from backtest.indicator_cache import indicator_cache
+
+        rates = synthetic_frame(n_bars, **data_kwargs)
+        strategy = getattr(backtest.strategies, strategy_name)
+
+        def run():
+            # Indicators must be computed by every run rather than served from the cache
+            indicator_cache.clear()
+            return Backtest(rates, strategy, cash=cash).run()
+
+        return run
+
+    return setup
+
+
+BENCHMARKS = [
+    Benchmark("backtrade_rsi_1", setup_backtrade_rsi_1, max_bars=100_000),
+    Benchmark("backtrade_rsi_2", setup_backtrade_rsi_2),
+    Benchmark("sweep_rsi_oscillator", setup_sweep_rsi_oscillator, max_bars=1_000_000),
+    Benchmark("backtest_portfolio[40 symbols]", setup_portfolio_rsi, max_bars=100_000),
+    Benchmark("ta.calculate_support_resistance", setup_support_resistance),
+    Benchmark("ta.calculate_pivot_points", setup_pivot_points),
+    Benchmark("ta.check_rsi_signal", setup_check_rsi_signal),
+    Benchmark("MT5Connection._process_rates", setup_process_rates),
+    Benchmark("MT5Connection._process_rates[compact]", setup_process_rates_compact),
+    # Sized in ticks rather than bars
+    Benchmark("run_tick_backtest[M1RsiCrossSignal]", setup_tick_backtest),
+    Benchmark("Backtest.run[RsiOscillator]", _setup_backtest("RsiOscillator", 10_000), max_bars=1_000_000),
+    Benchmark("Backtest.run[SupportResistance]",
+              _setup_backtest("SupportResistance", 100_000, volatility=WIDE_VOLATILITY), max_bars=1_000_000),
+    Benchmark("Backtest.run[TrendFollowingEMAADX]", _setup_backtest("TrendFollowingEMAADX", 100_000),
+              max_bars=1_000_000),
+]
+
+
+def measure(benchmark: Benchmark, n_bars: int, repeat: int, trace_memory: bool) -> dict:
+    """Time one benchmark at one size; errors (e.g. a missing optional dependency) are recorded, not raised."""
+    result = {"name": benchmark.name, "bars": n_bars}
+    # Engines printing their statistics must not corrupt a report written to stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        return _measure(benchmark, n_bars, repeat, trace_memory, result)
+
+
+def _measure(benchmark: Benchmark, n_bars: int, repeat: int, trace_memory: bool, result: dict) -> dict:
+    try:
+        func = benchmark.setup(n_bars)
+        timings = []
+        for _ in range(repeat):
+            gc.collect()
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+
+        result["seconds"] = min(timings)
+        result["bars_per_second"] = n_bars / result["seconds"]
+        if trace_memory:
+            gc.collect()
+            tracemalloc.start()
+            func()
+            result["peak_memory_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            tracemalloc.stop()
+    except Exception as e:
+        logger.exception(f"{benchmark.name} failed on {n_bars} bars")
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=float, default=[1e4, 1e5, 1e6, 1e7],
+                        help="Numbers of bars to benchmark")
+    parser.add_argument("--only", nargs="+", help="Run the benchmarks whose name contains one of these")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark and size")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the peak memory run")
+    parser.add_argument("--no-limits", action="store_true", help="Ignore the maximum sizes of slow benchmarks")
+    parser.add_argument("--output", type=Path, help="JSON file to write (default: stdout)")
+    args = parser.parse_args()
+
+    # Keep the per-trade logs and warnings of the strategies and backtesting.py out of the timings
+    logging.basicConfig(level=logging.WARNING, format="[%(levelname)s]: %(asctime)s - %(message)s")
+    logger.setLevel(logging.INFO)
+    warnings.simplefilter("ignore")
+
+    results = []
+    for benchmark in BENCHMARKS:
+        if args.only and not any(pattern in benchmark.name for pattern in args.only):
+            continue
+        for n_bars in map(int, args.sizes):
+            if benchmark.max_bars is not None and n_bars > benchmark.max_bars and not args.no_limits:
+                results.append({"name": benchmark.name, "bars": n_bars, "skipped": True})
+                continue
+            result = measure(benchmark, n_bars, args.repeat, not args.no_memory)
+            logger.info(f"{benchmark.name} [{n_bars} bars]: "
+                        + (result["error"] if "error" in result else f"{result['seconds']:.4f}s"))
+            results.append(result)
+
+    report = {
+        "commit": _commit(),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,67 +4,90 @@ from datetime import datetime
 from pathlib import Path
 
 import MetaTrader5 as mt5
-import matplotlib
 from backtesting import Backtest
 from dotenv import load_dotenv
-from pandas.plotting import register_matplotlib_converters
 
 from backtest.strategies import (
     TrendFollowingEMAADX
 )
-from metatrader import MT5Connection
+from backtest.indicator_cache import shared_indicators
+from backtest.monte_carlo import log_monte_carlo
+from backtest.walk_forward import walk_forward as run_walk_forward
+from metatrader import BarStore, MT5Connection
 
 # Load env vars
 load_dotenv()
 
-# Register matplotlib converters
-register_matplotlib_converters()
-matplotlib.use("TkAgg")
-
 # Configure logging
 level = logging.INFO
 fmt = "[%(levelname)s]: %(asctime)s - %(message)s"
 logging.basicConfig(level=level, format=fmt)
 logger = logging.getLogger(__name__)
 
+# Parameter grid of the optimizations
+PARAM_GRID = dict(min_adx=range(20, 35, 5), ema_touch_tol=[0.0025, 0.005, 0.01, 0.02],
+                  reward_risk_ratio=[1.5, 2.0, 3.0])
+
+# Walk-forward train / test windows: about six months of H4 bars, then two
+WALK_FORWARD_BARS = (780, 260)
 
-def main() -> None:
+
+def main(optimize: bool = False, plot: bool = False, walk_forward: bool = False, anchored: bool = False,
+         compact: bool = False) -> None:
+    """
+    Backtest TrendFollowingEMAADX on USDCAD H4.
+    With `optimize`, the ADX and entry parameters are optimized first; with `plot`, the backtest chart is
+    written under "backtests/". With `walk_forward`, they are instead optimized on rolling (or `anchored`)
+    training windows and the out-of-sample results of the windows that follow them are logged. With `compact`,
+    the bars are loaded as float32 prices and int32 volume, about half the memory per bar.
+    """
     symbol = "USDCAD"
     timeframe = mt5.TIMEFRAME_H4
 
-    with (MT5Connection(int(os.getenv("ACCOUNT_ID")), os.getenv("PASSWORD"), os.getenv("MT5_SERVER")) as mt5_conn):
-        rates = mt5_conn.fetch_rates_range(symbol=symbol,
-                                           timeframe=timeframe,
-                                           date_from=datetime(2024, 6, 1),
-                                           date_to=datetime.now())
+    cache = BarStore(Path(__file__).parent.parent.parent / "resources" / "bars")
+    with (MT5Connection(int(os.getenv("ACCOUNT_ID")), os.getenv("PASSWORD"), os.getenv("MT5_SERVER"),
+                        cache=cache) as mt5_conn):
+        # H4 bars are derived from the cached M1 bars, shared with the other runners and timeframes
+        rates = mt5_conn.fetch_resampled_range(symbol=symbol,
+                                               timeframe=timeframe,
+                                               date_from=datetime(2024, 6, 1),
+                                               date_to=datetime.now(),
+                                               compact=compact)
 
         # print(rates.shape)
         # print(rates.head())
         try:
+            if walk_forward:
+                result = run_walk_forward(rates, TrendFollowingEMAADX, PARAM_GRID, *WALK_FORWARD_BARS,
+                                          anchored=anchored, maximize="Return [%]", cash=100_000)
+                logger.info(f"WALK-FORWARD\n=============================================\n{result.folds}")
+                logger.info(f"OUT-OF-SAMPLE\n=============================================\n{result.summary}")
+                return
+
             bt = Backtest(rates, TrendFollowingEMAADX, cash=100_000)
-            stats = bt.run()
-            # stats = bt.optimize(
-            #     upper_bound=range(50, 90, 5),
-            #     lower_bound=range(10, 45, 5),
-            #     rsi_window=range(10, 20, 2),
-            #     maximize="Return [%]"
-            # )
+            if optimize:
+                # Indicators computed by one pool worker are shared with the others
+                with shared_indicators():
+                    stats = bt.optimize(**PARAM_GRID, maximize="Return [%]")
+            else:
+                stats = bt.run()
             logger.info(f"STATS\n=============================================\n{stats}")
+            # How much of the result the particular sequence of trades explains
+            log_monte_carlo(bt, stats)
 
-            # lb = stats["_strategy"].lower_bound
-            # ub = stats["_strategy"].upper_bound
-            # window = stats["_strategy"].rsi_window
-            #
-            # logger.info(f"LB: {lb}, UB: {ub}, WINDOW: {window}")
+            strategy = stats["_strategy"]
+            logger.info(f"MIN ADX: {strategy.min_adx}, EMA TOUCH TOL: {strategy.ema_touch_tol}, "
+                        f"RR: {strategy.reward_risk_ratio}")
 
             # Plot backtest stats
-            plot_subpath = Path("backtests", "EMAADX", f"plot")
-            plot_path: Path = Path(__file__).parent.parent.parent / plot_subpath
-            plot_path.mkdir(parents=True, exist_ok=True)
-            bt.plot(filename=str(plot_path))
+            if plot:
+                plot_subpath = Path("backtests", "EMAADX", f"plot")
+                plot_path: Path = Path(__file__).parent.parent.parent / plot_subpath
+                plot_path.mkdir(parents=True, exist_ok=True)
+                bt.plot(filename=str(plot_path))
         except Exception:
             logger.exception("Exception occurred while backtesting")
 
 
 if __name__ == "__main__":
-    main()
+    main(plot=True)
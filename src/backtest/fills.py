@@ -0,0 +1,157 @@
+"""
+Bulk first-passage resolution of stop-loss / take-profit levels.
+
+Instead of walking bar by bar over the list of open orders, every trade is resolved at once: for each
+entry we look for the first bar after it whose low/high reaches the stop-loss or the take-profit.
+
+The search is a two-level index over the price arrays. Bars are grouped into fixed-size blocks; a
+trade is first checked against the rest of its own block, then a sparse table of block extrema is
+used to jump (binary lifting) straight to the first block that can contain a hit, and finally that
+single block is scanned. All three steps run as NumPy operations over every trade at once, so the
+cost is O(n + m * (block_size + log(n / block_size))) for n bars and m trades.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+# Trade outcomes
+WIN = 1
+LOSS = -1
+OPEN = 0
+
+# Number of (trade, bar) cells gathered at once while scanning blocks; 8 MB of float64 stays in cache even
+# when the price arrays are many times larger
+_MAX_CELLS = 1 << 20
+
+
+@dataclass(frozen=True)
+class Exits:
+    """Exit of every trade passed to `resolve_exits`, aligned with its inputs.
+
+    Trades that never reach a level keep `exit_idx == -1`, a NaN `exit_price` and `outcome == OPEN`.
+    """
+    exit_idx: np.ndarray
+    exit_price: np.ndarray
+    outcome: np.ndarray
+
+
+def _first_at_or_below(values: np.ndarray, start: np.ndarray, thresholds: np.ndarray, block_size: int) -> np.ndarray:
+    """Return, for each query, the first index `j >= start` with `values[j] <= threshold` (or `len(values)`)."""
+    n = len(values)
+    m = len(start)
+    result = np.full(m, n, dtype=np.int64)
+    if n == 0 or m == 0:
+        return result
+
+    n_blocks = -(-n // block_size)
+    padded = np.full(n_blocks * block_size, np.inf)
+    padded[:n] = values
+    blocks = padded.reshape(n_blocks, block_size)
+
+    # Sparse table of block minima: table[k][b] = min over blocks b .. b + 2**k - 1
+    table = [blocks.min(axis=1)]
+    while (1 << len(table)) <= n_blocks:
+        step = 1 << (len(table) - 1)
+        prev = table[-1]
+        table.append(np.minimum(prev[:-step], prev[step:]))
+
+    offsets = np.arange(block_size)
+    chunk = max(1, _MAX_CELLS // block_size)
+
+    for lo in range(0, m, chunk):
+        hi = min(lo + chunk, m)
+        s = start[lo:hi]
+        thr = thresholds[lo:hi]
+        out = result[lo:hi]
+
+        valid = s < n
+        block = np.where(valid, s // block_size, 0)
+
+        # Step 1: remainder of the block the search starts in
+        hits = (blocks[block] <= thr[:, None]) & (offsets >= (s % block_size)[:, None]) & valid[:, None]
+        found = hits.any(axis=1)
+        out[found] = block[found] * block_size + hits[found].argmax(axis=1)
+
+        # Step 2: jump over every following block whose minimum stays above the threshold
+        pending = np.flatnonzero(valid & ~found)
+        if len(pending) == 0:
+            continue
+        pos = block[pending] + 1
+        p_thr = thr[pending]
+        for k in range(len(table) - 1, -1, -1):
+            span = 1 << k
+            can_jump = pos + span <= n_blocks
+            idx = np.flatnonzero(can_jump)
+            skip = table[k][pos[idx]] > p_thr[idx]
+            pos[idx[skip]] += span
+
+        # Step 3: scan the first block that holds a hit
+        inside = pos < n_blocks
+        pending = pending[inside]
+        pos = pos[inside]
+        hits = blocks[pos] <= thr[pending][:, None]
+        out[pending] = pos * block_size + hits.argmax(axis=1)
+
+    return result
+
+
+def resolve_exits(high: np.ndarray, low: np.ndarray, entry_idx: np.ndarray, is_long: np.ndarray, sl: np.ndarray,
+                  tp: np.ndarray, open_: np.ndarray | None = None, block_size: int = 256) -> Exits:
+    """Find the first bar at which each trade hits its stop-loss or take-profit.
+
+    The search for a trade starts on the bar after `entry_idx`. Longs are stopped out when the low reaches
+    `sl` and take profit when the high reaches `tp`; shorts the other way around. When both levels are
+    touched within the same bar the stop-loss is assumed to have been hit first.
+
+    Pass the close array as both `high` and `low` to resolve on closing prices only.
+
+    Args:
+        high (np.ndarray): Bar highs.
+        low (np.ndarray): Bar lows.
+        entry_idx (np.ndarray): Bar index at which each trade was opened.
+        is_long (np.ndarray): True for long trades, False for short trades.
+        sl (np.ndarray): Stop-loss price of each trade.
+        tp (np.ndarray): Take-profit price of each trade.
+        open_ (np.ndarray, optional): Bar opens. When given, a level gapped through at the open is
+            filled at the open price instead of the level.
+        block_size (int): Number of bars per search block.
+
+    Returns:
+        Exits: Exit bar index, exit price and outcome of every trade.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    entry_idx = np.asarray(entry_idx, dtype=np.int64)
+    is_long = np.asarray(is_long, dtype=bool)
+    sl = np.asarray(sl, dtype=np.float64)
+    tp = np.asarray(tp, dtype=np.float64)
+
+    n = len(high)
+    start = entry_idx + 1
+
+    # Lows reaching a level from above: long SL / short TP
+    low_thr = np.where(is_long, sl, tp)
+    low_hit = _first_at_or_below(low, start, low_thr, block_size)
+    # Highs reaching a level from below: long TP / short SL, searched as -high <= -level
+    high_thr = np.where(is_long, tp, sl)
+    high_hit = _first_at_or_below(-high, start, -high_thr, block_size)
+
+    sl_hit = np.where(is_long, low_hit, high_hit)
+    tp_hit = np.where(is_long, high_hit, low_hit)
+
+    stopped = (sl_hit <= tp_hit) & (sl_hit < n)
+    profited = ~stopped & (tp_hit < n)
+
+    exit_idx = np.where(stopped, sl_hit, np.where(profited, tp_hit, -1))
+    exit_price = np.where(stopped, sl, np.where(profited, tp, np.nan))
+    outcome = np.where(stopped, LOSS, np.where(profited, WIN, OPEN)).astype(np.int8)
+
+    if open_ is not None:
+        closed = exit_idx >= 0
+        bar_open = np.where(closed, np.asarray(open_, dtype=np.float64)[np.maximum(exit_idx, 0)], np.nan)
+        # Levels below the price (long SL / short TP) fill at the open if it gapped under them, and vice versa
+        below = np.where(is_long, stopped, profited)
+        exit_price = np.where(closed, np.where(below, np.fmin(bar_open, exit_price), np.fmax(bar_open, exit_price)),
+                              exit_price)
+
+    return Exits(exit_idx=exit_idx, exit_price=exit_price, outcome=outcome)
@@ -0,0 +1,221 @@
+"""
+Memoization of indicator computations across backtest runs.
+
+`Backtest.optimize` calls `Strategy.init()` once per parameter combination, so every indicator is
+recomputed even when only unrelated parameters changed. Wrapping the indicator function with
+`cached` makes identical calls (same function, same arguments, same input data) compute once:
+
+    self.rsi = self.I(cached(talib.RSI), self.data.Close, self.rsi_window)
+
+Results live in a bounded in-process LRU. With `shared=True` they are also published to named shared
+memory segments, so the other workers of an optimization pool attach to a result instead of
+recomputing it. Segment names are derived from the call key and a namespace inherited by child
+processes through the environment; every process that publishes a segment records its name in the
+namespace's registry file, from which `clear()` removes them. The runners turn sharing on around their
+optimizations:
+
+    with shared_indicators():
+        stats = bt.optimize(...)
+"""
+import functools
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import count
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import Callable, Iterator
+
+import numpy as np
+import pandas as pd
+
+# Environment variable holding the shared memory namespace, inherited by pool workers
+NAMESPACE_ENV = "MTANG_INDICATOR_CACHE_NS"
+
+# Environment variable set to "1" while the default cache is shared, for workers that import it afresh (spawn)
+SHARED_ENV = "MTANG_INDICATOR_CACHE_SHARED"
+
+# Shared segment layout: ready flag (1 byte), metadata length (4 bytes), metadata, data at _DATA_OFFSET
+_DATA_OFFSET = 256
+
+
+def _open_segment(**kwargs) -> shared_memory.SharedMemory:
+    shm = shared_memory.SharedMemory(**kwargs)
+    # Segments are removed by IndicatorCache.clear(), not by the resource tracker of whichever process touched them
+    if os.name == "posix":
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+def _fingerprint(value) -> tuple:
+    """Hashable key for an indicator argument; array contents are reduced to their CRC32."""
+    if isinstance(value, pd.Series):
+        value = value.to_numpy()
+    if isinstance(value, np.ndarray):
+        data = np.ascontiguousarray(value)
+        return "array", data.dtype.str, data.shape, zlib.crc32(data)
+    return "value", repr(value)
+
+
+class IndicatorCache:
+    """Bounded LRU of indicator results, optionally shared with other processes through shared memory."""
+
+    def __init__(self, maxsize: int = 128, shared: bool = False):
+        self.maxsize = maxsize
+        self.shared = shared
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (result, shared memory handle or None)
+        self._lock = threading.Lock()
+        self._namespace = os.environ.setdefault(NAMESPACE_ENV, f"{os.getpid():x}")
+
+    def __call__(self, func: Callable) -> Callable:
+        """Return a memoized version of `func`, keeping its name for `Strategy.I` labels."""
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__module__, func.__qualname__, tuple(_fingerprint(a) for a in args),
+                   tuple(sorted((k, _fingerprint(v)) for k, v in kwargs.items())))
+            return self._get(key, func, args, kwargs)
+
+        return wrapper
+
+    def _get(self, key: tuple, func: Callable, args: tuple, kwargs: dict) -> np.ndarray:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return np.array(self._entries[key][0])
+
+        result, shm = None, None
+        name = self._segment_name(key) if self.shared else None
+        if name is not None:
+            result, shm = self._attach(name)
+
+        attached = result is not None
+        if not attached:
+            result = np.asarray(func(*args, **kwargs))
+            if name is not None and result.dtype != object:
+                shm = self._publish(name, result)
+
+        with self._lock:
+            if attached:
+                self.hits += 1
+            else:
+                self.misses += 1
+            # Another thread may have stored the same key meanwhile
+            if key in self._entries:
+                self._close(key, self._entries.pop(key))
+            self._entries[key] = (result, shm)
+            while len(self._entries) > self.maxsize:
+                self._close(*self._entries.popitem(last=False))
+            return np.array(result)
+
+    @staticmethod
+    def _close(key: tuple, entry: tuple):
+        shm = entry[1]
+        # Views on the segment must be released before it can be closed
+        del entry
+        if shm is not None:
+            shm.close()
+
+    def _segment_name(self, key: tuple) -> str:
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=8).hexdigest()
+        return f"mt{self._namespace}_{digest}"
+
+    @staticmethod
+    def _attach(name: str) -> tuple[np.ndarray | None, shared_memory.SharedMemory | None]:
+        try:
+            shm = _open_segment(name=name)
+        except FileNotFoundError:
+            return None, None
+
+        # Another process may still be writing the result; compute locally rather than wait
+        if shm.buf[0] != 1:
+            shm.close()
+            return None, None
+        meta_length = int.from_bytes(shm.buf[1:5], "little")
+        meta = json.loads(bytes(shm.buf[5:5 + meta_length]))
+        result = np.ndarray(tuple(meta["shape"]), dtype=np.dtype(meta["dtype"]), buffer=shm.buf, offset=_DATA_OFFSET)
+        result.setflags(write=False)
+        return result, shm
+
+    def _registry_path(self) -> Path:
+        return Path(tempfile.gettempdir()) / f"mt{self._namespace}.segments"
+
+    def _publish(self, name: str, result: np.ndarray) -> shared_memory.SharedMemory | None:
+        meta = json.dumps({"dtype": result.dtype.str, "shape": result.shape}).encode()
+        try:
+            shm = _open_segment(name=name, create=True, size=_DATA_OFFSET + max(result.nbytes, 1))
+        except FileExistsError:
+            return None
+        # Appends of one short line do not interleave between the pool's processes
+        with open(self._registry_path(), "a") as registry:
+            registry.write(f"{name}\n")
+
+        shm.buf[1:5] = len(meta).to_bytes(4, "little")
+        shm.buf[5:5 + len(meta)] = meta
+        np.ndarray(result.shape, dtype=result.dtype, buffer=shm.buf, offset=_DATA_OFFSET)[...] = result
+        shm.buf[0] = 1
+        return shm
+
+    def clear(self):
+        """Drop every cached result and remove the shared segments published in this namespace."""
+        with self._lock:
+            while self._entries:
+                self._close(*self._entries.popitem())
+
+        # Segments are not tracked by the resource tracker, and POSIX ones outlive their creators until unlinked
+        registry_path = self._registry_path()
+        if self.shared and registry_path.exists():
+            for name in set(registry_path.read_text().split()):
+                try:
+                    shm = shared_memory.SharedMemory(name=name)
+                except FileNotFoundError:
+                    continue
+                shm.close()
+                shm.unlink()
+            registry_path.unlink(missing_ok=True)
+            logging.info(f"Cleared shared indicator cache {self._namespace}")
+
+
+# Default cache used by the strategies
+indicator_cache = IndicatorCache(shared=os.environ.get(SHARED_ENV) == "1")
+
+# Distinguishes the namespaces of successive shared blocks of one process
+_shared_runs = count()
+
+
+@contextmanager
+def shared_indicators(cache: IndicatorCache | None = None) -> Iterator[IndicatorCache]:
+    """Share the results of `cache` (the default one) between the processes of the optimizations in the block.
+
+    The block gets a namespace of its own, which forked pool workers inherit with the cache and spawned ones
+    through the environment. Its shared segments are removed when the block exits.
+    """
+    cache = cache or indicator_cache
+    previous = cache.shared, cache._namespace, os.environ.get(NAMESPACE_ENV), os.environ.get(SHARED_ENV)
+    namespace = f"{os.getpid():x}r{next(_shared_runs)}"
+    cache.shared, cache._namespace = True, namespace
+    os.environ[NAMESPACE_ENV], os.environ[SHARED_ENV] = namespace, "1"
+    try:
+        yield cache
+    finally:
+        cache.clear()
+        cache.shared, cache._namespace = previous[:2]
+        for name, value in ((NAMESPACE_ENV, previous[2]), (SHARED_ENV, previous[3])):
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def cached(func: Callable) -> Callable:
+    """Memoize `func` in the default indicator cache."""
+    return indicator_cache(func)
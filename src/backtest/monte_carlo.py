@@ -0,0 +1,180 @@
+"""
+Monte Carlo robustness analysis of a backtest's trades.
+
+The trades of a run (`stats["_trades"]`, or `PortfolioResult.trades`) are reduced to the return each one made
+on the equity it was opened with. Thousands of alternative trade sequences are then drawn from them and
+replayed as equity curves of closed trades, so their drawdowns ignore the excursions of open positions:
+
+- "bootstrap" draws every trade with replacement, so both the final return and the drawdown vary; its
+  spread shows how much of the result a handful of lucky trades explain.
+- "permutation" shuffles the order of the same trades: the final return is unchanged and the drawdown
+  distribution shows how much worse the path could have been.
+
+Every batch of resamples is a (simulations x trades) matrix handled by a few NumPy reductions. Batches are
+independent and seeded from one `SeedSequence`, so they are spread over a process pool and the result only
+depends on `seed`, not on the number of workers.
+"""
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+METHODS = ("bootstrap", "permutation")
+
+# Equity paths computed at once by a worker: (simulations x trades) cells
+_MAX_CELLS = 1 << 20
+
+
+@dataclass(frozen=True)
+class MonteCarloResult:
+    # Final return of every simulation, in percent
+    returns: np.ndarray
+    # Maximum drawdown of the closed-trade equity of every simulation, in percent (negative)
+    drawdowns: np.ndarray
+    # Percentiles, confidence intervals and the statistics of the original trade sequence
+    summary: pd.Series
+
+
+def trade_returns(trades: pd.DataFrame, cash: float) -> np.ndarray:
+    """Return of every trade on the equity before it, in exit order.
+
+    Args:
+        trades (pd.DataFrame): Trades with `PnL` and `ExitTime` columns, as in `stats["_trades"]`.
+        cash (float): Initial cash of the run.
+
+    Returns:
+        np.ndarray: `PnL / equity before the trade` of every trade.
+    """
+    pnl = trades.sort_values("ExitTime", kind="stable")["PnL"].to_numpy(dtype=np.float64)
+    equity_before = cash + np.concatenate(([0.0], np.cumsum(pnl)[:-1]))
+    return pnl / equity_before
+
+
+def _final_and_drawdown(log_returns: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Final return and maximum drawdown (fractions) of the equity paths of a (paths x trades) matrix of
+    log returns."""
+    # Log space turns the cumulative product of thousands of factors into a sum
+    log_equity = np.cumsum(log_returns, axis=1)
+    underwater = np.maximum.accumulate(log_equity, axis=1)
+    np.maximum(underwater, 0.0, out=underwater)
+    np.subtract(log_equity, underwater, out=underwater)
+    return np.expm1(log_equity[:, -1]), np.expm1(underwater.min(axis=1))
+
+
+def _paths(log_returns: np.ndarray, method: str, n_simulations: int, seed: np.random.SeedSequence
+           ) -> tuple[np.ndarray, np.ndarray]:
+    """Final return and maximum drawdown (fractions) of `n_simulations` resampled equity paths."""
+    rng = np.random.default_rng(seed)
+    n_trades = len(log_returns)
+    chunk = max(1, _MAX_CELLS // max(n_trades, 1))
+    finals = np.empty(n_simulations)
+    drawdowns = np.empty(n_simulations)
+    for lo in range(0, n_simulations, chunk):
+        hi = min(lo + chunk, n_simulations)
+        if method == "bootstrap":
+            sample = log_returns[rng.integers(0, n_trades, (hi - lo, n_trades))]
+        else:
+            sample = rng.permuted(np.broadcast_to(log_returns, (hi - lo, n_trades)), axis=1)
+        finals[lo:hi], drawdowns[lo:hi] = _final_and_drawdown(sample)
+    return finals, drawdowns
+
+
+def _run_batch(log_returns: np.ndarray, method: str, batch: tuple[int, np.random.SeedSequence]):
+    n_simulations, seed = batch
+    return _paths(log_returns, method, n_simulations, seed)
+
+
+def monte_carlo(trades: pd.DataFrame,
+                cash: float = 10_000,
+                method: str = "bootstrap",
+                n_simulations: int = 10_000,
+                confidence: float = 0.95,
+                seed: int = 0,
+                batch_size: int = 2_000,
+                max_workers: int | None = None) -> MonteCarloResult:
+    """Resample the trades of a run and report the distribution of its return and drawdown.
+
+    Args:
+        trades (pd.DataFrame): Trades of the run (`stats["_trades"]`).
+        cash (float): Initial cash of the run.
+        method (str): "bootstrap" (with replacement) or "permutation" (reordering).
+        n_simulations (int): Number of resampled trade sequences.
+        confidence (float): Level of the reported confidence intervals.
+        seed (int): Random seed; the result does not depend on the number of workers.
+        batch_size (int): Simulations per pool task.
+        max_workers (int, optional): Worker processes; defaults to the number of CPUs, 1 runs in-process.
+
+    Returns:
+        MonteCarloResult: Final return and maximum drawdown of every simulation, and their summary.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown Monte Carlo method {method!r}, expected one of {METHODS}")
+    returns = trade_returns(trades, cash)
+    if len(returns) == 0:
+        raise ValueError("No closed trades to resample")
+
+    sizes = [min(batch_size, n_simulations - start) for start in range(0, n_simulations, batch_size)]
+    batches = list(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+    log_returns = np.log1p(returns)
+    run = partial(_run_batch, log_returns, method)
+    workers = min(max_workers or os.cpu_count(), len(batches))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run, batches))
+    else:
+        results = [run(batch) for batch in batches]
+    logging.info(f"Monte Carlo: {n_simulations} {method} resamples of {len(returns)} trades on {workers} processes")
+
+    finals = np.concatenate([finals for finals, _ in results]) * 100
+    drawdowns = np.concatenate([drawdowns for _, drawdowns in results]) * 100
+
+    # The trades in their actual order
+    actual_final, actual_drawdown = (value[0] * 100 for value in _final_and_drawdown(log_returns[np.newaxis]))
+    tail = (1 - confidence) / 2 * 100
+
+    def share_below(values: np.ndarray, actual: float) -> float:
+        # Paths summing the same trades in another order differ from `actual` by rounding only
+        below = (values < actual) & ~np.isclose(values, actual)
+        return np.count_nonzero(below) / n_simulations * 100
+
+    summary = pd.Series({
+        "Simulations": n_simulations,
+        "Trades": len(returns),
+        "Method": method,
+        "Return [%]": actual_final,
+        "Max. Closed-trade Drawdown [%]": actual_drawdown,
+        "Median Return [%]": np.median(finals),
+        f"Return {confidence:.0%} CI Low [%]": np.percentile(finals, tail),
+        f"Return {confidence:.0%} CI High [%]": np.percentile(finals, 100 - tail),
+        "Median Max. Closed-trade Drawdown [%]": np.median(drawdowns),
+        f"Max. Closed-trade Drawdown {confidence:.0%} CI Low [%]": np.percentile(drawdowns, tail),
+        f"Max. Closed-trade Drawdown {confidence:.0%} CI High [%]": np.percentile(drawdowns, 100 - tail),
+        "Probability of Loss [%]": np.count_nonzero(finals < 0) / n_simulations * 100,
+        "Return Percentile [%]": share_below(finals, actual_final),
+        "Drawdown Percentile [%]": share_below(drawdowns, actual_drawdown),
+    })
+    return MonteCarloResult(returns=finals, drawdowns=drawdowns, summary=summary)
+
+
+def log_monte_carlo(backtest, stats: pd.Series, **kwargs) -> MonteCarloResult | None:
+    """Run `monte_carlo` on the trades of a `Backtest` run and log its summary.
+
+    Args:
+        backtest (Backtest): The backtest that produced `stats`, whose initial cash the trades are replayed from.
+        stats (pd.Series): Result of `backtest.run()` or `backtest.optimize()`.
+        **kwargs: Other `monte_carlo` arguments.
+
+    Returns:
+        MonteCarloResult | None: The analysis, None when the run closed no trade.
+    """
+    if not len(stats["_trades"]):
+        return None
+    # Backtest keeps its constructor arguments in the factory of its broker
+    cash = backtest._broker.keywords["cash"]
+    result = monte_carlo(stats["_trades"], cash=cash, **kwargs)
+    logging.info(f"MONTE CARLO\n=============================================\n{result.summary}")
+    return result
@@ -0,0 +1,229 @@
+"""
+Cross-sectional backtests: one rule over a whole universe of symbols in a single vectorized pass.
+
+A `Universe` holds the OHLC data of every symbol as aligned (bars x symbols) matrices. Indicators and entry
+signals are computed on those matrices for all symbols at once (see `backtest.vectorized`), and the SL/TP
+exits of every trade of every symbol are resolved in one `resolve_exits` call: the columns are laid end to
+end, each followed by a sentinel bar that hits any level, so a search never runs into the next symbol.
+
+All symbols trade one shared account. As in `backtest.sweep`, every signal opens its own trade (hedging),
+a trade risks `risk_per_trade_pct` of the equity, which compounds in exit order, and trades still open at
+the end of the data are left out.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from backtest.fills import LOSS, OPEN, WIN, resolve_exits
+from backtest.trades import BUY, SELL
+from backtest.vectorized import crossed_above, crossed_below, rsi
+
+FIELDS = ("Open", "High", "Low", "Close")
+
+
+@dataclass(frozen=True)
+class Universe:
+    """Aligned OHLC matrices, time on axis 0 and one column per symbol; NaN where a symbol has no bar."""
+    index: pd.DatetimeIndex
+    symbols: list[str]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+
+    @classmethod
+    def from_frames(cls, frames: dict[str, pd.DataFrame], how: str = "outer") -> "Universe":
+        """Align OHLC frames (as passed to `Backtest`) on their time index.
+
+        Args:
+            frames (dict[str, pd.DataFrame]): Frame of every symbol.
+            how (str): "outer" keeps the bars of any symbol, "inner" only the bars every symbol has.
+
+        Returns:
+            Universe: The aligned matrices.
+        """
+        symbols = list(frames)
+        indexes = [frames[symbol].index for symbol in symbols]
+        index = indexes[0]
+        for other in indexes[1:]:
+            index = index.union(other) if how == "outer" else index.intersection(other)
+
+        matrices = {field: np.full((len(index), len(symbols)), np.nan) for field in FIELDS}
+        for column, symbol in enumerate(symbols):
+            frame = frames[symbol]
+            rows = index.get_indexer(frame.index)
+            kept = rows >= 0
+            for field in FIELDS:
+                matrices[field][rows[kept], column] = frame[field].to_numpy(dtype=np.float64)[kept]
+        return cls(index=index, symbols=symbols, open=matrices["Open"], high=matrices["High"],
+                   low=matrices["Low"], close=matrices["Close"])
+
+    @classmethod
+    def from_store(cls, store, symbols: Iterable[str], timeframe: int, date_from: datetime | int | None = None,
+                   date_to: datetime | int | None = None, how: str = "outer") -> "Universe":
+        """Align the bars of `symbols` read from a `BarStore`."""
+        return cls.from_frames({symbol: store.read(symbol, timeframe, date_from, date_to) for symbol in symbols},
+                               how)
+
+    @property
+    def valid(self) -> np.ndarray:
+        """Mask of the cells holding a bar."""
+        return ~np.isnan(self.close)
+
+    def filled_close(self) -> np.ndarray:
+        """Closes carried forward over missing bars (leading gaps stay NaN), for indicators."""
+        return pd.DataFrame(self.close).ffill().to_numpy()
+
+
+def rsi_signals(universe: Universe, window: int, lower_bound: float, upper_bound: float
+                ) -> tuple[np.ndarray, np.ndarray]:
+    """Entries of the `RsiOscillator` rule for every symbol: long when the RSI crosses above `lower_bound`,
+    short when it crosses below `upper_bound`.
+
+    The RSI runs over closes carried forward across missing bars, in one 2-D pass per group of symbols
+    whose data starts on the same bar. No entry is signalled on a bar a symbol does not have.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Long and short entry masks, shaped like the universe.
+    """
+    close = universe.filled_close()
+    values = np.full(close.shape, np.nan)
+    first = np.argmax(~np.isnan(close), axis=0)
+    for start in np.unique(first):
+        columns = np.flatnonzero(first == start)
+        values[start:, columns] = rsi(close[start:, columns], window)
+
+    valid = universe.valid
+    return crossed_above(values, lower_bound) & valid, crossed_below(values, upper_bound) & valid
+
+
+@dataclass(frozen=True)
+class PortfolioResult:
+    # One row per closed trade, in exit order
+    trades: pd.DataFrame
+    # Shared account equity after the trades closed on every bar
+    equity: pd.Series
+    # Trades, win rate and contribution to the return of every symbol
+    symbols: pd.DataFrame
+    # Statistics of the whole account
+    summary: pd.Series
+
+
+def backtest_portfolio(universe: Universe,
+                       long_entries: np.ndarray,
+                       short_entries: np.ndarray,
+                       sl_pct: float = 0.1,
+                       tp_pct: float = 0.1,
+                       risk_per_trade_pct: float = 2.0,
+                       cash: float = 10_000) -> PortfolioResult:
+    """Trade the entry masks of every symbol from one shared account.
+
+    Orders are placed on the close of a signal bar and filled at the next open the symbol has, with SL/TP
+    at `sl_pct` / `tp_pct` of the signal close, as in `RsiOscillator`.
+
+    Args:
+        universe (Universe): Aligned market data.
+        long_entries (np.ndarray): Bars x symbols mask of long entry signals.
+        short_entries (np.ndarray): Bars x symbols mask of short entry signals.
+        sl_pct (float): Stop loss, in percent of the signal close.
+        tp_pct (float): Take profit, in percent of the signal close.
+        risk_per_trade_pct (float): Equity lost by a trade stopped out at its SL, in percent.
+        cash (float): Initial cash.
+
+    Returns:
+        PortfolioResult: Trades, shared equity, per-symbol and account statistics.
+    """
+    n_bars, n_symbols = universe.close.shape
+    stride = n_bars + 1
+
+    def flat(matrix: np.ndarray, sentinel: float) -> np.ndarray:
+        # Columns end to end, each followed by its sentinel bar
+        padded = np.vstack((matrix, np.full((1, n_symbols), sentinel)))
+        return padded.T.ravel()
+
+    # Missing bars can never reach a level, the sentinel bar reaches every level
+    high = np.where(np.isnan(universe.high), -np.inf, universe.high)
+    low = np.where(np.isnan(universe.low), np.inf, universe.low)
+    high, low = flat(high, np.inf), flat(low, -np.inf)
+    open_, close = flat(universe.open, np.nan), flat(universe.close, np.nan)
+
+    signal_idx = []
+    is_long = []
+    for mask, long in ((long_entries, True), (short_entries, False)):
+        positions = np.flatnonzero(flat(np.asarray(mask, dtype=bool), False))
+        signal_idx.append(positions)
+        is_long.append(np.full(len(positions), long))
+    # In bar order, so the exit searches of neighbouring trades touch the same blocks
+    signal_idx = np.concatenate(signal_idx)
+    order = np.argsort(signal_idx, kind="stable")
+    signal_idx = signal_idx[order]
+    is_long = np.concatenate(is_long)[order]
+
+    # Filled at the next open of the same symbol; signals without one are dropped
+    bars = np.flatnonzero(~np.isnan(open_))
+    following = np.searchsorted(bars, signal_idx, side="right")
+    fill_idx = bars[np.minimum(following, len(bars) - 1)] if len(bars) else signal_idx
+    filled = (following < len(bars)) & (fill_idx // stride == signal_idx // stride)
+    signal_idx, is_long, fill_idx = signal_idx[filled], is_long[filled], fill_idx[filled]
+
+    sign = np.where(is_long, 1.0, -1.0)
+    reference = close[signal_idx]
+    sl = reference - sign * sl_pct / 100.0 * reference
+    tp = reference + sign * tp_pct / 100.0 * reference
+    exits = resolve_exits(high, low, signal_idx, is_long, sl, tp, open_=open_)
+
+    # Exits on a sentinel bar are trades still open at the end of their symbol's data
+    closed = (exits.outcome != OPEN) & (exits.exit_idx % stride != n_bars)
+    symbol_idx = signal_idx[closed] // stride
+    entry_row = fill_idx[closed] % stride
+    exit_row = exits.exit_idx[closed] % stride
+    entry_price = open_[fill_idx[closed]]
+    exit_price = exits.exit_price[closed]
+    returns = sign[closed] * (exit_price / entry_price - 1)
+
+    order = np.lexsort((symbol_idx, exit_row))
+    # A stop-loss exit moves the equity by -risk_per_trade_pct, other exits in proportion
+    factors = 1 + risk_per_trade_pct / sl_pct * returns[order]
+    trade_equity = cash * np.cumprod(factors)
+
+    trades = pd.DataFrame({
+        "Symbol": np.asarray(universe.symbols, dtype=object)[symbol_idx[order]],
+        "Direction": np.where(is_long[closed][order], BUY, SELL).astype(np.int8),
+        "EntryTime": universe.index[entry_row[order]],
+        "ExitTime": universe.index[exit_row[order]],
+        "EntryPrice": entry_price[order],
+        "ExitPrice": exit_price[order],
+        "SL": sl[closed][order],
+        "TP": tp[closed][order],
+        "Outcome": exits.outcome[closed][order],
+        "ReturnPct": returns[order],
+        "PnL": np.diff(trade_equity, prepend=cash),
+    })
+
+    # Equity after the last exit of every bar, carried forward over bars without exits
+    equity = np.full(n_bars, np.nan)
+    equity[exit_row[order]] = trade_equity
+    equity = pd.Series(equity, index=universe.index, name="Equity").ffill().fillna(cash)
+
+    by_symbol = trades.groupby("Symbol")
+    symbols = pd.DataFrame({
+        "# Trades": by_symbol.size(),
+        "Win Rate [%]": by_symbol["Outcome"].apply(lambda outcome: (outcome == WIN).mean() * 100),
+        "PnL [$]": by_symbol["PnL"].sum(),
+    }).reindex(universe.symbols).fillna({"# Trades": 0, "PnL [$]": 0.0}).astype({"# Trades": int})
+
+    n_trades = len(trades)
+    summary = pd.Series({
+        "Symbols": n_symbols,
+        "Equity Final [$]": equity.iloc[-1],
+        "Return [%]": (equity.iloc[-1] / cash - 1) * 100,
+        "Max. Drawdown [%]": (equity / np.maximum(equity.cummax(), cash) - 1).min() * 100,
+        "# Trades": n_trades,
+        "Win Rate [%]": np.count_nonzero(trades["Outcome"] == WIN) / n_trades * 100 if n_trades else np.nan,
+        "Loss Rate [%]": np.count_nonzero(trades["Outcome"] == LOSS) / n_trades * 100 if n_trades else np.nan,
+        "Avg. Trade [%]": returns.mean() * 100 if n_trades else np.nan,
+    })
+    return PortfolioResult(trades=trades, equity=equity, symbols=symbols, summary=summary)
@@ -5,51 +5,91 @@ from datetime import datetime
 from pathlib import Path
 
 import MetaTrader5 as mt5
-import matplotlib
 from backtesting import Backtest, backtesting
 from dotenv import load_dotenv
-from pandas.plotting import register_matplotlib_converters
 
 from backtest.strategies import (
     RsiOscillator
 )
-from metatrader import MT5Connection
+from backtest.indicator_cache import shared_indicators
+from backtest.monte_carlo import log_monte_carlo
+from backtest.sweep import sweep_rsi_oscillator
+from backtest.walk_forward import walk_forward as run_walk_forward
+from metatrader import BarStore, MT5Connection
 
 # Load env vars
 load_dotenv()
 
-# Register matplotlib converters
-register_matplotlib_converters()
-matplotlib.use("TkAgg")
-
 # Configure logging
 level = logging.INFO
 fmt = "[%(levelname)s]: %(asctime)s - %(message)s"
 logging.basicConfig(level=level, format=fmt)
 logger = logging.getLogger(__name__)
 
+# Parameter grid of the sweep and of the walk-forward optimizations
+PARAM_GRID = dict(upper_bound=range(50, 90, 5), lower_bound=range(10, 45, 5), rsi_window=range(10, 20, 2))
+
+# Best sweep rows re-run by the event-driven engine before one is picked
+SWEEP_CANDIDATES = 10
+
+# Walk-forward train / test windows: four weeks of M1 bars, then one
+WALK_FORWARD_BARS = (20 * 1440, 5 * 1440)
 
-def main() -> None:
+
+def main(optimize: bool = False, plot: bool = False, walk_forward: bool = False, anchored: bool = False,
+         compact: bool = False) -> None:
+    """
+    Backtest RsiOscillator on USDCAD M1.
+    With `optimize`, the parameter grid is swept first and the best combination is run; with `plot`, the
+    backtest chart is written under "backtests/". With `walk_forward`, the grid is instead optimized on rolling
+    (or `anchored`) training windows and the out-of-sample results of the windows that follow them are logged.
+    With `compact`, the bars are loaded as float32 prices and int32 volume, about half the memory per bar.
+    """
     symbol = "USDCAD"
     timeframe = mt5.TIMEFRAME_M1
 
-    with (MT5Connection(int(os.getenv("ACCOUNT_ID")), os.getenv("PASSWORD"), os.getenv("MT5_SERVER")) as mt5_conn):
+    cache = BarStore(Path(__file__).parent.parent.parent / "resources" / "bars")
+    with (MT5Connection(int(os.getenv("ACCOUNT_ID")), os.getenv("PASSWORD"), os.getenv("MT5_SERVER"),
+                        cache=cache) as mt5_conn):
         rates = mt5_conn.fetch_rates_range(symbol=symbol,
                                            timeframe=timeframe,
                                            date_from=datetime(2025, 4, 10),
-                                           date_to=datetime.now())
+                                           date_to=datetime.now(),
+                                           compact=compact)
 
         try:
+            if walk_forward:
+                result = run_walk_forward(rates, RsiOscillator, PARAM_GRID, *WALK_FORWARD_BARS, anchored=anchored,
+                                          maximize="Return [%]", cash=10_000)
+                logger.info(f"WALK-FORWARD\n=============================================\n{result.folds}")
+                logger.info(f"OUT-OF-SAMPLE\n=============================================\n{result.summary}")
+                return
+
             bt = Backtest(rates, RsiOscillator, cash=10_000)
-            backtesting.Pool = multiprocessing.Pool
-            # stats = bt.run()
-            stats = bt.optimize(
-                upper_bound=range(50, 90, 5),
-                lower_bound=range(10, 45, 5),
-                rsi_window=range(10, 20, 2),
-                maximize="Return [%]"
-            )
+            if optimize:
+                # Rank the whole grid in one vectorized pass. The sweep opens a trade per signal (hedging)
+                # while this backtest nets positions, so the best rows are re-run by this backtest and the
+                # winner is picked under the execution model its stats are reported with.
+                table = sweep_rsi_oscillator(rates, **PARAM_GRID, cash=10_000, maximize="Return [%]")
+                logger.info(f"SWEEP\n=============================================\n{table.head(10)}")
+
+                candidates = set(table.index[:SWEEP_CANDIDATES])
+                # Run the optimization on worker processes, also where backtesting falls back to threads (spawn)
+                backtesting.Pool = multiprocessing.Pool
+                # The RSI of a window is computed by one pool worker and shared with the others
+                with shared_indicators():
+                    stats = bt.optimize(
+                        upper_bound=sorted({ub for ub, _, _ in candidates}),
+                        lower_bound=sorted({lb for _, lb, _ in candidates}),
+                        rsi_window=sorted({window for _, _, window in candidates}),
+                        constraint=lambda p: (p.upper_bound, p.lower_bound, p.rsi_window) in candidates,
+                        maximize="Return [%]"
+                    )
+            else:
+                stats = bt.run()
             logger.info(f"STATS\n=============================================\n{stats}")
+            # How much of the result the particular sequence of trades explains
+            log_monte_carlo(bt, stats)
 
             lb = stats["_strategy"].lower_bound
             ub = stats["_strategy"].upper_bound
@@ -58,12 +98,13 @@ def main() -> None:
             logger.info(f"LB: {lb}, UB: {ub}, WINDOW: {window}")
 
             # Plot backtest stats
-            plot_path: Path = Path(__file__).parent.parent.parent / f"backtests/lb{lb}_ub{ub}_win{window}"
-            plot_path.mkdir(parents=True, exist_ok=True)
-            bt.plot(filename=str(plot_path))
+            if plot:
+                plot_path: Path = Path(__file__).parent.parent.parent / f"backtests/lb{lb}_ub{ub}_win{window}"
+                plot_path.mkdir(parents=True, exist_ok=True)
+                bt.plot(filename=str(plot_path))
         except Exception:
             logger.exception("Exception occurred while backtesting")
 
 
 if __name__ == "__main__":
-    main()
+    main(optimize=True, plot=True)
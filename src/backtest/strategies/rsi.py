@@ -3,6 +3,8 @@ import talib
 from backtesting import Strategy
 from backtesting.lib import crossover
 
+from backtest.indicator_cache import cached
+
 
 class RsiOscillator(Strategy):
 	"""A trading strategy based on the Relative Strength Index (RSI) Oscillator.
@@ -52,7 +54,8 @@ class RsiOscillator(Strategy):
 		self.lower_rsi = None
 
 	def init(self):
-		self.rsi = self.I(talib.RSI, self.data.Close, self.rsi_window)
+		# TA-Lib only takes float64: compact (float32) data is converted once here, float64 data is used as is
+		self.rsi = self.I(cached(talib.RSI), self.data.Close.astype(np.float64, copy=False), self.rsi_window)
 		self.upper_rsi = np.full_like(self.rsi, self.upper_bound)
 		self.lower_rsi = np.full_like(self.rsi, self.lower_bound)
 
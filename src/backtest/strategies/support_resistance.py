@@ -1,6 +1,6 @@
-import numpy as np
 from backtesting import Strategy
-from scipy.signal import find_peaks
+
+from indicators import SupportResistanceLevels, support_resistance_orders
 
 
 class SupportResistance(Strategy):
@@ -21,6 +21,8 @@ class SupportResistance(Strategy):
 	A set of supports and resistances.
 
 	How?
+	Swing lows and highs confirmed `window` bars after they closed (see `indicators.SupportResistanceLevels`),
+	so the backtest only trades off levels that were known at the time, as the live loop does.
 	Identify the support and resistance the price lies between.
 	Apply the above rules for placing orders when the price hits the identified support or resistance.
 	TBD: Use the same candle that hits the levels OR use the next candle?
@@ -28,89 +30,39 @@ class SupportResistance(Strategy):
 	window = 30
 	level_pad = 0.015
 	prominence = 0.035
+	# Bars after which a level is forgotten; None keeps every level
+	level_max_age = None
 
 	# Risk-management parameters
 	risk_per_trade_pct = 3  # Percentage of the account to risk (2%)
 
 	def __init__(self, broker, data, params):
 		super().__init__(broker, data, params)
-		self.support_lines = None
-		self.resistance_lines = None
+		self.tracker = None
 		self.levels = None
+		self._bars_seen = 0
 
 	def init(self):
-		self.support_lines = self._compute_support_lines(self.data, self.window, self.prominence)
-		self.resistance_lines = self._compute_resistance_lines(self.data, self.window, self.prominence)
-		self.levels = np.concatenate((self.support_lines, self.resistance_lines))
-		self.levels.sort()
+		self.tracker = SupportResistanceLevels(self.window, self.prominence, self.level_max_age)
+		self.levels = self.tracker.levels
 
 	def next(self):
+		# Feed the bars closed since the last call (the first call already sees two)
+		high, low, close = self.data.High, self.data.Low, self.data.Close
+		for i in range(self._bars_seen, len(close)):
+			self.tracker.update(float(high[i]), float(low[i]), float(close[i]))
+		self._bars_seen = len(close)
+
 		price = float(self.data.Close[-1])
 		prev_price = float(self.data.Close[-2])
 
-		# Find the levels the price lies between
-		idx = np.searchsorted(self.levels, price)
-		if idx == 0:
-			if price < self.levels[idx] - self.level_pad:
-				sl_price = self.levels[idx] + self.level_pad
-				tp_price = self.levels[idx] - 4 * self.level_pad
-
-				# Compute position size
-				risk_amount = self.equity * (self.risk_per_trade_pct / 100.0)
-				risk_per_unit = (sl_price - price) / price
-				position_size = round(risk_amount / risk_per_unit / 100_000)
-
-				if tp_price < price < sl_price:
-					self.sell(size=position_size, sl=sl_price, tp=tp_price)
-		elif idx == len(self.levels):
-			if price > self.levels[idx - 1] + self.level_pad:
-				sl_price = self.levels[idx - 1] - self.level_pad
-				tp_price = self.levels[idx - 1] + 4 * self.level_pad
-
-				# Compute position size
-				risk_amount = self.equity * (self.risk_per_trade_pct / 100.0)
-				risk_per_unit = (sl_price - price) / price
-				position_size = round(risk_amount / risk_per_unit / 100_000)
-
-				if tp_price < price < sl_price:
-					self.sell(size=position_size, sl=sl_price, tp=tp_price)
-		else:
-			low = self.levels[idx - 1]
-			high = self.levels[idx]
-
-			if price > high - self.level_pad and (
-					high - self.level_pad <= prev_price <= high + self.level_pad):
-				tp_price = low + self.level_pad
-				sl_price = high + self.level_pad
-
-				# Compute position size
-				risk_amount = self.equity * (self.risk_per_trade_pct / 100.0)
-				risk_per_unit = (sl_price - price) / price
-				position_size = round(risk_amount / risk_per_unit / 100_000)
-
-				if tp_price < price < sl_price:
-					self.sell(size=position_size, sl=sl_price, tp=tp_price)
-			if price < low + self.level_pad and (
-					low - self.level_pad <= prev_price <= low + self.level_pad):
-				tp_price = high - self.level_pad
-				sl_price = low - self.level_pad
-
-				# Compute position size
-				risk_amount = self.equity * (self.risk_per_trade_pct / 100.0)
-				risk_per_unit = (price - sl_price) / price
-				position_size = round(risk_amount / risk_per_unit / 100_000)
-
-				if sl_price < price < tp_price:
-					self.buy(size=position_size, sl=sl_price, tp=tp_price)
-
-	@staticmethod
-	def _compute_support_lines(data, window: int, prominence: float = 0.002):
-		peaks, _ = find_peaks(-data.Low, distance=window, prominence=prominence)
-		peaks_values = data.Close[peaks]
-		return peaks_values
+		# Orders for the levels the price lies between, as in the live loop
+		for action, sl_price, tp_price in support_resistance_orders(self.levels, price, prev_price, self.level_pad):
+			# Compute position size
+			risk_amount = self.equity * (self.risk_per_trade_pct / 100.0)
+			risk_per_unit = abs(price - sl_price) / price
+			position_size = round(risk_amount / risk_per_unit / 100_000)
 
-	@staticmethod
-	def _compute_resistance_lines(data, window: int, prominence: float = 0.002):
-		peaks, _ = find_peaks(data.High, distance=window, prominence=prominence)
-		peaks_values = data.Close[peaks]
-		return peaks_values
+			if position_size > 0:
+				place = self.buy if action == "BUY" else self.sell
+				place(size=position_size, sl=sl_price, tp=tp_price)
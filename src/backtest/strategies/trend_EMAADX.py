@@ -1,8 +1,50 @@
 import numpy as np
+import pandas as pd
 import talib
 from backtesting import Strategy
 import logging
 
+from backtest.indicator_cache import cached
+
+
+def bullish_engulfing(open_, close):
+	"""Bars whose bullish body engulfs the body of the previous, bearish, bar."""
+	signal = np.zeros(len(close), dtype=bool)
+	prev_open, prev_close = open_[:-1], close[:-1]
+	curr_open, curr_close = open_[1:], close[1:]
+	signal[1:] = (curr_close > prev_open) & (prev_open > prev_close) & (prev_close > curr_open) & (
+			curr_close > curr_open)
+	return signal
+
+
+def bullish_pin_bar(open_, high, low, close):
+	"""Bullish bars with a small body, a long lower wick and a close in the upper third of the range."""
+	body = np.abs(close - open_)
+	lower_wick = np.minimum(open_, close) - low
+	candle_range = high - low
+	signal = (
+			(body < 0.33 * candle_range)
+			& (lower_wick > 0.5 * candle_range)
+			& (close > open_)
+			& (close > low + 0.66 * candle_range)
+	)
+	# The first bar has no context to judge it against
+	signal[:1] = False
+	return signal
+
+
+def swing_low(low, lookback):
+	"""Lowest low of every bar and the `lookback` bars before it."""
+	return pd.Series(low).rolling(lookback + 1, min_periods=1).min().to_numpy()
+
+
+def rising(values):
+	"""Bars where `values` is above its previous value."""
+	signal = np.zeros(len(values), dtype=bool)
+	signal[1:] = values[1:] > values[:-1]
+	return signal
+
+
 class TrendFollowingEMAADX(Strategy):
 	"""
 	Trend Following Strategy using 50 & 200 EMA + ADX for confirmation.
@@ -35,100 +77,75 @@ class TrendFollowingEMAADX(Strategy):
 	flat_adx = 20
 	reward_risk_ratio = 2.0
 	ema_touch_tol = 0.01  # 0.5% within EMA50 == "touch"
+	swing_lookback = 10  # Bars before the entry searched for the swing low of the SL
 
 	def __init__(self, broker, data, params):
 		super().__init__(broker, data, params)
 		self.ema_50 = None
 		self.ema_200 = None
 		self.adx = None
+		self.bullish_pattern = None
+		self.swing_low = None
+		self.long_setup = None
 
 	def init(self):
-		self.ema_50 = self.I(talib.EMA, self.data.Close, self.ema_fast)
-		self.ema_200 = self.I(talib.EMA, self.data.Close, self.ema_slow)
-		self.adx = self.I(talib.ADX, self.data.High, self.data.Low, self.data.Close, self.adx_period)
-
-	def _is_bullish_engulfing(self, i):
-		"""Check for bullish engulfing pattern at index i."""
-		if i < 1:
-			return False
-		prev_open = self.data.Open[i - 1]
-		prev_close = self.data.Close[i - 1]
-		curr_open = self.data.Open[i]
-		curr_close = self.data.Close[i]
-
-		# Previous candle bearish, current is bullish, AND the current body engulfs previous
-		return curr_close > prev_open > prev_close > curr_open and curr_close > curr_open
-
-	def _is_bullish_pin_bar(self, i):
-		"""Check for bullish pin bar at index i."""
-		if i < 1:
-			return False
-		body = abs(self.data.Close[i] - self.data.Open[i])
-		lower_wick = min(self.data.Open[i], self.data.Close[i]) - self.data.Low[i]
-		candle_range = self.data.High[i] - self.data.Low[i]
-
-		# Pin bar: small body, long lower wick, closes in upper half
-		return (
-				body < (0.33 * candle_range)
-				and lower_wick > (0.5 * candle_range)
-				and self.data.Close[i] > self.data.Open[i]
-				and self.data.Close[i] > (self.data.Low[i] + 0.66 * candle_range)
-		)
-
-	def _recent_swing_low(self, i, lookback=10):
-		"""Finds the recent swing low for stop loss."""
-		return float(np.min(self.data.Low[max(0, i - lookback):i + 1]))
+		# TA-Lib only takes float64: compact (float32) data is converted once here, float64 data is used as is
+		open_, high, low, close = (self.data[column].astype(np.float64, copy=False)
+								   for column in ("Open", "High", "Low", "Close"))
+		self.ema_50 = self.I(cached(talib.EMA), close, self.ema_fast)
+		self.ema_200 = self.I(cached(talib.EMA), close, self.ema_slow)
+		self.adx = self.I(cached(talib.ADX), high, low, close, self.adx_period)
+
+		# Every entry condition is computed over the whole data up front; next() only looks them up
+		self.bullish_pattern = cached(bullish_engulfing)(open_, close) | cached(bullish_pin_bar)(open_, high, low, close)
+		self.swing_low = cached(swing_low)(low, self.swing_lookback)
+
+		ema50 = np.asarray(self.ema_50)
+		adx = np.asarray(self.adx)
+		with np.errstate(invalid="ignore"):
+			bullish_trend = ema50 > np.asarray(self.ema_200)
+			adx_strong = adx > self.min_adx
+			near_ema50 = np.abs(close - ema50) / ema50 < self.ema_touch_tol
+			# No trade if ADX too flat
+			adx_flat = adx < self.flat_adx
+		adx_rising = cached(rising)(adx)
+		self.long_setup = ~adx_flat & bullish_trend & adx_rising & adx_strong & near_ema50 & self.bullish_pattern
 
 	def next(self):
-		i = len(self.data.Close) - 1
-
-		price = float(self.data.Close[i])
-		ema50_now = self.ema_50[i]
-		ema200_now = self.ema_200[i]
-		adx_now = self.adx[i]
-
-		# Check for long setup
-		bullish_trend = ema50_now > ema200_now
-		adx_strong = adx_now > self.min_adx
-		adx_rising = self.adx[i] > self.adx[i - 1] if i > 0 else False
-		near_ema50 = abs(price - ema50_now) / ema50_now < self.ema_touch_tol
-
-		# No trade if ADX too flat
-		if adx_now < self.flat_adx:
-			return
+		i = len(self.data) - 1
 
 		# --- LONG ENTRY ---
-		if bullish_trend and adx_rising and adx_strong and near_ema50:
-			# Check for bullish signal (engulfing or pin bar)
-			if self._is_bullish_engulfing(i) or self._is_bullish_pin_bar(i):
-				# Compute stop loss: recent swing low
-				sl_price = self._recent_swing_low(i)
-				risk_per_unit = (price - sl_price) / price
-				if risk_per_unit <= 0:
-					return  # avoid negative/0 risk
-
-				# Risk-based position sizing
-				risk_amount = self.equity * (self.risk_per_trade_pct / 100.0)
-				position_size = float(round(risk_amount / risk_per_unit))
-				# print(f"Position size: {position_size}")
-				# position_size = max(position_size, 0.01)
-				# position_size = 200_000
-
-				# Take profit: 2:1 RR
-				tp_price = price + self.reward_risk_ratio * risk_per_unit
-
-				if position_size > 0 and sl_price < price < tp_price:
-					logging.info(f"({self.data.index[i]}) LONG: {position_size} @ {price}")
-					self.buy(sl=sl_price, tp=tp_price)
+		# ADX not flat, uptrend, strong and rising ADX, price near EMA50, bullish engulfing or pin bar
+		if self.long_setup[i]:
+			price = float(self.data.Close[i])
+
+			# Compute stop loss: recent swing low
+			sl_price = float(self.swing_low[i])
+			risk_per_unit = (price - sl_price) / price
+			if risk_per_unit <= 0:
+				return  # avoid negative/0 risk
+
+			# Risk-based position sizing
+			risk_amount = self.equity * (self.risk_per_trade_pct / 100.0)
+			position_size = float(round(risk_amount / risk_per_unit))
+			# print(f"Position size: {position_size}")
+			# position_size = max(position_size, 0.01)
+			# position_size = 200_000
+
+			# Take profit: 2:1 RR
+			tp_price = price + self.reward_risk_ratio * risk_per_unit
+
+			if position_size > 0 and sl_price < price < tp_price:
+				logging.info(f"({self.data.index[i]}) LONG: {position_size} @ {price}")
+				self.buy(sl=sl_price, tp=tp_price)
 
 		# # --- Exit Conditions for Trailing Stop (Long) ---
 		# if self.position.is_long:
 		# 	# Trailing stop below higher lows
-		# 	lookback = 10
-		# 	trailing_sl = self._recent_swing_low(i, lookback)
+		# 	trailing_sl = float(self.swing_low[i])
 		# 	if trailing_sl > 0 and trailing_sl > self.position.sl:
 		# 		self.position.sl = trailing_sl
 		#
 		# 	# ADX reverses & price closes below EMA50
-		# 	if adx_now < self.adx[i - 1] and price < ema50_now:
+		# 	if adx_now < self.adx[i - 1] and price < self.ema_50[i]:
 		# 		self.position.close()
@@ -4,51 +4,76 @@ from datetime import datetime
 from pathlib import Path
 
 import MetaTrader5 as mt5
-import matplotlib
 from backtesting import Backtest
 from dotenv import load_dotenv
-from pandas.plotting import register_matplotlib_converters
 
 from backtest.strategies import (
 	SupportResistance
 )
-from metatrader import MT5Connection
+from backtest.monte_carlo import log_monte_carlo
+from backtest.walk_forward import walk_forward as run_walk_forward
+from metatrader import BarStore, MT5Connection
 
 # Load env vars
 load_dotenv()
 
-# Register matplotlib converters
-register_matplotlib_converters()
-matplotlib.use("TkAgg")
-
 # Configure logging
 level = logging.INFO
 fmt = "[%(levelname)s]: %(asctime)s - %(message)s"
 logging.basicConfig(level=level, format=fmt)
 logger = logging.getLogger(__name__)
 
+# Parameter grid of the optimizations
+PARAM_GRID = dict(window=range(30, 150, 10), level_pad=[i * 0.0001 for i in range(1, 11)],
+				  prominence=[i * 0.001 for i in range(1, 11)])
+
+# Walk-forward train / test windows in H4 bars; test windows are long enough for the largest `window`
+WALK_FORWARD_BARS = (1040, 520)
+
 
-def main() -> None:
+def score(stats) -> float:
+	"""Optimization objective: mostly return, partly win rate."""
+	return stats["Return [%]"] * 0.7 + stats["Win Rate [%]"] * 0.3
+
+
+def main(optimize: bool = False, plot: bool = False, walk_forward: bool = False, anchored: bool = False,
+		 compact: bool = False) -> None:
+	"""
+	Backtest SupportResistance on USDCAD H4.
+	With `optimize`, the level parameters are optimized first; with `plot`, the backtest chart is written
+	under "backtests/". With `walk_forward`, they are instead optimized on rolling (or `anchored`) training
+	windows and the out-of-sample results of the windows that follow them are logged. With `compact`, the bars
+	are loaded as float32 prices and int32 volume, about half the memory per bar.
+	"""
 	symbol = "USDCAD"
 	timeframe = mt5.TIMEFRAME_H4
 
-	with (MT5Connection(int(os.getenv("ACCOUNT_ID")), os.getenv("PASSWORD"), os.getenv("MT5_SERVER")) as mt5_conn):
-		rates = mt5_conn.fetch_rates_range(symbol=symbol,
-										   timeframe=timeframe,
-										   date_from=datetime(2024, 6, 1),
-										   date_to=datetime.now())
+	cache = BarStore(Path(__file__).parent.parent.parent / "resources" / "bars")
+	with (MT5Connection(int(os.getenv("ACCOUNT_ID")), os.getenv("PASSWORD"), os.getenv("MT5_SERVER"),
+						cache=cache) as mt5_conn):
+		# H4 bars are derived from the cached M1 bars, shared with the other runners and timeframes
+		rates = mt5_conn.fetch_resampled_range(symbol=symbol,
+										       timeframe=timeframe,
+										       date_from=datetime(2024, 6, 1),
+										       date_to=datetime.now(),
+										       compact=compact)
 
 		try:
+			if walk_forward:
+				result = run_walk_forward(rates, SupportResistance, PARAM_GRID, *WALK_FORWARD_BARS, anchored=anchored,
+										  maximize=score, cash=100_000)
+				logger.info(f"WALK-FORWARD\n=============================================\n{result.folds}")
+				logger.info(f"OUT-OF-SAMPLE\n=============================================\n{result.summary}")
+				return
+
 			bt = Backtest(rates, SupportResistance, cash=100_000)
-			stats = bt.run()
-			# stats = bt.optimize(
-			# 	window=range(30, 150, 10),
-			# 	level_pad=[i * 0.0001 for i in range(1, 11)],
-			# 	prominence=[i * 0.001 for i in range(1, 11)],
-			# 	maximize=lambda s: s["Return [%]"] * 0.7 + s["Win Rate [%]"] * 0.3
-			#
-			# )
+			if optimize:
+				stats = bt.optimize(**PARAM_GRID, maximize=score)
+			else:
+				stats = bt.run()
 			logger.info(f"STATS\n=============================================\n{stats}")
+			# How much of the result the particular sequence of trades explains
+			log_monte_carlo(bt, stats)
 
 			window = stats["_strategy"].window
 			level_pad = stats["_strategy"].level_pad
@@ -57,13 +82,14 @@ def main() -> None:
 			logger.info(f"window: {window}, level_pad: {level_pad}, prominence: {prominence}")
 
 			# Plot backtest stats
-			plot_subpath = Path("backtests", "supp_res", f"window{window}_level_pad{level_pad}_prominence{prominence}")
-			plot_path: Path = Path(__file__).parent.parent.parent / plot_subpath
-			plot_path.mkdir(parents=True, exist_ok=True)
-			bt.plot(filename=str(plot_path))
+			if plot:
+				plot_subpath = Path("backtests", "supp_res", f"window{window}_level_pad{level_pad}_prominence{prominence}")
+				plot_path: Path = Path(__file__).parent.parent.parent / plot_subpath
+				plot_path.mkdir(parents=True, exist_ok=True)
+				bt.plot(filename=str(plot_path))
 		except Exception:
 			logger.exception("Exception occurred while backtesting")
 
 
 if __name__ == "__main__":
-	main()
+	main(plot=True)
@@ -0,0 +1,128 @@
+"""
+Vectorized parameter sweeps that evaluate a whole grid without one event-driven backtest per combination.
+"""
+from itertools import product
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from backtest.fills import LOSS, OPEN, WIN, resolve_exits
+from backtest.strategies import RsiOscillator
+from backtest.vectorized import crossed_above, crossed_below, rsi
+
+
+def _trades(data: pd.DataFrame, signal: np.ndarray, is_long: bool, sl_pct: float, tp_pct: float) -> dict:
+    """Open a trade on the bar after every True cell of `signal` (bars x bounds) and resolve all of them at once."""
+    close = data["Close"].to_numpy(dtype=np.float64)
+    # The order placed on the close of the signal bar is filled at the next open
+    signal = signal.copy()
+    signal[-1] = False
+    signal_idx, bound_idx = np.nonzero(signal)
+
+    sign = 1.0 if is_long else -1.0
+    reference = close[signal_idx]
+    sl = reference - sign * sl_pct / 100.0 * reference
+    tp = reference + sign * tp_pct / 100.0 * reference
+
+    exits = resolve_exits(data["High"].to_numpy(dtype=np.float64), data["Low"].to_numpy(dtype=np.float64),
+                          signal_idx, np.full(len(signal_idx), is_long), sl, tp,
+                          open_=data["Open"].to_numpy(dtype=np.float64))
+    entry_price = data["Open"].to_numpy(dtype=np.float64)[signal_idx + 1]
+
+    closed = exits.outcome != OPEN
+    return {
+        "bound": bound_idx[closed],
+        "exit_idx": exits.exit_idx[closed],
+        "outcome": exits.outcome[closed],
+        "return": sign * (exits.exit_price[closed] / entry_price[closed] - 1),
+        "move": sign * (exits.exit_price[closed] - entry_price[closed]),
+    }
+
+
+def _metrics(exit_idx: np.ndarray, returns: np.ndarray, moves: np.ndarray, outcome: np.ndarray,
+             units_per_equity: float, cash: float) -> dict:
+    order = np.argsort(exit_idx, kind="stable")
+    equity = cash * np.cumprod(1 + units_per_equity * moves[order])
+    peak = np.maximum.accumulate(np.concatenate(([cash], equity)))[1:]
+
+    gains = returns[returns > 0].sum()
+    losses = -returns[returns < 0].sum()
+    n_trades = len(returns)
+    return {
+        "Equity Final [$]": equity[-1] if n_trades else cash,
+        "Return [%]": (equity[-1] / cash - 1) * 100 if n_trades else 0.0,
+        "Max. Drawdown [%]": (equity / peak - 1).min() * 100 if n_trades else 0.0,
+        "# Trades": n_trades,
+        "Win Rate [%]": np.count_nonzero(outcome == WIN) / n_trades * 100 if n_trades else np.nan,
+        "Loss Rate [%]": np.count_nonzero(outcome == LOSS) / n_trades * 100 if n_trades else np.nan,
+        "Best Trade [%]": returns.max() * 100 if n_trades else np.nan,
+        "Worst Trade [%]": returns.min() * 100 if n_trades else np.nan,
+        "Avg. Trade [%]": returns.mean() * 100 if n_trades else np.nan,
+        "Profit Factor": gains / losses if losses else np.nan,
+    }
+
+
+def sweep_rsi_oscillator(data: pd.DataFrame,
+                         upper_bound: Iterable[float],
+                         lower_bound: Iterable[float],
+                         rsi_window: Iterable[int],
+                         cash: float = 10_000,
+                         maximize: str = "Return [%]") -> pd.DataFrame:
+    """Evaluate every (upper_bound, lower_bound, rsi_window) combination of `RsiOscillator` in one pass.
+
+    RSI is computed once per distinct window. BUY entries only depend on the lower bound and SELL entries
+    only on the upper bound, so the entries of all bounds are taken from 2-D (bars x bounds) crossover
+    matrices and their SL/TP exits are resolved in one batch per window; each combination then just
+    selects its BUY and SELL trades.
+
+    Trades follow the strategy: the order is placed on the close of the crossover bar and filled at the
+    next open, with SL/TP at `sl_pct` / `tp_pct` of the signal close. Positions are sized from equity as
+    in `RsiOscillator.next` but without rounding to whole units, equity compounds in exit order and
+    trades still open at the end of the data are left out. Every signal opens its own trade, as with
+    `Backtest(..., hedging=True)`: trade counts and win rates match that engine, while returns differ by
+    the unit rounding. With the default netting engine opposite signals close open trades instead, so
+    re-run the chosen parameters with `Backtest.run` for the exact statistics.
+
+    Args:
+        data (pd.DataFrame): OHLC data as passed to `Backtest`.
+        upper_bound (Iterable[float]): Upper RSI bounds to try.
+        lower_bound (Iterable[float]): Lower RSI bounds to try.
+        rsi_window (Iterable[int]): RSI windows to try.
+        cash (float): Initial cash.
+        maximize (str): Metric the returned table is sorted by (descending).
+
+    Returns:
+        pd.DataFrame: One row of `Backtest.optimize`-style metrics per combination, indexed by
+            (upper_bound, lower_bound, rsi_window).
+    """
+    upper_values = list(upper_bound)
+    lower_values = list(lower_bound)
+    upper_bounds = np.asarray(upper_values, dtype=np.float64)
+    lower_bounds = np.asarray(lower_values, dtype=np.float64)
+
+    # Position size per unit of equity, as computed in RsiOscillator.next
+    units_per_equity = RsiOscillator.risk_per_trade_pct / RsiOscillator.sl_pct / 100_000
+
+    close = data["Close"].to_numpy(dtype=np.float64)
+    rows = {}
+    for window in rsi_window:
+        rsi_values = rsi(close, window)[:, np.newaxis]
+        buys = _trades(data, crossed_above(rsi_values, lower_bounds), True,
+                       RsiOscillator.sl_pct, RsiOscillator.tp_pct)
+        sells = _trades(data, crossed_below(rsi_values, upper_bounds), False,
+                        RsiOscillator.sl_pct, RsiOscillator.tp_pct)
+
+        for (ui, ub), (li, lb) in product(enumerate(upper_values), enumerate(lower_values)):
+            buy = buys["bound"] == li
+            sell = sells["bound"] == ui
+            rows[(ub, lb, window)] = _metrics(
+                np.concatenate((buys["exit_idx"][buy], sells["exit_idx"][sell])),
+                np.concatenate((buys["return"][buy], sells["return"][sell])),
+                np.concatenate((buys["move"][buy], sells["move"][sell])),
+                np.concatenate((buys["outcome"][buy], sells["outcome"][sell])),
+                units_per_equity, cash)
+
+    table = pd.DataFrame.from_dict(rows, orient="index")
+    table.index = pd.MultiIndex.from_tuples(table.index, names=["upper_bound", "lower_bound", "rsi_window"])
+    return table.sort_values(maximize, ascending=False)
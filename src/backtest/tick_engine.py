@@ -0,0 +1,240 @@
+"""
+Tick-driven backtest engine for strategies that must be validated on raw quotes.
+
+Ticks are read in fixed-size chunks from a memory-mapped `.npy` file holding the output of
+`mt5.copy_ticks_range` (saved with `np.save`), so memory stays flat whatever the length of the history.
+For every chunk the strategy returns the ticks it enters on; the new positions and every position still
+open from earlier chunks are then resolved together with the same block search as the bar engines
+(`backtest.fills.resolve_exits`): longs against the bid, shorts against the ask.
+
+Open positions live in a `PositionBook`, a struct of preallocated arrays with a free list of slots, so
+opening and closing positions never allocates Python objects.
+"""
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator
+
+import numpy as np
+
+from backtest.fills import OPEN, resolve_exits
+from backtest.trades import BUY, SELL, TradeOutcomes
+from indicators import RSI
+
+
+def load_ticks(path: Path) -> np.ndarray:
+    """Memory-map a tick file written with `np.save(path, mt5.copy_ticks_range(...))`."""
+    return np.load(path, mmap_mode="r")
+
+
+def iter_chunks(ticks: np.ndarray, chunk_size: int) -> Iterator[tuple[int, np.ndarray]]:
+    """Yield (offset, chunk) pairs covering `ticks` in order."""
+    for offset in range(0, len(ticks), chunk_size):
+        yield offset, ticks[offset:offset + chunk_size]
+
+
+class PositionBook:
+    """Open positions stored as a struct of arrays, with a free list of slots.
+
+    `open` pops slots from the free list (doubling the capacity when it runs out) and `close` pushes them
+    back, so the arrays are reused across the whole run.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.direction = np.zeros(capacity, dtype=np.int8)
+        self.entry_idx = np.zeros(capacity, dtype=np.int64)
+        self.entry_price = np.zeros(capacity)
+        self.sl = np.zeros(capacity)
+        self.tp = np.zeros(capacity)
+        self.volume = np.zeros(capacity)
+        self.active = np.zeros(capacity, dtype=bool)
+        # Free slots are taken from the top of the stack
+        self._free = np.arange(capacity - 1, -1, -1, dtype=np.int64)
+        self._free_top = capacity
+
+    @property
+    def capacity(self) -> int:
+        return len(self.active)
+
+    def __len__(self) -> int:
+        return self.capacity - self._free_top
+
+    def _grow(self, needed: int):
+        old = self.capacity
+        new = max(2 * old, old + needed)
+        for name in ("direction", "entry_idx", "entry_price", "sl", "tp", "volume", "active"):
+            column = getattr(self, name)
+            grown = np.zeros(new, dtype=column.dtype)
+            grown[:old] = column
+            setattr(self, name, grown)
+        free = np.empty(new, dtype=np.int64)
+        free[:new - old] = np.arange(new - 1, old - 1, -1)
+        free[new - old:new - old + self._free_top] = self._free[:self._free_top]
+        self._free = free
+        self._free_top += new - old
+
+    def open(self, direction: np.ndarray, entry_idx: np.ndarray, entry_price: np.ndarray, sl: np.ndarray,
+             tp: np.ndarray, volume: np.ndarray) -> np.ndarray:
+        """Store new positions and return their slots."""
+        count = len(entry_idx)
+        if count > self._free_top:
+            self._grow(count - self._free_top)
+        slots = self._free[self._free_top - count:self._free_top][::-1].copy()
+        self._free_top -= count
+
+        self.direction[slots] = direction
+        self.entry_idx[slots] = entry_idx
+        self.entry_price[slots] = entry_price
+        self.sl[slots] = sl
+        self.tp[slots] = tp
+        self.volume[slots] = volume
+        self.active[slots] = True
+        return slots
+
+    def close(self, slots: np.ndarray):
+        """Release the slots of closed positions."""
+        self.active[slots] = False
+        self._free[self._free_top:self._free_top + len(slots)] = slots
+        self._free_top += len(slots)
+
+    def open_slots(self) -> np.ndarray:
+        return np.flatnonzero(self.active)
+
+
+@dataclass(frozen=True)
+class TickTrades(TradeOutcomes):
+    """Closed trades of a tick backtest, one array element per trade, in order of exit."""
+    direction: np.ndarray
+    entry_idx: np.ndarray
+    exit_idx: np.ndarray
+    entry_price: np.ndarray
+    exit_price: np.ndarray
+    volume: np.ndarray
+    outcome: np.ndarray
+
+    @property
+    def pnl(self) -> np.ndarray:
+        """Profit of every trade in price units times volume."""
+        sign = np.where(self.direction == BUY, 1.0, -1.0)
+        return sign * (self.exit_price - self.entry_price) * self.volume
+
+
+@dataclass(frozen=True)
+class TickBacktestResult:
+    trades: TickTrades
+    # Positions still open at the end of the data
+    open_positions: int
+    ticks: int
+
+
+class M1RsiCrossSignal:
+    """RSI crossover on M1 bars built from the bids, entering on the first tick after the signal bar closes.
+
+    BUY when the RSI of the closed bars crosses above `lower_bound`, SELL when it crosses below
+    `upper_bound`, as `ta.rsi_crossover_signal`. The RSI and the bar being built are carried across chunks.
+    """
+
+    def __init__(self, rsi_window: int = 14, lower_bound: float = 30, upper_bound: float = 70):
+        self.lower_bound = lower_bound
+        self.upper_bound = upper_bound
+        self._rsi = RSI(rsi_window)
+        self._minute = None
+        self._last_bid = np.nan
+
+    def __call__(self, chunk: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        minutes = chunk["time_msc"] // 60_000
+        bids = chunk["bid"]
+        # Ticks opening a new minute close the bar of the previous tick
+        boundaries = np.flatnonzero(minutes[1:] != minutes[:-1]) + 1
+        if self._minute is not None and len(chunk) and minutes[0] != self._minute:
+            boundaries = np.concatenate(([0], boundaries))
+
+        entries, directions = [], []
+        for idx in boundaries:
+            close = bids[idx - 1] if idx > 0 else self._last_bid
+            prev_value = self._rsi.value
+            value = self._rsi.update(float(close))
+            if prev_value < self.lower_bound < value:
+                entries.append(idx)
+                directions.append(BUY)
+            elif prev_value > self.upper_bound > value:
+                entries.append(idx)
+                directions.append(SELL)
+
+        if len(chunk):
+            self._minute = minutes[-1]
+            self._last_bid = bids[-1]
+        return np.asarray(entries, dtype=np.int64), np.asarray(directions, dtype=np.int8)
+
+
+def run_tick_backtest(ticks: np.ndarray, signal: Callable[[np.ndarray], tuple[np.ndarray, np.ndarray]],
+                      sl_distance: float, tp_distance: float, volume: float = 0.1, chunk_size: int = 1 << 20,
+                      capacity: int = 1024) -> TickBacktestResult:
+    """Backtest a strategy tick by tick.
+
+    Every entry returned by `signal` opens a position at the ask (BUY) or bid (SELL) of its tick, with the
+    stop-loss and take-profit `sl_distance` / `tp_distance` away from the fill. Longs close on the first
+    later bid at or beyond a level, shorts on the first later ask, at that tick's price. Positions are
+    independent of each other, as with `Backtest(..., hedging=True)`.
+
+    Args:
+        ticks (np.ndarray): Ticks in the layout of `mt5.copy_ticks_range`, e.g. from `load_ticks`.
+        signal (Callable): Called with each chunk of ticks in order; returns the indices (within the
+            chunk) of the entry ticks and their directions (`BUY` / `SELL`). May keep state between chunks.
+        sl_distance (float): Stop-loss distance from the fill price, in price units.
+        tp_distance (float): Take-profit distance from the fill price, in price units.
+        volume (float): Volume of every position.
+        chunk_size (int): Ticks processed at once.
+        capacity (int): Initial capacity of the position book.
+
+    Returns:
+        TickBacktestResult: Closed trades and the number of positions left open.
+    """
+    book = PositionBook(capacity)
+    closed = {name: [] for name in TickTrades.__dataclass_fields__}
+
+    for offset, chunk in iter_chunks(ticks, chunk_size):
+        bid = np.ascontiguousarray(chunk["bid"], dtype=np.float64)
+        ask = np.ascontiguousarray(chunk["ask"], dtype=np.float64)
+
+        entry_idx, direction = signal(chunk)
+        if len(entry_idx):
+            is_long = direction == BUY
+            price = np.where(is_long, ask[entry_idx], bid[entry_idx])
+            sign = np.where(is_long, 1.0, -1.0)
+            book.open(direction, offset + entry_idx, price, price - sign * sl_distance,
+                      price + sign * tp_distance, np.full(len(entry_idx), volume))
+
+        slots = book.open_slots()
+        if len(slots) == 0:
+            continue
+        # Positions from earlier chunks are searched from the first tick of this one
+        local_entry = np.maximum(book.entry_idx[slots] - offset, -1)
+        is_long = book.direction[slots] == BUY
+        exit_idx = np.full(len(slots), -1, dtype=np.int64)
+        outcome = np.full(len(slots), OPEN, dtype=np.int8)
+        for side, prices in ((is_long, bid), (~is_long, ask)):
+            if not side.any():
+                continue
+            exits = resolve_exits(prices, prices, local_entry[side], is_long[side], book.sl[slots[side]],
+                                  book.tp[slots[side]])
+            exit_idx[side] = exits.exit_idx
+            outcome[side] = exits.outcome
+
+        done = exit_idx >= 0
+        if not done.any():
+            continue
+        done_slots = slots[done]
+        order = np.argsort(exit_idx[done], kind="stable")
+        closed["direction"].append(book.direction[done_slots][order])
+        closed["entry_idx"].append(book.entry_idx[done_slots][order])
+        closed["exit_idx"].append(offset + exit_idx[done][order])
+        closed["entry_price"].append(book.entry_price[done_slots][order])
+        closed["exit_price"].append(np.where(is_long[done], bid[exit_idx[done]], ask[exit_idx[done]])[order])
+        closed["volume"].append(book.volume[done_slots][order])
+        closed["outcome"].append(outcome[done][order])
+        book.close(done_slots)
+
+    dtypes = {"direction": np.int8, "entry_idx": np.int64, "exit_idx": np.int64, "outcome": np.int8}
+    trades = TickTrades(**{name: np.concatenate(parts) if parts else np.empty(0, dtype=dtypes.get(name, float))
+                           for name, parts in closed.items()})
+    return TickBacktestResult(trades=trades, open_positions=len(book), ticks=len(ticks))
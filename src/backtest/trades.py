@@ -0,0 +1,127 @@
+"""
+Compact storage for large numbers of trade records.
+
+A `TradeBook` keeps every trade as one row of a NumPy structured array (`TRADE_DTYPE`, 58 bytes per trade)
+instead of one Python object per trade. A trade id is its row, so closing a trade by id is O(1); selecting
+by state or direction is a vectorized mask, and `to_frame` exposes the columns to pandas without copying.
+
+`BUY` / `SELL` are the direction codes of every trade array in `backtest`, and `TradeOutcomes` gives the
+trade containers their win / loss statistics.
+"""
+import numpy as np
+import pandas as pd
+
+from backtest.fills import LOSS, OPEN, WIN
+
+# Direction codes, as in `OrderType`
+BUY = 0
+SELL = 1
+
+
+class TradeOutcomes:
+    """Win / loss statistics of trades whose `outcome` array holds WIN, LOSS or OPEN codes."""
+    outcome: np.ndarray
+
+    @property
+    def wins(self) -> int:
+        return int(np.count_nonzero(self.outcome == WIN))
+
+    @property
+    def losses(self) -> int:
+        return int(np.count_nonzero(self.outcome == LOSS))
+
+    @property
+    def win_rate(self) -> float:
+        """Share of the closed trades that won, NaN when none closed."""
+        closed = self.wins + self.losses
+        return self.wins / closed if closed else float("nan")
+
+
+TRADE_DTYPE = np.dtype([
+    ("direction", "i1"),
+    # OPEN while the trade is running, then WIN or LOSS
+    ("state", "i1"),
+    ("entry_idx", "<i8"),
+    ("entry_price", "<f8"),
+    ("sl", "<f8"),
+    ("tp", "<f8"),
+    ("volume", "<f8"),
+    ("exit_idx", "<i8"),
+    ("exit_price", "<f8"),
+])
+
+
+class TradeBook(TradeOutcomes):
+    """Append-only book of trades backed by a structured array that doubles its capacity when full."""
+
+    def __init__(self, capacity: int = 1024):
+        self._data = np.zeros(capacity, dtype=TRADE_DTYPE)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def records(self) -> np.ndarray:
+        """View of the stored trades, indexed by trade id."""
+        return self._data[:self._size]
+
+    def _reserve(self, count: int):
+        if self._size + count > len(self._data):
+            grown = np.zeros(max(2 * len(self._data), self._size + count), dtype=TRADE_DTYPE)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+
+    def open(self, direction, entry_idx, entry_price, sl, tp, volume=1.0) -> int | np.ndarray:
+        """Add one trade (scalar arguments) or several (array arguments) and return their ids."""
+        count = np.broadcast(direction, entry_idx, entry_price, sl, tp, volume).size
+        scalar = np.ndim(entry_idx) == 0
+        self._reserve(count)
+
+        rows = self._data[self._size:self._size + count]
+        rows["direction"] = direction
+        rows["state"] = OPEN
+        rows["entry_idx"] = entry_idx
+        rows["entry_price"] = entry_price
+        rows["sl"] = sl
+        rows["tp"] = tp
+        rows["volume"] = volume
+        rows["exit_idx"] = -1
+        rows["exit_price"] = np.nan
+
+        ids = np.arange(self._size, self._size + count)
+        self._size += count
+        return int(ids[0]) if scalar else ids
+
+    def close(self, trade_id, exit_idx, exit_price, outcome):
+        """Close the trades with the given id(s), recording their exit and outcome (WIN or LOSS)."""
+        if np.any(np.asarray(trade_id) >= self._size):
+            raise IndexError(f"Unknown trade id {trade_id}")
+        self._data["exit_idx"][trade_id] = exit_idx
+        self._data["exit_price"][trade_id] = exit_price
+        self._data["state"][trade_id] = outcome
+
+    def mask(self, state: int | None = None, direction: int | None = None) -> np.ndarray:
+        """Boolean mask over the trade ids matching the given state and/or direction."""
+        selected = np.ones(self._size, dtype=bool)
+        if state is not None:
+            selected &= self.records["state"] == state
+        if direction is not None:
+            selected &= self.records["direction"] == direction
+        return selected
+
+    def ids(self, state: int | None = None, direction: int | None = None) -> np.ndarray:
+        """Ids of the trades matching the given state and/or direction."""
+        return np.flatnonzero(self.mask(state, direction))
+
+    @property
+    def outcome(self) -> np.ndarray:
+        return self.records["state"]
+
+    def to_frame(self) -> pd.DataFrame:
+        """The trades as a DataFrame indexed by trade id, whose columns are views on the book.
+
+        The frame sees later closes of these trades, but not trades opened after it was built.
+        """
+        records = self.records
+        return pd.DataFrame({name: records[name] for name in TRADE_DTYPE.names}, copy=False)
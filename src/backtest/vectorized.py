@@ -0,0 +1,89 @@
+"""
+Whole-array indicator and signal helpers shared by the vectorized backtest engines.
+
+Every function works on plain NumPy arrays, either 1-D (one series) or 2-D with time on axis 0
+(one column per series), so the same code path serves single-symbol and cross-sectional runs.
+"""
+import numpy as np
+from scipy.signal import lfilter
+
+
+def wilder_smooth(values: np.ndarray, window: int) -> np.ndarray:
+    """Apply Wilder's recursive smoothing along axis 0.
+
+    The first output is the simple mean of the first `window` values, every following output is
+    `prev * (window - 1) / window + value / window`. The recursion runs inside `scipy.signal.lfilter`,
+    so the cost is O(n) regardless of the window length.
+
+    Args:
+        values (np.ndarray): Input values with time on axis 0.
+        window (int): Smoothing period.
+
+    Returns:
+        np.ndarray: Smoothed values of length `len(values) - window + 1`, aligned with `values[window - 1:]`.
+    """
+    decay = 1.0 - 1.0 / window
+    seed = values[:window].mean(axis=0)
+    zi = np.expand_dims(decay * seed, axis=0)
+    smoothed, _ = lfilter([1.0 / window], [1.0, -decay], values[window:], axis=0, zi=zi)
+    return np.concatenate((np.expand_dims(seed, axis=0), smoothed), axis=0)
+
+
+def rsi(close: np.ndarray, window: int) -> np.ndarray:
+    """Compute the Relative Strength Index over whole arrays.
+
+    Uses Wilder's smoothing seeded with a simple average, which reproduces `talib.RSI` value for value,
+    so signals match the live `check_rsi_signal` path and the `RsiOscillator` strategy.
+
+    Args:
+        close (np.ndarray): Closing prices with time on axis 0 (1-D or 2-D).
+        window (int): RSI period.
+
+    Returns:
+        np.ndarray: RSI values with the same shape as `close`; the first `window` rows are NaN.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    out = np.full(close.shape, np.nan)
+    if close.shape[0] <= window:
+        return out
+
+    delta = np.diff(close, axis=0)
+    avg_gain = wilder_smooth(np.clip(delta, 0, None), window)
+    avg_loss = wilder_smooth(np.clip(-delta, 0, None), window)
+
+    total = avg_gain + avg_loss
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[window:] = np.where(total != 0, 100.0 * avg_gain / total, 0.0)
+    return out
+
+
+def crossed_above(series: np.ndarray, level) -> np.ndarray:
+    """Boolean mask of the rows where `series` crosses strictly above `level`.
+
+    Args:
+        series (np.ndarray): Values with time on axis 0.
+        level: Threshold, a scalar or anything broadcastable against `series[1:]`.
+
+    Returns:
+        np.ndarray: Mask shaped like `series` broadcast against `level`; the first row is always False.
+    """
+    crossed = (series[:-1] < level) & (series[1:] > level)
+    mask = np.zeros((series.shape[0],) + crossed.shape[1:], dtype=bool)
+    mask[1:] = crossed
+    return mask
+
+
+def crossed_below(series: np.ndarray, level) -> np.ndarray:
+    """Boolean mask of the rows where `series` crosses strictly below `level`.
+
+    Args:
+        series (np.ndarray): Values with time on axis 0.
+        level: Threshold, a scalar or anything broadcastable against `series[1:]`.
+
+    Returns:
+        np.ndarray: Mask shaped like `series` broadcast against `level`; the first row is always False.
+    """
+    crossed = (series[:-1] > level) & (series[1:] < level)
+    mask = np.zeros((series.shape[0],) + crossed.shape[1:], dtype=bool)
+    mask[1:] = crossed
+    return mask
@@ -0,0 +1,218 @@
+"""
+Walk-forward optimization: optimize on a training window, evaluate the best parameters on the window that
+follows it, and roll forward.
+
+Folds are independent, so they are spread over a process pool. The OHLCV data is published once to a shared
+memory segment which every worker maps at start-up; a fold task only carries its window bounds, so no copy of
+the data is pickled per task. Inside a worker `Backtest.optimize` runs serially, the parallelism being across
+folds.
+"""
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from multiprocessing import shared_memory
+from typing import Callable
+
+import backtesting
+import numpy as np
+import pandas as pd
+from backtesting import Backtest, Strategy
+
+COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+# Shared data of a pool worker: (segment, time index, {column: values})
+_worker_data = None
+
+
+@dataclass(frozen=True)
+class Fold:
+    """Bar positions of one train / test split; `*_end` are exclusive."""
+    train_start: int
+    train_end: int
+    test_start: int
+    test_end: int
+
+
+def walk_forward_folds(n_bars: int, train_bars: int, test_bars: int, anchored: bool = False) -> list[Fold]:
+    """Split `n_bars` into consecutive folds.
+
+    Every test window directly follows its training window and the windows roll forward by `test_bars`, so the
+    test windows tile the data after the first training window. Rolling folds train on the `train_bars` bars
+    before their test window; anchored folds train on everything from the first bar.
+
+    Args:
+        n_bars (int): Number of bars in the data.
+        train_bars (int): Length of the (first) training window.
+        test_bars (int): Length of every test window; the last one may be shorter.
+        anchored (bool): Grow the training window from the first bar instead of rolling it.
+
+    Returns:
+        list[Fold]: The folds in chronological order.
+    """
+    folds = []
+    for test_start in range(train_bars, n_bars, test_bars):
+        train_start = 0 if anchored else test_start - train_bars
+        folds.append(Fold(train_start, test_start, test_start, min(test_start + test_bars, n_bars)))
+    return folds
+
+
+def _publish(data: pd.DataFrame) -> tuple[shared_memory.SharedMemory, list[tuple[str, str, int]]]:
+    """Copy the time index and OHLCV columns into one shared memory segment, each in its own dtype.
+
+    Returns:
+        tuple: The segment and its layout, one (column, dtype, byte offset) per block; "time" is the index.
+    """
+    n = len(data)
+    arrays = [("time", data.index.to_numpy())] + [(column, data[column].to_numpy()) for column in COLUMNS]
+    layout = []
+    offset = 0
+    for column, values in arrays:
+        layout.append((column, values.dtype.str, offset))
+        # Blocks stay 8-byte aligned whatever the width of the columns before them
+        offset += -(-values.nbytes // 8) * 8
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for (_, values), (_, dtype, start) in zip(arrays, layout):
+        np.ndarray(n, dtype=dtype, buffer=shm.buf, offset=start)[:] = values
+    return shm, layout
+
+
+def _map(name: str, n_bars: int, layout: list[tuple[str, str, int]]):
+    """Map the shared data published by `_publish` into `_worker_data`."""
+    global _worker_data
+    # Pool workers share the resource tracker of the parent, which unlinks the segment once the pool is done
+    shm = shared_memory.SharedMemory(name=name)
+    blocks = {column: np.ndarray(n_bars, dtype=dtype, buffer=shm.buf, offset=offset)
+              for column, dtype, offset in layout}
+    _worker_data = (shm, pd.DatetimeIndex(blocks.pop("time"), name="time"), blocks)
+
+
+def _init_worker(name: str, n_bars: int, layout: list[tuple[str, str, int]]):
+    """Pool initializer: map the shared data and keep optimizations inside this worker serial.
+
+    The backtesting globals are replaced for the whole process, so this only runs in pool workers.
+    """
+    if multiprocessing.parent_process() is None:
+        raise RuntimeError("_init_worker must only run in a pool worker")
+    _map(name, n_bars, layout)
+
+    from multiprocessing.dummy import Pool
+
+    # Folds already use every core; a nested process pool per fold would oversubscribe them
+    backtesting.Pool = lambda *args, **kwargs: Pool(1)
+    # Progress bars of concurrent workers would interleave on the same terminal
+    backtesting.backtesting._tqdm = lambda seq, **kwargs: seq
+
+
+def _window(start: int, end: int) -> pd.DataFrame:
+    _, index, columns = _worker_data
+    return pd.DataFrame({column: values[start:end] for column, values in columns.items()}, index=index[start:end])
+
+
+def _run_fold(strategy: type[Strategy], param_grid: dict, maximize: str | Callable, cash: float,
+              backtest_kwargs: dict, fold: Fold) -> dict:
+    train = Backtest(_window(fold.train_start, fold.train_end), strategy, cash=cash, **backtest_kwargs)
+    train_stats = train.optimize(**param_grid, maximize=maximize)
+    params = {name: getattr(train_stats["_strategy"], name) for name in param_grid}
+
+    test = Backtest(_window(fold.test_start, fold.test_end), strategy, cash=cash, **backtest_kwargs)
+    test_stats = test.run(**params)
+    # Only what is aggregated is sent back, not the strategy instances and trade tables
+    return {
+        "fold": fold,
+        "params": params,
+        "train_return": train_stats["Return [%]"],
+        "test": {key: test_stats[key] for key in ("Return [%]", "Max. Drawdown [%]", "# Trades", "Win Rate [%]")},
+        "equity": test_stats["_equity_curve"]["Equity"],
+    }
+
+
+@dataclass(frozen=True)
+class WalkForwardResult:
+    # One row per fold: windows, chosen parameters, in-sample and out-of-sample statistics
+    folds: pd.DataFrame
+    # Out-of-sample equity of the folds chained one after the other
+    equity: pd.Series
+    # Aggregated out-of-sample statistics
+    summary: pd.Series
+
+
+def walk_forward(data: pd.DataFrame,
+                 strategy: type[Strategy],
+                 param_grid: dict,
+                 train_bars: int,
+                 test_bars: int,
+                 anchored: bool = False,
+                 maximize: str | Callable = "Return [%]",
+                 cash: float = 10_000,
+                 max_workers: int | None = None,
+                 **backtest_kwargs) -> WalkForwardResult:
+    """Run a walk-forward optimization of `strategy` over `data`, one fold per process.
+
+    Each fold runs `Backtest.optimize(**param_grid)` on its training window and `Backtest.run` with the best
+    parameters on its test window. Test windows start without indicator history, so strategies lose their
+    warm-up bars at the beginning of every test window.
+
+    Args:
+        data (pd.DataFrame): OHLCV data as passed to `Backtest`.
+        strategy (type[Strategy]): Strategy class; must be importable by the worker processes.
+        param_grid (dict): Parameter ranges passed to `Backtest.optimize`.
+        train_bars (int): Length of the (first) training window, in bars.
+        test_bars (int): Length of every test window, in bars.
+        anchored (bool): Grow the training window from the first bar instead of rolling it.
+        maximize (str | Callable): Metric optimized on every training window.
+        cash (float): Initial cash of every backtest.
+        max_workers (int, optional): Worker processes; defaults to the number of CPUs.
+        **backtest_kwargs: Other `Backtest` arguments (commission, margin, ...).
+
+    Returns:
+        WalkForwardResult: Per-fold results, the chained out-of-sample equity and its summary.
+    """
+    folds = walk_forward_folds(len(data), train_bars, test_bars, anchored)
+    if not folds:
+        raise ValueError(f"{len(data)} bars are not enough for a {train_bars}-bar training window")
+
+    shm, layout = _publish(data)
+    try:
+        workers = min(max_workers or os.cpu_count(), len(folds))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shm.name, len(data), layout)) as pool:
+            results = list(pool.map(partial(_run_fold, strategy, param_grid, maximize, cash, backtest_kwargs), folds))
+    finally:
+        shm.close()
+        shm.unlink()
+    logging.info(f"Walk-forward: {len(folds)} folds of {strategy.__name__} on {workers} processes")
+
+    rows = []
+    equity_parts = []
+    scale = 1.0
+    for result in results:
+        fold, test_stats = result["fold"], result["test"]
+        rows.append({
+            "train_start": data.index[fold.train_start],
+            "test_start": data.index[fold.test_start],
+            "test_end": data.index[fold.test_end - 1],
+            **result["params"],
+            "In-sample Return [%]": result["train_return"],
+            **test_stats,
+        })
+        # Every test window starts from `cash`; chain them as if the equity was carried over
+        fold_equity = result["equity"] / cash
+        equity_parts.append(fold_equity * scale)
+        scale *= fold_equity.iloc[-1]
+
+    table = pd.DataFrame(rows)
+    equity = pd.concat(equity_parts) * cash
+    trades = table["# Trades"].sum()
+    summary = pd.Series({
+        "Folds": len(folds),
+        "Return [%]": (equity.iloc[-1] / cash - 1) * 100,
+        "Max. Drawdown [%]": (equity / equity.cummax() - 1).min() * 100,
+        "# Trades": trades,
+        "Win Rate [%]": (table["Win Rate [%]"].fillna(0) * table["# Trades"]).sum() / trades if trades else np.nan,
+        "Profitable Folds [%]": (table["Return [%]"] > 0).mean() * 100,
+        "Avg. In-sample Return [%]": table["In-sample Return [%]"].mean(),
+    })
+    return WalkForwardResult(folds=table, equity=equity, summary=summary)
@@ -0,0 +1,138 @@
+"""
+Command line entry point:
+
+    python src/cli.py live
+    python src/cli.py backtest rsi [--plot]
+    python src/cli.py optimize emaadx [--plot]
+    python src/cli.py optimize rsi --walk-forward [--anchored] [--compact]
+    python src/cli.py download USDCAD,EURUSD M1,H4 --from 2020-01-01
+    python src/cli.py ticks EURUSD --from 2024-06-01
+
+Only argparse is imported up front. Each command imports what it needs when it runs, so the live loop never
+loads the backtesting, plotting or optimization stacks, and nothing needs a display unless `--plot` is given.
+"""
+import argparse
+import importlib
+import logging
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Backtest runners by name, in src/backtest
+RUNNERS = {
+    "rsi": "backtest.rsi",
+    "emaadx": "backtest.emaadx",
+    "support_resistance": "backtest.support_resistance",
+}
+
+DEFAULT_STORE = Path(__file__).parent.parent / "resources" / "bars"
+DEFAULT_TICK_STORE = Path(__file__).parent.parent / "resources" / "ticks"
+
+
+def run_live(args: argparse.Namespace):
+    import main
+
+    main.main()
+
+
+def run_backtest(args: argparse.Namespace):
+    runner = importlib.import_module(RUNNERS[args.strategy])
+    runner.main(optimize=args.command == "optimize", plot=args.plot, walk_forward=args.walk_forward,
+                anchored=args.anchored, compact=args.compact)
+
+
+def run_download(args: argparse.Namespace):
+    import os
+
+    from dotenv import load_dotenv
+
+    from metatrader import BarStore, BulkDownloader, MT5Connection
+    from metatrader.gateway import mt5
+
+    load_dotenv()
+    timeframes = [getattr(mt5, f"TIMEFRAME_{name.upper()}") for name in args.timeframe]
+    downloader = BulkDownloader(BarStore(args.store), max_workers=args.workers, chunk_bars=args.chunk_bars)
+    with MT5Connection(int(os.getenv("ACCOUNT_ID")), os.getenv("PASSWORD"), os.getenv("MT5_SERVER")):
+        report = downloader.run(args.symbol, timeframes, args.date_from, _date_to(args))
+    if report.failed:
+        sys.exit(f"{len(report.failed)} chunks failed; run the same command again to resume")
+
+
+def run_ticks(args: argparse.Namespace):
+    import os
+
+    from dotenv import load_dotenv
+
+    from metatrader import MT5Connection
+
+    load_dotenv()
+    date_to = _date_to(args)
+    failed = []
+    with MT5Connection(int(os.getenv("ACCOUNT_ID")), os.getenv("PASSWORD"), os.getenv("MT5_SERVER")) as connection:
+        for symbol in args.symbol:
+            if connection.download_ticks_range(args.store, symbol, args.date_from, date_to) is None:
+                failed.append(symbol)
+    if failed:
+        sys.exit(f"Failed to download {', '.join(failed)} ticks; run the same command again to resume")
+
+
+def _date_to(args: argparse.Namespace) -> datetime:
+    """End of the requested range: `--to`, or the time the command runs (UTC, like the naive dates given)."""
+    return args.date_to or datetime.now(timezone.utc)
+
+
+def _names(value: str) -> list[str]:
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description="Algo trading: live loop, backtests and data.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    live = commands.add_parser("live", help="Run the live trading loop")
+    live.set_defaults(func=run_live)
+
+    for name, description in (("backtest", "Backtest a strategy with its default parameters"),
+                              ("optimize", "Optimize a strategy's parameters, then backtest the best ones")):
+        command = commands.add_parser(name, help=description)
+        command.add_argument("strategy", choices=sorted(RUNNERS))
+        command.add_argument("--plot", action="store_true", help="Write the backtest chart under backtests/")
+        command.add_argument("--walk-forward", action="store_true",
+                             help="Optimize on rolling training windows and report the windows that follow them")
+        command.add_argument("--anchored", action="store_true",
+                             help="With --walk-forward, grow the training windows from the first bar")
+        command.add_argument("--compact", action="store_true",
+                             help="Load prices as float32 and volume as int32, about half the memory per bar")
+        command.set_defaults(func=run_backtest)
+
+    download = commands.add_parser("download", help="Download bars into the local bar store, resuming earlier runs")
+    download.add_argument("symbol", type=_names, help="Symbol, or comma-separated symbols")
+    download.add_argument("timeframe", type=_names, help="MT5 timeframe name(s), e.g. M1 or M1,H4,D1")
+    download.add_argument("--from", dest="date_from", type=datetime.fromisoformat, required=True,
+                          help="First bar time in UTC, e.g. 2024-06-01")
+    download.add_argument("--to", dest="date_to", type=datetime.fromisoformat,
+                          help="Last bar time in UTC (default: now)")
+    download.add_argument("--store", type=Path, default=DEFAULT_STORE, help="Bar store directory")
+    download.add_argument("--workers", type=int, default=4, help="Chunks downloaded at the same time")
+    download.add_argument("--chunk-bars", type=int, default=50_000, help="Maximum bars per terminal request")
+    download.set_defaults(func=run_download)
+
+    ticks = commands.add_parser("ticks", help="Download ticks into the compressed tick store, resuming earlier runs")
+    ticks.add_argument("symbol", type=_names, help="Symbol, or comma-separated symbols")
+    ticks.add_argument("--from", dest="date_from", type=datetime.fromisoformat, required=True,
+                       help="First tick time in UTC, e.g. 2024-06-01")
+    ticks.add_argument("--to", dest="date_to", type=datetime.fromisoformat,
+                       help="Last tick time in UTC (default: now)")
+    ticks.add_argument("--store", type=Path, default=DEFAULT_TICK_STORE, help="Tick store directory")
+    ticks.set_defaults(func=run_ticks)
+    return parser
+
+
+def main(argv: list[str] | None = None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s]: %(asctime)s - %(message)s")
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
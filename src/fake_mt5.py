@@ -0,0 +1,433 @@
+"""
+In-process stand-in for the MetaTrader5 module, backed by a replayable bar dataset.
+
+The real package only runs next to a Windows terminal. `FakeMetaTrader5` exposes the subset of its API used
+here (connection, rates, ticks, symbol/account info and `order_send`) over bars held in memory, so the live,
+order and download paths can be run and load-tested anywhere:
+
+    terminal = FakeTerminal.synthetic(["EURUSD", "USDCAD"], n_bars=1440, speed=1000)
+    install(terminal)  # before importing the modules that use MetaTrader5
+
+The terminal clock replays the dataset: it starts at the first bar and advances `speed` simulated seconds per
+real second (or only through `advance` when `speed` is None). A bar is visible once its open time has
+passed; until it closes it is shown flat at its open price, like a bar that has just started forming.
+Ticks are replayed from the same bars. Every call can be given a simulated latency and a failure rate.
+"""
+import random
+import sys
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+from fnmatch import fnmatch
+from typing import Iterable
+
+import numpy as np
+
+from metatrader.bar_store import RATES_DTYPE, BarStore, to_epoch
+from metatrader.resampler import timeframe_seconds
+from synthetic import TICK_DTYPE, synthetic_rates
+
+Tick = namedtuple("Tick", TICK_DTYPE.names)
+SymbolInfo = namedtuple("SymbolInfo", ["name", "visible", "digits", "point", "spread", "trade_tick_value",
+                                       "trade_tick_size", "trade_contract_size", "volume_min", "volume_max",
+                                       "volume_step", "filling_mode"])
+AccountInfo = namedtuple("AccountInfo", ["login", "server", "currency", "leverage", "balance", "equity",
+                                         "margin_free"])
+OrderSendResult = namedtuple("OrderSendResult", ["retcode", "deal", "order", "volume", "price", "bid", "ask",
+                                                 "comment", "request_id", "request"])
+
+# MT5 error code of a failed call, as returned by last_error()
+RES_E_FAIL = -1
+RES_S_OK = 1
+
+
+class FakeTerminal:
+    """Market data, account and order log behind a `FakeMetaTrader5` module."""
+
+    def __init__(self, rates: dict[str, np.ndarray], base_timeframe: int = 1, start: int | None = None,
+                 speed: float | None = 1.0, balance: float = 10_000.0, latency: float | dict[str, float] = 0.0,
+                 failure_rate: float | dict[str, float] = 0.0, seed: int = 0, digits: int = 5):
+        """
+        Args:
+            rates (dict[str, np.ndarray]): Bars per symbol in the layout of `mt5.copy_rates_*`, sorted by time.
+            base_timeframe (int): MT5 timeframe of the given bars; larger timeframes are aggregated from them.
+            start (int, optional): Initial terminal time in epoch seconds; defaults to the earliest bar.
+            speed (float | None): Simulated seconds per real second; None stops the clock between `advance` calls.
+            balance (float): Account balance.
+            latency (float | dict[str, float]): Seconds every call (or the named functions) take.
+            failure_rate (float | dict[str, float]): Probability that a call (or the named functions) fails.
+            seed (int): Seed of the failure draws.
+            digits (int): Price digits of every symbol.
+        """
+        self.rates = rates
+        self.base_seconds = timeframe_seconds(base_timeframe)
+        self.speed = speed
+        self.balance = balance
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.digits = digits
+        self.orders = []
+        self.calls = 0
+
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._aggregated = {}  # (symbol, timeframe seconds) -> (bars, index of their first base bar)
+        self._start = start if start is not None else min((int(r["time"][0]) for r in rates.values() if len(r)),
+                                                          default=0)
+        self._started_at = time.monotonic()
+        self._offset = 0.0
+
+    @classmethod
+    def synthetic(cls, symbols: Iterable[str], n_bars: int, seed: int = 0, **kwargs) -> "FakeTerminal":
+        """Terminal over seeded synthetic M1 bars, one independent random walk per symbol."""
+        rates = {symbol: synthetic_rates(n_bars, seed=seed + i) for i, symbol in enumerate(symbols)}
+        return cls(rates, base_timeframe=1, seed=seed, **kwargs)
+
+    @classmethod
+    def from_store(cls, store: BarStore, symbols: Iterable[str], timeframe: int, date_from: datetime | None = None,
+                   date_to: datetime | None = None, **kwargs) -> "FakeTerminal":
+        """Terminal replaying the bars recorded in a `BarStore`."""
+        rates = {}
+        for symbol in symbols:
+            columns = store.read_arrays(symbol, timeframe, date_from, date_to)
+            bars = np.empty(len(columns["time"]), dtype=RATES_DTYPE)
+            for name in RATES_DTYPE.names:
+                bars[name] = columns[name]
+            rates[symbol] = bars
+        return cls(rates, base_timeframe=timeframe, **kwargs)
+
+    def now(self) -> float:
+        """Current terminal time in epoch seconds."""
+        elapsed = (time.monotonic() - self._started_at) * self.speed if self.speed else 0.0
+        return self._start + self._offset + elapsed
+
+    def advance(self, seconds: float):
+        """Move the terminal clock forward."""
+        self._offset += seconds
+
+    def set_speed(self, speed: float | None):
+        """Change the clock speed from now on."""
+        self._offset = self.now() - self._start
+        self._started_at = time.monotonic()
+        self.speed = speed
+
+    def _simulate_call(self, name: str) -> bool:
+        """Apply the latency of `name` and draw whether it fails; returns True when the call succeeds."""
+        with self._lock:
+            self.calls += 1
+            failure_rate = self.failure_rate.get(name, 0.0) if isinstance(self.failure_rate, dict) \
+                else self.failure_rate
+            failed = failure_rate > 0 and self._random.random() < failure_rate
+        latency = self.latency.get(name, 0.0) if isinstance(self.latency, dict) else self.latency
+        if latency > 0:
+            time.sleep(latency)
+        return not failed
+
+    def _bars(self, symbol: str, seconds: int) -> tuple[np.ndarray, np.ndarray]:
+        """Every bar of `symbol` lasting `seconds` with the index of the base bar each one starts at."""
+        key = (symbol, seconds)
+        if key not in self._aggregated:
+            base = self.rates[symbol]
+            if seconds == self.base_seconds:
+                self._aggregated[key] = (base, np.arange(len(base)))
+            else:
+                bucket_time = base["time"] - base["time"] % seconds
+                starts = np.flatnonzero(np.r_[True, bucket_time[1:] != bucket_time[:-1]])
+                bars = np.zeros(len(starts), dtype=RATES_DTYPE)
+                bars["time"] = bucket_time[starts]
+                bars["open"] = base["open"][starts]
+                bars["high"] = np.maximum.reduceat(base["high"], starts)
+                bars["low"] = np.minimum.reduceat(base["low"], starts)
+                bars["close"] = base["close"][np.r_[starts[1:], len(base)] - 1]
+                bars["tick_volume"] = np.add.reduceat(base["tick_volume"], starts)
+                bars["spread"] = base["spread"][starts]
+                self._aggregated[key] = (bars, starts)
+        return self._aggregated[key]
+
+    def visible_rates(self, symbol: str, timeframe: int | None = None) -> np.ndarray | None:
+        """Bars of `symbol` opened by the current terminal time; the newest one only holds what has happened.
+
+        Args:
+            symbol (str): Symbol name.
+            timeframe (int, optional): MT5 timeframe, at least the base timeframe; the base bars when None.
+
+        Returns:
+            np.ndarray | None: Visible bars, None for an unknown symbol.
+        """
+        if symbol not in self.rates:
+            return None
+        seconds = self.base_seconds if timeframe is None else max(timeframe_seconds(timeframe), self.base_seconds)
+        bars, starts = self._bars(symbol, seconds)
+        now = self.now()
+        count = int(np.searchsorted(bars["time"], now, side="right"))
+        if count == 0:
+            return bars[:0]
+
+        base = self.rates[symbol]
+        opened = int(np.searchsorted(base["time"], now, side="right"))
+        forming = base["time"][opened - 1] + self.base_seconds > now
+        last_end = int(starts[count]) if count < len(bars) else len(base)
+        if not forming and opened == last_end:
+            return bars[:count]
+
+        # Rebuild the newest bar from its closed base bars and the open of the forming one
+        closed = base[int(starts[count - 1]):opened - 1 if forming else opened]
+        last = bars[count - 1].copy()
+        highs, lows = list(closed["high"][-1:]), list(closed["low"][-1:])
+        if len(closed):
+            highs[0], lows[0] = closed["high"].max(), closed["low"].min()
+        if forming:
+            highs.append(base["open"][opened - 1])
+            lows.append(base["open"][opened - 1])
+        last["high"], last["low"] = max(highs), min(lows)
+        last["close"] = base["open"][opened - 1] if forming else closed["close"][-1]
+        last["tick_volume"] = closed["tick_volume"].sum() + int(forming)
+
+        visible = bars[:count].copy()
+        visible[-1] = last
+        return visible
+
+    def last_price(self, symbol: str) -> tuple[int, float, float] | None:
+        """Time, bid and ask of the latest quote of `symbol`."""
+        rates = self.visible_rates(symbol)
+        if rates is None or len(rates) == 0:
+            return None
+        point = 10.0 ** -self.digits
+        bid = float(rates["close"][-1])
+        return int(self.now()), bid, round(bid + max(int(rates["spread"][-1]), 1) * point, self.digits)
+
+    def ticks(self, symbol: str, start_msc: int, end_msc: int) -> np.ndarray | None:
+        """Quotes of `symbol` within [start_msc, end_msc] (epoch milliseconds) that have already happened.
+
+        Every closed base bar is replayed as four quotes at quarters of the bar: its open, its low and high (the
+        high first on a down bar) and its close. The forming bar only has its open quote, as in `visible_rates`.
+
+        Returns:
+            np.ndarray | None: Ticks in the layout of `mt5.copy_ticks_*`, None for an unknown symbol.
+        """
+        if symbol not in self.rates:
+            return None
+        base = self.rates[symbol]
+        now = self.now()
+        bars = base[:int(np.searchsorted(base["time"], now, side="right"))]
+
+        up = bars["close"] >= bars["open"]
+        prices = np.stack((bars["open"], np.where(up, bars["low"], bars["high"]),
+                           np.where(up, bars["high"], bars["low"]), bars["close"]), axis=1)
+        times = bars["time"].astype(np.int64)[:, np.newaxis] * 1000 + np.arange(4) * self.base_seconds * 250
+        happened = np.ones(times.shape, dtype=bool)
+        if len(bars) and bars["time"][-1] + self.base_seconds > now:
+            happened[-1, 1:] = False
+        selected = happened & (times >= start_msc) & (times <= end_msc)
+
+        point = 10.0 ** -self.digits
+        ticks = np.zeros(np.count_nonzero(selected), dtype=TICK_DTYPE)
+        ticks["time_msc"] = times[selected]
+        ticks["time"] = ticks["time_msc"] // 1000
+        ticks["bid"] = prices[selected]
+        spreads = np.broadcast_to(np.maximum(bars["spread"], 1)[:, np.newaxis], times.shape)[selected]
+        ticks["ask"] = np.round(ticks["bid"] + spreads * point, self.digits)
+        ticks["flags"] = 6
+        return ticks
+
+    def record_order(self, request: dict, price: float) -> int:
+        with self._lock:
+            self.orders.append({**request, "fill_price": price, "time": int(self.now())})
+            return len(self.orders)
+
+
+class FakeMetaTrader5:
+    """Module-like object with the MetaTrader5 constants and the functions of a `FakeTerminal`."""
+
+    TIMEFRAME_M1, TIMEFRAME_M2, TIMEFRAME_M3, TIMEFRAME_M4, TIMEFRAME_M5, TIMEFRAME_M6 = 1, 2, 3, 4, 5, 6
+    TIMEFRAME_M10, TIMEFRAME_M12, TIMEFRAME_M15, TIMEFRAME_M20, TIMEFRAME_M30 = 10, 12, 15, 20, 30
+    TIMEFRAME_H1, TIMEFRAME_H2, TIMEFRAME_H3, TIMEFRAME_H4 = 0x4001, 0x4002, 0x4003, 0x4004
+    TIMEFRAME_H6, TIMEFRAME_H8, TIMEFRAME_H12 = 0x4006, 0x4008, 0x400C
+    TIMEFRAME_D1, TIMEFRAME_W1, TIMEFRAME_MN1 = 0x4018, 0x8001, 0xC001
+
+    ORDER_TYPE_BUY, ORDER_TYPE_SELL = 0, 1
+    TRADE_ACTION_DEAL = 1
+    ORDER_TIME_GTC = 0
+    ORDER_FILLING_FOK, ORDER_FILLING_IOC, ORDER_FILLING_RETURN = 0, 1, 2
+    SYMBOL_FILLING_FOK, SYMBOL_FILLING_IOC = 1, 2
+    COPY_TICKS_ALL, COPY_TICKS_INFO, COPY_TICKS_TRADE = -1, 1, 2
+
+    TRADE_RETCODE_REQUOTE = 10004
+    TRADE_RETCODE_REJECT = 10006
+    TRADE_RETCODE_DONE = 10009
+    TRADE_RETCODE_INVALID = 10013
+    TRADE_RETCODE_INVALID_VOLUME = 10014
+    TRADE_RETCODE_INVALID_FILL = 10030
+
+    def __init__(self, terminal: FakeTerminal, filling_modes: Iterable[int] = (0, 1)):
+        """
+        Args:
+            terminal (FakeTerminal): Data and clock served by the module.
+            filling_modes (Iterable[int]): ORDER_FILLING_* modes accepted by `order_send`; others get
+                TRADE_RETCODE_INVALID_FILL.
+        """
+        self.terminal = terminal
+        self.filling_modes = set(filling_modes)
+        self._last_error = (RES_S_OK, "Success")
+        self._account = None
+
+    def _call(self, name: str) -> bool:
+        succeeded = self.terminal._simulate_call(name)
+        self._last_error = (RES_S_OK, "Success") if succeeded else (RES_E_FAIL, f"Terminal: {name} failed")
+        return succeeded
+
+    # Connection
+    def initialize(self, *args, **kwargs) -> bool:
+        return self._call("initialize")
+
+    def login(self, login: int, password: str = "", server: str = "", timeout: int = 60_000) -> bool:
+        if not self._call("login"):
+            return False
+        self._account = (login, server)
+        return True
+
+    def shutdown(self):
+        self._account = None
+
+    def last_error(self) -> tuple[int, str]:
+        return self._last_error
+
+    def version(self) -> tuple[int, int, str]:
+        return 500, 0, "fake"
+
+    # Market data
+    def copy_rates_from_pos(self, symbol: str, timeframe: int, start_pos: int, count: int) -> np.ndarray | None:
+        if not self._call("copy_rates_from_pos"):
+            return None
+        rates = self.terminal.visible_rates(symbol, timeframe)
+        if rates is None:
+            return None
+        end = len(rates) - start_pos
+        return rates[max(end - count, 0):max(end, 0)]
+
+    def copy_rates_from(self, symbol: str, timeframe: int, date_from, count: int) -> np.ndarray | None:
+        if not self._call("copy_rates_from"):
+            return None
+        rates = self.terminal.visible_rates(symbol, timeframe)
+        if rates is None:
+            return None
+        end = int(np.searchsorted(rates["time"], to_epoch(date_from), side="right"))
+        return rates[max(end - count, 0):end]
+
+    def copy_rates_range(self, symbol: str, timeframe: int, date_from, date_to) -> np.ndarray | None:
+        if not self._call("copy_rates_range"):
+            return None
+        rates = self.terminal.visible_rates(symbol, timeframe)
+        if rates is None:
+            return None
+        times = rates["time"]
+        return rates[np.searchsorted(times, to_epoch(date_from)):np.searchsorted(times, to_epoch(date_to), "right")]
+
+    def copy_ticks_range(self, symbol: str, date_from, date_to, flags: int) -> np.ndarray | None:
+        if not self._call("copy_ticks_range"):
+            return None
+        return self.terminal.ticks(symbol, _to_msc(date_from), _to_msc(date_to))
+
+    def symbol_info_tick(self, symbol: str) -> Tick | None:
+        if not self._call("symbol_info_tick"):
+            return None
+        quote = self.terminal.last_price(symbol)
+        if quote is None:
+            return None
+        tick_time, bid, ask = quote
+        return Tick(time=tick_time, bid=bid, ask=ask, last=0.0, volume=0, time_msc=int(self.terminal.now() * 1000),
+                    flags=6, volume_real=0.0)
+
+    # Symbols and account
+    def symbols_total(self) -> int:
+        if not self._call("symbols_total"):
+            return 0
+        return len(self.terminal.rates)
+
+    def symbols_get(self, group: str = "*") -> tuple[SymbolInfo, ...] | None:
+        """Symbols matching `group`: comma-separated patterns, those starting with "!" excluding, as in MT5."""
+        if not self._call("symbols_get"):
+            return None
+        selected = []
+        for symbol in self.terminal.rates:
+            matched = False
+            for pattern in group.split(","):
+                if pattern.startswith("!"):
+                    matched = matched and not fnmatch(symbol, pattern[1:])
+                else:
+                    matched = matched or fnmatch(symbol, pattern)
+            if matched:
+                selected.append(self._symbol_info(symbol))
+        return tuple(selected)
+
+    def symbol_info(self, symbol: str) -> SymbolInfo | None:
+        if not self._call("symbol_info") or symbol not in self.terminal.rates:
+            return None
+        return self._symbol_info(symbol)
+
+    def symbol_select(self, symbol: str, enable: bool = True) -> bool:
+        return self._call("symbol_select") and symbol in self.terminal.rates
+
+    def _symbol_info(self, symbol: str) -> SymbolInfo:
+        point = 10.0 ** -self.terminal.digits
+        return SymbolInfo(name=symbol, visible=True, digits=self.terminal.digits, point=point, spread=1,
+                          trade_tick_value=1.0, trade_tick_size=point, trade_contract_size=100_000.0,
+                          volume_min=0.01, volume_max=100.0, volume_step=0.01,
+                          filling_mode=self.SYMBOL_FILLING_FOK)
+
+    def account_info(self) -> AccountInfo | None:
+        if not self._call("account_info") or self._account is None:
+            return None
+        login, server = self._account
+        balance = self.terminal.balance
+        return AccountInfo(login=login, server=server, currency="USD", leverage=100, balance=balance,
+                           equity=balance, margin_free=balance)
+
+    # Trading
+    def order_send(self, request: dict) -> OrderSendResult | None:
+        def result(retcode: int, price: float = 0.0, deal: int = 0) -> OrderSendResult:
+            return OrderSendResult(retcode=retcode, deal=deal, order=deal, volume=request.get("volume", 0.0),
+                                   price=price, bid=bid, ask=ask, comment="", request_id=0, request=request)
+
+        quote = self.terminal.last_price(request.get("symbol", ""))
+        bid, ask = (quote[1], quote[2]) if quote is not None else (0.0, 0.0)
+        if not self._call("order_send"):
+            return result(self.TRADE_RETCODE_REJECT)
+        if quote is None or request.get("action") != self.TRADE_ACTION_DEAL:
+            return result(self.TRADE_RETCODE_INVALID)
+        if request.get("type_filling") not in self.filling_modes:
+            return result(self.TRADE_RETCODE_INVALID_FILL)
+        if not 0.01 <= request.get("volume", 0.0) <= 100.0:
+            return result(self.TRADE_RETCODE_INVALID_VOLUME)
+
+        price = ask if request.get("type") == self.ORDER_TYPE_BUY else bid
+        point = 10.0 ** -self.terminal.digits
+        if abs(price - request.get("price", price)) > request.get("deviation", 0) * point + 1e-12:
+            return result(self.TRADE_RETCODE_REQUOTE)
+
+        deal = self.terminal.record_order(request, price)
+        return result(self.TRADE_RETCODE_DONE, price=price, deal=deal)
+
+
+def _to_msc(value) -> int:
+    """Epoch milliseconds of a datetime (naive values are taken as UTC, like MT5 does) or of epoch seconds."""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return round(value.timestamp() * 1000)
+    return int(value) * 1000
+
+
+def install(terminal: FakeTerminal, **kwargs) -> FakeMetaTrader5:
+    """Serve `import MetaTrader5` with a fake module over `terminal`.
+
+    Call before importing the modules that use MetaTrader5; the MT5 gateway is re-pointed when it was
+    already imported.
+    """
+    module = FakeMetaTrader5(terminal, **kwargs)
+    sys.modules["MetaTrader5"] = module
+    gateway = sys.modules.get("metatrader.gateway")
+    if gateway is not None:
+        gateway.mt5._module = module
+    return module
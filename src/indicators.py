@@ -0,0 +1,375 @@
+"""
+Streaming indicators that keep their smoothing state and update in constant time per closed bar.
+
+Each indicator is seeded the same way TA-Lib seeds it, so once warmed up on the same history the
+streaming values match `talib.RSI`, `talib.EMA` and `talib.ADX`. Until enough bars have been seen,
+`value` is NaN and `ready` is False.
+
+`SupportResistanceLevels` confirms swing highs and lows as bars arrive and keeps them in a sorted
+`LevelIndex`, and `support_resistance_orders` turns them into the orders of the support / resistance
+strategy, both in the backtest and in the live loop.
+"""
+import bisect
+import math
+from collections import deque
+from typing import Iterable
+
+# Values TA-Lib treats as zero when dividing
+_EPSILON = 1e-14
+
+
+class RSI:
+    """Relative Strength Index with Wilder's smoothing, seeded with the average of the first `period` changes."""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.value = math.nan
+        self.prev_value = math.nan
+        self._prev_close = math.nan
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+        self._count = 0
+
+    @property
+    def ready(self) -> bool:
+        return not math.isnan(self.value)
+
+    def update(self, close: float) -> float:
+        """Feed the close of a new bar and return the updated RSI."""
+        if self._count > 0:
+            change = close - self._prev_close
+            gain = change if change > 0 else 0.0
+            loss = -change if change < 0 else 0.0
+
+            if self._count <= self.period:
+                # Seeding: accumulate the first `period` changes
+                self._avg_gain += gain / self.period
+                self._avg_loss += loss / self.period
+            else:
+                self._avg_gain = (self._avg_gain * (self.period - 1) + gain) / self.period
+                self._avg_loss = (self._avg_loss * (self.period - 1) + loss) / self.period
+
+            if self._count >= self.period:
+                total = self._avg_gain + self._avg_loss
+                self.prev_value = self.value
+                self.value = 100.0 * self._avg_gain / total if abs(total) > _EPSILON else 0.0
+
+        self._prev_close = close
+        self._count += 1
+        return self.value
+
+    def update_many(self, closes: Iterable[float]) -> float:
+        """Feed several closes in order and return the last RSI."""
+        for close in closes:
+            self.update(float(close))
+        return self.value
+
+
+class EMA:
+    """Exponential moving average seeded with the simple average of the first `period` values."""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self.value = math.nan
+        self._sum = 0.0
+        self._count = 0
+
+    @property
+    def ready(self) -> bool:
+        return not math.isnan(self.value)
+
+    def update(self, price: float) -> float:
+        """Feed a new value and return the updated EMA."""
+        self._count += 1
+        if self._count < self.period:
+            self._sum += price
+        elif self._count == self.period:
+            self.value = (self._sum + price) / self.period
+        else:
+            self.value += self.alpha * (price - self.value)
+        return self.value
+
+    def update_many(self, prices: Iterable[float]) -> float:
+        """Feed several values in order and return the last EMA."""
+        for price in prices:
+            self.update(float(price))
+        return self.value
+
+
+class ADX:
+    """Average Directional Movement Index (Wilder), first available after `2 * period` bars."""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.value = math.nan
+        self.prev_value = math.nan
+        self._prev_high = math.nan
+        self._prev_low = math.nan
+        self._prev_close = math.nan
+        self._plus_dm = 0.0
+        self._minus_dm = 0.0
+        self._tr = 0.0
+        self._sum_dx = 0.0
+        self._count = 0
+
+    @property
+    def ready(self) -> bool:
+        return not math.isnan(self.value)
+
+    def _dx(self) -> float | None:
+        if abs(self._tr) <= _EPSILON:
+            return None
+        plus_di = 100.0 * self._plus_dm / self._tr
+        minus_di = 100.0 * self._minus_dm / self._tr
+        total = plus_di + minus_di
+        if abs(total) <= _EPSILON:
+            return None
+        return 100.0 * abs(minus_di - plus_di) / total
+
+    def update(self, high: float, low: float, close: float) -> float:
+        """Feed the high, low and close of a new bar and return the updated ADX."""
+        if self._count > 0:
+            diff_plus = high - self._prev_high
+            diff_minus = self._prev_low - low
+            plus_dm = diff_plus if diff_plus > 0 and diff_plus > diff_minus else 0.0
+            minus_dm = diff_minus if diff_minus > 0 and diff_plus < diff_minus else 0.0
+            true_range = max(high, self._prev_close) - min(low, self._prev_close)
+
+            if self._count < self.period:
+                # Seeding: plain sums of the first `period - 1` movements
+                self._plus_dm += plus_dm
+                self._minus_dm += minus_dm
+                self._tr += true_range
+            else:
+                self._plus_dm += plus_dm - self._plus_dm / self.period
+                self._minus_dm += minus_dm - self._minus_dm / self.period
+                self._tr += true_range - self._tr / self.period
+
+                dx = self._dx()
+                if self._count < 2 * self.period:
+                    # Seeding: the first ADX is the average of `period` DX values
+                    if dx is not None:
+                        self._sum_dx += dx
+                    if self._count == 2 * self.period - 1:
+                        self.value = self._sum_dx / self.period
+                elif dx is not None:
+                    self.prev_value = self.value
+                    self.value = (self.value * (self.period - 1) + dx) / self.period
+
+        self._prev_high = high
+        self._prev_low = low
+        self._prev_close = close
+        self._count += 1
+        return self.value
+
+    def update_many(self, highs: Iterable[float], lows: Iterable[float], closes: Iterable[float]) -> float:
+        """Feed several bars in order and return the last ADX."""
+        for high, low, close in zip(highs, lows, closes):
+            self.update(float(high), float(low), float(close))
+        return self.value
+
+
+class RollingMax:
+    """Maximum over the last `window` values, kept in a monotonic deque (amortized O(1) per update)."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self._values = deque()  # (index, value) pairs with decreasing values
+        self._count = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._count >= self.window
+
+    @property
+    def value(self) -> float:
+        return self._values[0][1] if self._values else math.nan
+
+    def _dominates(self, new: float, old: float) -> bool:
+        return new >= old
+
+    def update(self, value: float) -> float:
+        """Feed a new value and return the extreme over the window."""
+        while self._values and self._dominates(value, self._values[-1][1]):
+            self._values.pop()
+        self._values.append((self._count, value))
+        if self._values[0][0] <= self._count - self.window:
+            self._values.popleft()
+        self._count += 1
+        return self.value
+
+    def update_many(self, values: Iterable[float]) -> float:
+        """Feed several values in order and return the last extreme."""
+        for value in values:
+            self.update(float(value))
+        return self.value
+
+
+class RollingMin(RollingMax):
+    """Minimum over the last `window` values, kept in a monotonic deque (amortized O(1) per update)."""
+
+    def _dominates(self, new: float, old: float) -> bool:
+        return new <= old
+
+
+class PeakDetector:
+    """Causal counterpart of `scipy.signal.find_peaks(values, distance=window, prominence=prominence)`.
+
+    A bar is a peak when its value is the highest of the `window` bars on each side of it, so it is
+    confirmed `window` bars after it closed. Its prominence is measured within that same span: the value
+    minus the higher of the lowest value on its left and the lowest value on its right.
+    """
+
+    def __init__(self, window: int, prominence: float = 0.0):
+        # Optimizers pass NumPy integers, which deque does not take as a length
+        window = int(window)
+        self.window = window
+        self.prominence = prominence
+        # (value, payload) of the last `2 * window + 1` bars; the candidate is in the middle
+        self._bars = deque(maxlen=2 * window + 1)
+        self._max = RollingMax(2 * window + 1)
+        self._right_min = RollingMin(window + 1)
+        # Lowest value of the `window + 1` bars ending at each of the last `window + 1` bars
+        self._left_mins = deque(maxlen=window + 1)
+        self._last_peak = -math.inf
+        self._count = 0
+
+    def update(self, value: float, payload=None):
+        """Feed the value of a new bar; returns the payload of the bar confirmed as a peak, else None.
+
+        The payload defaults to the value itself.
+        """
+        self._bars.append((value, value if payload is None else payload))
+        self._max.update(value)
+        self._left_mins.append(self._right_min.update(value))
+        self._count += 1
+        if self._count < 2 * self.window + 1:
+            return None
+
+        center = self._count - self.window - 1
+        center_value, center_payload = self._bars[self.window]
+        if center_value < self._max.value or center - self._last_peak <= self.window:
+            return None
+        base = max(self._left_mins[0], self._right_min.value)
+        if center_value - base < self.prominence:
+            return None
+        self._last_peak = center
+        return center_payload
+
+
+class LevelIndex:
+    """Price levels kept sorted, with the bar each was confirmed on.
+
+    Lookups are binary searches (O(log n)); inserting and expiring a level are a binary search plus a
+    list move, which stays cheaper than a tree for the few hundred levels a chart holds. Levels older
+    than `max_age` bars are dropped as new bars arrive.
+    """
+
+    def __init__(self, max_age: int | None = None):
+        self.max_age = max_age
+        self._prices = []
+        # (bar, price) in the order the levels were added, i.e. by age
+        self._added = deque()
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def __getitem__(self, idx: int) -> float:
+        return self._prices[idx]
+
+    def __iter__(self):
+        return iter(self._prices)
+
+    def add(self, price: float, bar: int):
+        bisect.insort(self._prices, price)
+        self._added.append((bar, price))
+
+    def expire(self, bar: int):
+        """Drop the levels added more than `max_age` bars before `bar`."""
+        if self.max_age is None:
+            return
+        while self._added and self._added[0][0] < bar - self.max_age:
+            _, price = self._added.popleft()
+            del self._prices[bisect.bisect_left(self._prices, price)]
+
+    def bisect(self, price: float) -> int:
+        """Position of `price` among the levels, as `np.searchsorted(levels, price)`."""
+        return bisect.bisect_left(self._prices, price)
+
+    def neighbors(self, price: float) -> tuple[float, float]:
+        """The closest level below `price` and the closest level at or above it, NaN where there is none."""
+        idx = self.bisect(price)
+        below = self._prices[idx - 1] if idx > 0 else math.nan
+        above = self._prices[idx] if idx < len(self._prices) else math.nan
+        return below, above
+
+
+class SupportResistanceLevels:
+    """Support and resistance levels confirmed bar by bar.
+
+    Swing lows of the lows are supports and swing highs of the highs are resistances (see `PeakDetector`);
+    either way the level is the close of the swing bar. Both go into one `LevelIndex`.
+    """
+
+    def __init__(self, window: int, prominence: float = 0.0, max_age: int | None = None):
+        self._supports = PeakDetector(window, prominence)
+        self._resistances = PeakDetector(window, prominence)
+        self.levels = LevelIndex(max_age)
+        self._count = 0
+
+    def update(self, high: float, low: float, close: float) -> LevelIndex:
+        """Feed the high, low and close of a new bar and return the updated levels."""
+        bar = self._count
+        self._count += 1
+        self.levels.expire(bar)
+        for level in (self._supports.update(-low, close), self._resistances.update(high, close)):
+            if level is not None:
+                self.levels.add(level, bar)
+        return self.levels
+
+    def update_many(self, highs: Iterable[float], lows: Iterable[float], closes: Iterable[float]) -> LevelIndex:
+        """Feed several bars in order and return the levels."""
+        for high, low, close in zip(highs, lows, closes):
+            self.update(float(high), float(low), float(close))
+        return self.levels
+
+
+def support_resistance_orders(levels: LevelIndex, price: float, prev_price: float,
+                              level_pad: float) -> list[tuple[str, float, float]]:
+    """Orders of the support / resistance strategy for the latest close, given the levels known so far.
+
+    Between two levels, a close within `level_pad` under the upper one after a close around it sells back
+    towards the lower one, and the mirror case buys; below the lowest level a break of more than `level_pad`
+    sells. Orders whose stop-loss and take-profit are not on either side of `price` are left out.
+
+    Args:
+        levels (LevelIndex): Support and resistance levels, sorted.
+        price (float): Close of the latest bar.
+        prev_price (float): Close of the bar before it.
+        level_pad (float): Distance around a level within which the price touches it.
+
+    Returns:
+        list[tuple[str, float, float]]: ("BUY" or "SELL", stop-loss, take-profit) of every order to place.
+    """
+    if not len(levels):
+        return []
+
+    orders = []
+    idx = levels.bisect(price)
+    if idx == 0:
+        if price < levels[idx] - level_pad:
+            orders.append(("SELL", levels[idx] + level_pad, levels[idx] - 4 * level_pad))
+    elif idx == len(levels):
+        if price > levels[idx - 1] + level_pad:
+            orders.append(("SELL", levels[idx - 1] - level_pad, levels[idx - 1] + 4 * level_pad))
+    else:
+        low = levels[idx - 1]
+        high = levels[idx]
+        if price > high - level_pad and high - level_pad <= prev_price <= high + level_pad:
+            orders.append(("SELL", high + level_pad, low + level_pad))
+        if price < low + level_pad and low - level_pad <= prev_price <= low + level_pad:
+            orders.append(("BUY", low - level_pad, high - level_pad))
+
+    return [(action, sl, tp) for action, sl, tp in orders
+            if (tp < price < sl if action == "SELL" else sl < price < tp)]
@@ -0,0 +1,162 @@
+"""
+Per-stage latency histograms for the live trading pipeline.
+
+Stages are timed with `span`, which feeds a histogram per (stage, symbol):
+
+    with span("fetch_rates", symbol):
+        rates = mt5.copy_rates_from_pos(...)
+
+Durations are counted in log-spaced buckets (8 per doubling, so quantiles are within ~9%) and the exact
+maximum is kept. Timing is off until `recorder.sample_rate` is set above 0; while off, `span` returns a
+shared no-op context manager.
+
+A report takes `recorder.summary(reset=True)`, so its quantiles and maximum cover the spans since the
+previous report, while the count and sum of every (stage, symbol) keep growing as Prometheus counters do.
+"""
+import logging
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+from pathlib import Path
+
+# Buckets per doubling of the duration in nanoseconds
+_BUCKETS_PER_OCTAVE = 8
+
+_NOOP = nullcontext()
+
+
+class LatencyHistogram:
+    """Log-bucketed histogram of durations in nanoseconds."""
+
+    def __init__(self):
+        self.counts = defaultdict(int)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, duration_ns: int):
+        self.counts[int(math.log2(max(duration_ns, 1)) * _BUCKETS_PER_OCTAVE)] += 1
+        self.count += 1
+        self.total_ns += duration_ns
+        self.max_ns = max(self.max_ns, duration_ns)
+
+    def quantile(self, q: float) -> float:
+        """Upper edge (in seconds) of the bucket holding the `q` quantile, capped at the maximum."""
+        if not self.count:
+            return math.nan
+        rank = q * self.count
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(2 ** ((bucket + 1) / _BUCKETS_PER_OCTAVE), self.max_ns) / 1e9
+        return self.max_ns / 1e9
+
+
+class _Span:
+    __slots__ = ("recorder", "key", "started")
+
+    def __init__(self, recorder, key):
+        self.recorder = recorder
+        self.key = key
+
+    def __enter__(self):
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.recorder.record(self.key, time.perf_counter_ns() - self.started)
+        return False
+
+
+class LatencyRecorder:
+    """Collects latency histograms per (stage, symbol) from any thread."""
+
+    def __init__(self, sample_rate: float = 0.0):
+        """
+        Args:
+            sample_rate (float): Fraction of spans that are timed; 0 turns timing off.
+        """
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        # Spans since the last reset
+        self._histograms = defaultdict(LatencyHistogram)
+        # [count, total_ns] of every span since the recorder was created
+        self._totals = defaultdict(lambda: [0, 0])
+
+    def span(self, stage: str, symbol: str | None = None):
+        """Context manager timing one execution of `stage` for `symbol` (None for account-wide stages)."""
+        if self.sample_rate <= 0 or (self.sample_rate < 1 and random.random() >= self.sample_rate):
+            return _NOOP
+        return _Span(self, (stage, symbol or "*"))
+
+    def record(self, key: tuple[str, str], duration_ns: int):
+        with self._lock:
+            self._histograms[key].record(duration_ns)
+            totals = self._totals[key]
+            totals[0] += 1
+            totals[1] += duration_ns
+
+    def summary(self, reset: bool = False) -> dict[tuple[str, str], dict]:
+        """Statistics (durations in seconds) per (stage, symbol).
+
+        "count", "p50", "p99" and "max" cover the spans since the last reset; "total_count" and "total_sum" every
+        span since the recorder was created.
+
+        Args:
+            reset (bool): Start a new window of spans once the current one is summarized.
+        """
+        with self._lock:
+            histograms = self._histograms
+            if reset:
+                self._histograms = defaultdict(LatencyHistogram)
+            # Stages without spans in this window keep their totals, with NaN quantiles
+            empty = LatencyHistogram()
+            return {
+                key: {"count": h.count, "p50": h.quantile(0.5), "p99": h.quantile(0.99),
+                      "max": h.max_ns / 1e9 if h.count else math.nan, "total_count": count, "total_sum": total_ns / 1e9}
+                for key, (count, total_ns) in sorted(self._totals.items())
+                for h in (histograms.get(key, empty),)
+            }
+
+    def log_summary(self, summary: dict | None = None):
+        """Log `summary` (by default the current one, without resetting it)."""
+        for (stage, symbol), stats in (summary or self.summary()).items():
+            if not stats["count"]:
+                continue
+            logging.info(f"Latency {stage} [{symbol}]: n={stats['count']} p50={stats['p50'] * 1e3:.3f}ms "
+                         f"p99={stats['p99'] * 1e3:.3f}ms max={stats['max'] * 1e3:.3f}ms")
+
+    def write(self, path: Path, summary: dict | None = None):
+        """Write `summary` (by default the current one) in the Prometheus text exposition format, replacing the
+        previous file."""
+        lines = ["# TYPE mtang_stage_latency_seconds summary"]
+        for (stage, symbol), stats in (summary or self.summary()).items():
+            labels = f'stage="{stage}",symbol="{symbol}"'
+            lines.append(f'mtang_stage_latency_seconds{{{labels},quantile="0.5"}} {stats["p50"]:.9f}')
+            lines.append(f'mtang_stage_latency_seconds{{{labels},quantile="0.99"}} {stats["p99"]:.9f}')
+            lines.append(f'mtang_stage_latency_seconds{{{labels},quantile="1"}} {stats["max"]:.9f}')
+            lines.append(f"mtang_stage_latency_seconds_sum{{{labels}}} {stats['total_sum']:.9f}")
+            lines.append(f"mtang_stage_latency_seconds_count{{{labels}}} {stats['total_count']}")
+
+        path = Path(path)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text("\n".join(lines) + "\n")
+        tmp_path.replace(path)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._totals.clear()
+
+
+# Recorder used by the live pipeline
+recorder = LatencyRecorder()
+
+
+def span(stage: str, symbol: str | None = None):
+    """Time `stage` for `symbol` in the default recorder."""
+    return recorder.span(stage, symbol)
@@ -0,0 +1,6 @@
+"""
+This module contains the building blocks of the live trading loop.
+"""
+
+from live.scheduler import MultiSymbolScheduler, StrategyJob, load_jobs
+from live.trigger import BarCloseEvent, BarCloseTrigger
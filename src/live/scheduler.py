@@ -0,0 +1,118 @@
+import json
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from latency import span
+from metatrader.gateway import mt5
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StrategyJob:
+    """One strategy evaluation per cycle: a symbol, a timeframe and the strategy parameters."""
+    symbol: str
+    timeframe: int
+    params: dict = field(default_factory=dict)
+
+
+def load_jobs(config_path: Path) -> list[StrategyJob]:
+    """Load strategy jobs from a JSON config.
+
+    The config is a list of objects with a "symbol", a "timeframe" given as an MT5 timeframe name
+    (e.g. "M1", "H4") and any other keys passed to the strategy as parameters:
+
+        [{"symbol": "USDCAD", "timeframe": "M1", "timeperiod": 10, "lower_bound": 30, "upper_bound": 55}]
+
+    Args:
+        config_path (Path): Path to the JSON config.
+
+    Returns:
+        list[StrategyJob]: The configured jobs.
+    """
+    jobs = []
+    for entry in json.loads(Path(config_path).read_text()):
+        params = dict(entry)
+        symbol = params.pop("symbol")
+        timeframe = getattr(mt5, f"TIMEFRAME_{params.pop('timeframe').upper()}")
+        jobs.append(StrategyJob(symbol=symbol, timeframe=timeframe, params=params))
+    return jobs
+
+
+class MultiSymbolScheduler:
+    """Evaluate a strategy for many (symbol, timeframe) jobs concurrently over one MT5 connection.
+
+    Each cycle submits every job to a thread pool. Terminal calls are serialized by the MT5 gateway, while
+    data processing and signal evaluation of the different jobs overlap. The strategy receives a
+    `deadline` (a `time.monotonic()` value) and must not act on a decision after it; the scheduler stops
+    waiting at the deadline and reports the jobs that did not finish in time.
+    """
+
+    def __init__(self, strategy: Callable, jobs: list[StrategyJob], max_workers: int = 8,
+                 cycle_deadline: float = 20.0):
+        """
+        Args:
+            strategy (Callable): Called as `strategy(connection, symbol, timeframe, deadline=..., **params)`.
+            jobs (list[StrategyJob]): Jobs evaluated every cycle.
+            max_workers (int): Number of jobs evaluated at the same time.
+            cycle_deadline (float): Seconds after the cycle start by which every decision must be made.
+        """
+        self.strategy = strategy
+        self.jobs = jobs
+        self.cycle_deadline = cycle_deadline
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="strategy")
+
+    def run_cycle(self, connection) -> int:
+        """Evaluate every job once and wait until they finish or the cycle deadline passes.
+
+        Returns:
+            int: Number of jobs that missed the deadline.
+        """
+        started = time.monotonic()
+        futures = self.dispatch(connection)
+        _, not_done = wait(futures, timeout=self.cycle_deadline)
+
+        for future in not_done:
+            future.cancel()
+            job = futures[future]
+            logger.warning(f"Strategy for {job.symbol} missed the {self.cycle_deadline}s cycle deadline")
+
+        logger.info(f"Cycle of {len(self.jobs)} jobs finished in {time.monotonic() - started:.3f}s "
+                    f"({len(not_done)} late)")
+        return len(not_done)
+
+    def dispatch(self, connection, jobs: list[StrategyJob] | None = None, **context) -> dict[Future, StrategyJob]:
+        """Submit jobs (all of them by default) without waiting, with a deadline `cycle_deadline` from now.
+
+        Args:
+            connection: Passed to the strategy.
+            jobs (list[StrategyJob], optional): Jobs to submit; defaults to every job.
+            **context: Keyword arguments passed to the strategy of every job on this dispatch only, e.g. the
+                bars `missed` before a `BarCloseEvent`.
+
+        Returns:
+            dict[Future, StrategyJob]: The job of every submitted future.
+        """
+        deadline = time.monotonic() + self.cycle_deadline
+        futures = {}
+        for job in self.jobs if jobs is None else jobs:
+            future = self._executor.submit(self._run_job, connection, job, deadline, context)
+            future.add_done_callback(lambda f, symbol=job.symbol: self._log_failure(f, symbol))
+            futures[future] = job
+        return futures
+
+    @staticmethod
+    def _log_failure(future: Future, symbol: str):
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Strategy failed for {symbol}", exc_info=future.exception())
+
+    def _run_job(self, connection, job: StrategyJob, deadline: float, context: dict):
+        with span("job", job.symbol):
+            self.strategy(connection, job.symbol, job.timeframe, deadline=deadline, **context, **job.params)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
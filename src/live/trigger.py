@@ -0,0 +1,192 @@
+"""
+Bar-close execution trigger.
+
+Instead of running every job at a fixed wall-clock second, `BarCloseTrigger` tracks the broker's server clock
+and, as the close of a subscribed bar approaches, polls the latest tick of its symbol in a tight loop. The
+first tick stamped in the next bar is the moment the terminal rolls the bar, so the callback fires within a
+poll interval of it, for every (symbol, timeframe) on its own.
+
+The server clock is estimated from the tick times seen (`time_msc` is server time), so no assumption is made
+about the broker's time zone or the local clock being in sync. The terminal only builds bars that received
+ticks, so the periods a symbol was polled without new ticks (closed market, weekend) hold no bars. Bars that
+closed while it was not polled (the process stalled) may have received ticks without an event: the next event
+reports them as missed so the callback can catch up.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+from latency import span
+from metatrader.gateway import mt5
+from metatrader.resampler import TIMEFRAME_MN1, TIMEFRAME_W1, bar_open_times, timeframe_seconds
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class BarCloseEvent:
+    symbol: str
+    timeframe: int
+    # Open time of the bar that just closed (server time, epoch seconds)
+    bar_time: int
+    # Bars that may have closed before it since the previous event without an event of their own
+    missed: int
+    # Seconds between the close and its detection, on the server clock
+    delay: float
+
+
+def bar_open(server_time: float, timeframe: int) -> int:
+    """Open time of the `timeframe` bar holding `server_time`."""
+    if timeframe in (TIMEFRAME_W1, TIMEFRAME_MN1):
+        return int(bar_open_times([int(server_time)], timeframe)[0])
+    seconds = timeframe_seconds(timeframe)
+    return int(server_time // seconds * seconds)
+
+
+def next_bar_open(bar_time: int, timeframe: int) -> int:
+    """Open time of the bar following the one opened at `bar_time`."""
+    if timeframe == TIMEFRAME_MN1:
+        return bar_open(bar_time + 32 * 86400, timeframe)
+    return bar_time + timeframe_seconds(timeframe)
+
+
+class _Subscription:
+    __slots__ = ("symbol", "timeframe", "bar_time", "close_time", "polled_at")
+
+    def __init__(self, symbol: str, timeframe: int):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        # Open and close time of the bar in progress; unknown until the first tick
+        self.bar_time = None
+        self.close_time = None
+        # Local time of the last poll of the symbol
+        self.polled_at = None
+
+
+class BarCloseTrigger:
+    """Fire a callback as soon as a bar of each subscribed (symbol, timeframe) closes."""
+
+    def __init__(self, subscriptions: Iterable[tuple[str, int]], callback: Callable[[BarCloseEvent], None],
+                 poll_interval: float = 0.001, spin_window: float = 0.2, idle_poll_interval: float = 0.25,
+                 idle_after: float = 2.0, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            subscriptions (Iterable[tuple[str, int]]): (symbol, MT5 timeframe) pairs to watch.
+            callback (Callable): Called with a `BarCloseEvent` from the trigger thread; it should hand the work
+                off (e.g. to `MultiSymbolScheduler.dispatch`) rather than run it.
+            poll_interval (float): Seconds between tick polls of a symbol whose bar is due to close.
+            spin_window (float): Seconds before an expected close at which tight polling starts.
+            idle_poll_interval (float): Poll interval once `idle_after` seconds passed after a close without a
+                tick (quiet or closed market).
+            idle_after (float): See `idle_poll_interval`.
+            clock (Callable[[], float]): Local clock in epoch seconds.
+        """
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self.spin_window = spin_window
+        self.idle_poll_interval = idle_poll_interval
+        self.idle_after = idle_after
+        self.clock = clock
+        self._subscriptions = [_Subscription(symbol, timeframe) for symbol, timeframe in subscriptions]
+        # Recent (tick time - local time) samples; ticks are never ahead of the server, so their maximum
+        # is the best estimate of the server clock offset
+        self._offsets = deque(maxlen=256)
+
+    def server_time(self) -> float:
+        """Current server time estimated from the latest ticks."""
+        return self.clock() + (max(self._offsets) if self._offsets else 0.0)
+
+    def _latest_tick_time(self, symbol: str) -> float | None:
+        with span("trigger_tick", symbol):
+            tick = mt5.symbol_info_tick(symbol)
+        if tick is None:
+            return None
+        tick_time = tick.time_msc / 1000.0
+        self._offsets.append(tick_time - self.clock())
+        return tick_time
+
+    def poll(self) -> list[BarCloseEvent]:
+        """Check the symbols whose bars are due (or not yet known) and fire the closes found.
+
+        Every symbol is polled at most once, whatever the number of its timeframes.
+
+        Returns:
+            list[BarCloseEvent]: The events fired by this pass.
+        """
+        now = self.server_time()
+        ticks = {}
+        events = []
+        for subscription in self._subscriptions:
+            if subscription.close_time is not None and now < subscription.close_time - self.spin_window:
+                continue
+            if subscription.symbol not in ticks:
+                ticks[subscription.symbol] = self._latest_tick_time(subscription.symbol)
+            tick_time = ticks[subscription.symbol]
+            if tick_time is None:
+                continue
+            polled_at, subscription.polled_at = subscription.polled_at, self.clock()
+
+            current = bar_open(tick_time, subscription.timeframe)
+            if subscription.bar_time is None:
+                subscription.bar_time = current
+                subscription.close_time = next_bar_open(current, subscription.timeframe)
+                continue
+            if tick_time < subscription.close_time:
+                continue
+
+            # Bars that closed before the previous poll had no tick by then, so the terminal never built them;
+            # of the bars between the one in progress and the one the tick belongs to, only the later ones
+            # may hold ticks
+            polled_since = tick_time - (subscription.polled_at - polled_at)
+            closed = subscription.bar_time
+            missed = 0
+            following = next_bar_open(closed, subscription.timeframe)
+            while following < current:
+                after = next_bar_open(following, subscription.timeframe)
+                if after > polled_since:
+                    closed = following
+                    missed += 1
+                following = after
+            event = BarCloseEvent(subscription.symbol, subscription.timeframe, closed, missed,
+                                  max(self.server_time() - next_bar_open(closed, subscription.timeframe), 0.0))
+            subscription.bar_time = current
+            subscription.close_time = next_bar_open(current, subscription.timeframe)
+
+            if missed:
+                logger.warning(f"{missed} bars of {subscription.symbol} closed without an event")
+            try:
+                self.callback(event)
+            except Exception:
+                logger.exception(f"Bar close callback failed for {subscription.symbol}")
+            events.append(event)
+        return events
+
+    def _wait_time(self) -> float:
+        """Seconds to sleep before the next poll."""
+        now = self.server_time()
+        wait = None
+        for subscription in self._subscriptions:
+            if subscription.close_time is None:
+                # No tick seen yet for this symbol
+                subscription_wait = self.idle_poll_interval
+                wait = subscription_wait if wait is None else min(wait, subscription_wait)
+                continue
+            until_close = subscription.close_time - now
+            if until_close > self.spin_window:
+                subscription_wait = until_close - self.spin_window
+            elif until_close < -self.idle_after:
+                subscription_wait = self.idle_poll_interval
+            else:
+                subscription_wait = self.poll_interval
+            wait = subscription_wait if wait is None else min(wait, subscription_wait)
+        return self.idle_poll_interval if wait is None else wait
+
+    def run(self, stop: threading.Event | None = None):
+        """Poll until `stop` is set, sleeping between bar closes."""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            self.poll()
+            stop.wait(self._wait_time())
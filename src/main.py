@@ -1,32 +1,62 @@
 import logging
 import os
+import threading
 import time
+from pathlib import Path
 
-import MetaTrader5 as mt5
-import matplotlib
-import matplotlib.pyplot as plt
+import pandas as pd
 import schedule
 from dotenv import load_dotenv
-from pandas.plotting import register_matplotlib_converters
 
-from metatrader import MT5Connection, place_order
-from ta import check_rsi_signal
+import latency
+from indicators import RSI, LevelIndex, SupportResistanceLevels, support_resistance_orders
+from live import BarCloseEvent, BarCloseTrigger, MultiSymbolScheduler, StrategyJob, load_jobs
+from metatrader import MetadataCache, MT5Connection, place_order
+from metatrader.gateway import mt5
+from ta import rsi_crossover_signal
 
 # Load env vars
 load_dotenv()
 
-# Register matplotlib converters
-register_matplotlib_converters()
-matplotlib.use("TkAgg")
-
 # Configure logging
 level = logging.INFO
 fmt = "[%(levelname)s]: %(asctime)s - %(message)s"
 logging.basicConfig(level=level, format=fmt)
 logger = logging.getLogger(__name__)
 
+# Number of closed bars used to warm up a streaming RSI
+RSI_WARMUP_BARS = 50
+
+# Streaming RSI per (symbol, timeframe, timeperiod), with the open time of the last bar it has seen. Jobs
+# sharing a key share the RSI, which is advanced once per bar while holding the lock of its key.
+rsi_states = {}
+
+# Open time of the last bar every job evaluated, so each job acts once per closed bar
+evaluated_bars = {}
+
+_state_locks = {}
+_state_locks_guard = threading.Lock()
+
+# Closed bars used to find the support and resistance levels of a chart the first time
+LEVELS_WARMUP_BARS = 1000
+
+# Support / resistance levels per (symbol, timeframe, window, prominence, max_age), with the open time and the
+# closes of the last two bars seen. Like the RSI, they are advanced once per bar under the lock of their key.
+level_states = {}
+
+# Symbol specifications and account balance shared by every job
+metadata_cache = MetadataCache()
+
 
 def plot_data(rates_df, support_lines=None, resistance_lines=None):
+    # Imported on use so the live loop also runs without a display
+    import matplotlib
+    import matplotlib.pyplot as plt
+    from pandas.plotting import register_matplotlib_converters
+
+    register_matplotlib_converters()
+    matplotlib.use("TkAgg")
+
     plt.figure(figsize=(12, 6))
     plt.plot(rates_df["time"], rates_df["close"], label="Close Price", color="blue")
     if support_lines:
@@ -42,54 +72,253 @@ def plot_data(rates_df, support_lines=None, resistance_lines=None):
     plt.show()
 
 
+def state_lock(key: tuple) -> threading.Lock:
+    """Lock serializing the updates of the indicator state stored under `key`."""
+    with _state_locks_guard:
+        return _state_locks.setdefault(key, threading.Lock())
+
+
+def claim_bar(job_key: tuple, bar_time) -> bool:
+    """
+    Record that the job identified by `job_key` evaluates the bar opened at `bar_time`.
+    Returns False when the job already evaluated that bar.
+    """
+    with _state_locks_guard:
+        if evaluated_bars.get(job_key) == bar_time:
+            return False
+        evaluated_bars[job_key] = bar_time
+        return True
+
+
+def update_rsi(connection: MT5Connection, symbol: str, timeframe: int, timeperiod: int,
+               missed: int = 0) -> tuple[float, float, pd.Timestamp] | None:
+    """
+    Bring the streaming RSI of (symbol, timeframe, timeperiod) up to the newest closed bar.
+    The RSI is warmed up on recent history on first use. The `missed` bars the caller knows closed since the
+    previous call without one (see `BarCloseEvent.missed`) are fetched with the newest bar and fed in order;
+    when more were missed, the RSI is warmed up again. Jobs sharing the RSI may call this concurrently: the
+    first one to see a new bar advances it, the others read it.
+    Returns the previous and current RSI with the open time of the bar they belong to, or None when the
+    rates could not be fetched.
+    """
+    key = (symbol, timeframe, timeperiod)
+    with state_lock(key):
+        if key in rsi_states:
+            rsi, last_time = rsi_states[key]
+
+            # The newest closed bars; one of them must be the last bar the RSI has seen
+            rates = connection.fetch_rates(symbol, timeframe, 1, missed + 2)
+            if rates is None:
+                return None
+            if rates.index[-1] == last_time:
+                return rsi.prev_value, rsi.value, last_time
+            seen = rates.index.searchsorted(last_time)
+            if seen < len(rates) and rates.index[seen] == last_time:
+                with latency.span("indicators", symbol):
+                    rsi.update_many(rates["Close"].iloc[seen + 1:])
+                rsi_states[key] = (rsi, rates.index[-1])
+                return rsi.prev_value, rsi.value, rates.index[-1]
+            logger.warning(f"Missed bars for {symbol}, warming up the RSI again")
+
+        rates = connection.fetch_rates(symbol, timeframe, 1, RSI_WARMUP_BARS)
+        if rates is None:
+            return None
+        with latency.span("indicators", symbol):
+            rsi = RSI(timeperiod)
+            rsi.update_many(rates["Close"])
+        rsi_states[key] = (rsi, rates.index[-1])
+        return rsi.prev_value, rsi.value, rates.index[-1]
+
+
+def update_levels(connection: MT5Connection, symbol: str, timeframe: int, window: int, prominence: float,
+                  max_age: int | None = None, missed: int = 0) -> tuple[LevelIndex, float, float, pd.Timestamp] | None:
+    """
+    Feed the closed bars since the previous call to the support / resistance levels of (symbol, timeframe).
+    The levels are built from recent history on first use, or again when more than `missed` bars were missed
+    in between (see `update_rsi`).
+    Returns the levels, the closes of the two newest closed bars and the open time of the newest one, or None
+    when the rates could not be fetched.
+    """
+    key = (symbol, timeframe, window, prominence, max_age)
+    with state_lock(key):
+        if key in level_states:
+            tracker, last_time, prev_close, close = level_states[key]
+
+            rates = connection.fetch_rates(symbol, timeframe, 1, missed + 2)
+            if rates is None:
+                return None
+            if rates.index[-1] == last_time:
+                return tracker.levels, prev_close, close, last_time
+            seen = rates.index.searchsorted(last_time)
+            if seen < len(rates) and rates.index[seen] == last_time:
+                with latency.span("indicators", symbol):
+                    new = rates.iloc[seen + 1:]
+                    tracker.update_many(new["High"], new["Low"], new["Close"])
+                prev_close, close = float(rates["Close"].iloc[-2]), float(rates["Close"].iloc[-1])
+                level_states[key] = (tracker, rates.index[-1], prev_close, close)
+                return tracker.levels, prev_close, close, rates.index[-1]
+            logger.warning(f"Missed bars for {symbol}, rebuilding the support / resistance levels")
+
+        rates = connection.fetch_rates(symbol, timeframe, 1, LEVELS_WARMUP_BARS)
+        if rates is None:
+            return None
+        with latency.span("indicators", symbol):
+            tracker = SupportResistanceLevels(window, prominence, max_age)
+            tracker.update_many(rates["High"], rates["Low"], rates["Close"])
+        prev_close, close = float(rates["Close"].iloc[-2]), float(rates["Close"].iloc[-1])
+        level_states[key] = (tracker, rates.index[-1], prev_close, close)
+        return tracker.levels, prev_close, close, rates.index[-1]
+
+
 def rsi_strategy(connection: MT5Connection, symbol: str, timeframe: int, risk_per_trade: float,
-                 reward_to_risk_ratio: int, timeperiod: int, lower_bound: int, upper_bound: int):
+                 reward_to_risk_ratio: int, timeperiod: int, lower_bound: int, upper_bound: int,
+                 deadline: float | None = None, missed: int = 0):
     """
     Main trading logic to run at each scheduled interval.
-    Fetches recent market data, checks for RSI signals, and places orders.
+    Updates the streaming RSI with the newest closed bar (and the `missed` ones before it), checks for RSI
+    signals, and places orders. Only the newest bar is traded: the prices of missed signals are gone.
+    No order is placed once `deadline` (a time.monotonic() value) has passed.
     """
-    rates = connection.fetch_rates(symbol, timeframe, 0, 50)
+    reading = update_rsi(connection, symbol, timeframe, timeperiod, missed)
+    if reading is None:
+        return
+    prev_rsi, rsi, bar_time = reading
+    job_key = (symbol, timeframe, risk_per_trade, reward_to_risk_ratio, timeperiod, lower_bound, upper_bound)
+    if not claim_bar(job_key, bar_time):
+        logger.info(f"No new closed bar for {symbol}")
+        return
 
     # Compute risk in pips
-    tick = mt5.symbol_info_tick(symbol)
+    with latency.span("symbol_info_tick", symbol):
+        tick = mt5.symbol_info_tick(symbol)
     risk_pct = 0.1
 
     # Check RSI signal
-    signal = check_rsi_signal(rates, timeperiod, lower_bound, upper_bound)
+    with latency.span("signal", symbol):
+        signal = rsi_crossover_signal(prev_rsi, rsi, lower_bound, upper_bound)
 
-    if signal == "BUY":
+    if signal != "HOLD" and deadline is not None and time.monotonic() > deadline:
+        logger.warning(f"{signal} signal for {symbol} dropped: past the cycle deadline")
+    elif signal == "BUY":
         price = tick.ask
         risk_in_pips = round((price - risk_pct / 100 * price) * 10)
-        place_order(symbol, "BUY", risk_per_trade, risk_in_pips, reward_to_risk_ratio)
+        place_order(symbol, "BUY", risk_per_trade, risk_in_pips, reward_to_risk_ratio, tick=tick,
+                    metadata=metadata_cache)
     elif signal == "SELL":
         price = tick.bid
         risk_in_pips = round((price + risk_pct / 100 * price) * 10)
-        place_order(symbol, "SELL", risk_per_trade, risk_in_pips, reward_to_risk_ratio)
+        place_order(symbol, "SELL", risk_per_trade, risk_in_pips, reward_to_risk_ratio, tick=tick,
+                    metadata=metadata_cache)
     else:
         logger.info(f"Signal: {signal}")
 
 
+def support_resistance_strategy(connection: MT5Connection, symbol: str, timeframe: int, risk_per_trade: float,
+                                window: int, prominence: float, level_pad: float, level_max_age: int | None = None,
+                                deadline: float | None = None, missed: int = 0):
+    """
+    Trading logic of the support / resistance strategy, the live counterpart of
+    `backtest.strategies.SupportResistance`. Feeds the newest closed bar to the levels and places the orders
+    `support_resistance_orders` gives for it, their stop-loss and take-profit turned into a distance in pips
+    and a reward-to-risk ratio around the current price. `missed` bars are caught up as in `rsi_strategy`. No
+    order is placed once `deadline` has passed.
+    """
+    reading = update_levels(connection, symbol, timeframe, window, prominence, level_max_age, missed)
+    if reading is None:
+        return
+    levels, prev_close, close, bar_time = reading
+    job_key = ("support_resistance", symbol, timeframe, risk_per_trade, window, prominence, level_pad, level_max_age)
+    if not claim_bar(job_key, bar_time):
+        logger.info(f"No new closed bar for {symbol}")
+        return
+
+    with latency.span("signal", symbol):
+        orders = support_resistance_orders(levels, close, prev_close, level_pad)
+    if not orders:
+        logger.info("Signal: HOLD")
+        return
+    if deadline is not None and time.monotonic() > deadline:
+        logger.warning(f"{orders[0][0]} signal for {symbol} dropped: past the cycle deadline")
+        return
+
+    symbol_spec = metadata_cache.symbol_spec(symbol)
+    if symbol_spec is None:
+        return
+    with latency.span("symbol_info_tick", symbol):
+        tick = mt5.symbol_info_tick(symbol)
+    pip_size = symbol_spec.point * 10
+    for action, sl, tp in orders:
+        risk_in_pips = max(round(abs(close - sl) / pip_size), 1)
+        place_order(symbol, action, risk_per_trade, risk_in_pips, abs(tp - close) / abs(close - sl), tick=tick,
+                    metadata=metadata_cache)
+
+
+# Strategies a job can name with its "strategy" parameter
+STRATEGIES = {
+    "rsi": rsi_strategy,
+    "support_resistance": support_resistance_strategy,
+}
+
+
+def run_strategy(connection: MT5Connection, symbol: str, timeframe: int, strategy: str = "rsi", **params):
+    """Run the strategy named by the "strategy" parameter of a job (the RSI strategy when it has none)."""
+    STRATEGIES[strategy](connection, symbol, timeframe, **params)
+
+
+def report_latency():
+    """Log the latencies since the previous report and write them to the file named by LATENCY_FILE, if any."""
+    summary = latency.recorder.summary(reset=True)
+    latency.recorder.log_summary(summary)
+    if os.getenv("LATENCY_FILE"):
+        latency.recorder.write(Path(os.getenv("LATENCY_FILE")), summary)
+
+
 def main():
-    symbol = "USDCAD"
-    timeframe = mt5.TIMEFRAME_M1
+    config_path = os.getenv("STRATEGY_CONFIG")
+    if config_path:
+        jobs = load_jobs(Path(config_path))
+    else:
+        jobs = [StrategyJob(symbol="USDCAD", timeframe=mt5.TIMEFRAME_M1, params={
+            "risk_per_trade": 0.02,
+            "reward_to_risk_ratio": 1,
+            "timeperiod": 10,
+            "lower_bound": 30,
+            "upper_bound": 55
+        })]
+    scheduler = MultiSymbolScheduler(run_strategy, jobs, max_workers=int(os.getenv("STRATEGY_WORKERS", 8)))
+
+    # Per-stage latency histograms, off unless a sample rate is configured
+    latency.recorder.sample_rate = float(os.getenv("LATENCY_SAMPLE_RATE", 0))
 
     with MT5Connection(int(os.getenv("ACCOUNT_ID")), os.getenv("PASSWORD"), os.getenv("MT5_SERVER")) as mt_conn:
-        # Schedule the RSI-based trading logic to run every minute
-        schedule.every(1).minute.at(":01").do(
-            rsi_strategy,
-            connection=mt_conn,
-            symbol=symbol,
-            timeframe=timeframe,
-            risk_per_trade=0.02,
-            reward_to_risk_ratio=1,
-            timeperiod=10,
-            lower_bound=30,
-            upper_bound=55
-        )
-
-        while True:
-            schedule.run_pending()
-            time.sleep(1)
+        if latency.recorder.sample_rate > 0:
+            schedule.every(int(os.getenv("LATENCY_REPORT_MINUTES", 15))).minutes.do(report_latency)
+
+        if os.getenv("EXECUTION_TRIGGER", "bar_close") == "schedule":
+            # Run the RSI-based trading logic of every job every minute
+            schedule.every(1).minute.at(":01").do(scheduler.run_cycle, connection=mt_conn)
+            while True:
+                schedule.run_pending()
+                time.sleep(1)
+
+        # Run the jobs of each (symbol, timeframe) as soon as its bar closes
+        jobs_by_bar = {}
+        for job in jobs:
+            jobs_by_bar.setdefault((job.symbol, job.timeframe), []).append(job)
+
+        def on_bar_close(event: BarCloseEvent):
+            # The jobs feed the bars missed before this one to their indicators instead of rebuilding them
+            scheduler.dispatch(mt_conn, jobs_by_bar[(event.symbol, event.timeframe)], missed=event.missed)
+
+        trigger = BarCloseTrigger(jobs_by_bar, on_bar_close)
+        stop = threading.Event()
+        threading.Thread(target=trigger.run, args=(stop,), name="bar-close-trigger", daemon=True).start()
+        try:
+            while True:
+                schedule.run_pending()
+                time.sleep(1)
+        finally:
+            stop.set()
 
 
 if __name__ == "__main__":
@@ -1,6 +1,25 @@
 """
 This module contains classes and functions for interacting with MetaTrader 5.
+
+Exports are imported on first access, so modules that do not talk to the terminal (e.g. `metatrader.bar_store`)
+can be used without the MetaTrader5 package, or before a stand-in for it is installed (see `fake_mt5`).
 """
+import importlib
+
+_EXPORTS = {
+    "BarStore": "metatrader.bar_store",
+    "BulkDownloader": "metatrader.bulk_download",
+    "MetadataCache": "metatrader.metadata",
+    "MT5Connection": "metatrader.mt5_connection",
+    "place_order": "metatrader.order",
+    "Resampler": "metatrader.resampler",
+    "TickStore": "metatrader.tick_store",
+}
+
+__all__ = list(_EXPORTS)
+
 
-from metatrader.mt5_connection import MT5Connection
-from metatrader.order import place_order
\ No newline at end of file
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name]), name)
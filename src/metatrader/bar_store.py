@@ -0,0 +1,277 @@
+import json
+import logging
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Layout of the structured arrays returned by mt5.copy_rates_*
+RATES_DTYPE = np.dtype([
+    ("time", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("tick_volume", "<u8"),
+    ("spread", "<i4"),
+    ("real_volume", "<u8"),
+])
+
+
+def to_epoch(value: datetime | int | np.integer) -> int:
+    """Convert a datetime (naive values are taken as UTC, like MT5 does) or epoch seconds to epoch seconds."""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    return int(value)
+
+
+# Column dtypes of compact frames. float32 keeps 7 significant digits, enough for quotes of up to 6 digits
+# (1.35123, 151.234, 2345.67); the index stays a DatetimeIndex, at second resolution over the same int64 epoch
+COMPACT_DTYPES = {"Open": np.float32, "High": np.float32, "Low": np.float32, "Close": np.float32,
+                  "Volume": np.int32}
+
+
+def rates_to_frame(columns, compact: bool = False) -> pd.DataFrame:
+    """Build the OHLCV frame used by the strategies (same shape as `MT5Connection.fetch_rates`).
+
+    Args:
+        columns: Bars as one array per `RATES_DTYPE` column: a dict, a structured array or a DataFrame.
+        compact (bool): Store prices as float32 and the volume as int32 (28 bytes per bar instead of 48).
+
+    Returns:
+        pd.DataFrame: Open, High, Low, Close and Volume columns indexed by bar time.
+    """
+    frame = {name: np.asarray(columns[source]) for name, source in
+             (("Open", "open"), ("High", "high"), ("Low", "low"), ("Close", "close"), ("Volume", "tick_volume"))}
+    times = np.asarray(columns["time"], dtype=np.int64)
+    if compact:
+        frame = {name: values.astype(COMPACT_DTYPES[name]) for name, values in frame.items()}
+        index = pd.DatetimeIndex(times.astype("datetime64[s]"), name="time")
+    else:
+        index = pd.Index(pd.to_datetime(times, unit="s"), name="time")
+    # Compact columns are fresh arrays already, the others may be read-only views on the store's files
+    return pd.DataFrame(frame, index=index, copy=not compact)
+
+
+class BarStore:
+    """Columnar on-disk store for MT5 bars.
+
+    Bars are partitioned by symbol, timeframe and calendar year (UTC). Every partition is a directory
+    holding versions of its data, each one `.npy` file per column of `RATES_DTYPE` sorted by an int64
+    epoch-seconds `time` column, and a `CURRENT` file naming the version to read:
+
+        <root>/<symbol>/<timeframe>/<year>/<version>/<column>.npy
+
+    Reads memory-map the files, so a range query only touches the pages of the requested slice and a
+    query inside a single partition returns views on the mapped files without copying.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _series_path(self, symbol: str, timeframe: int) -> Path:
+        return self.root / symbol / str(timeframe)
+
+    def partitions(self, symbol: str, timeframe: int) -> list[int]:
+        """Return the years stored for a (symbol, timeframe), in ascending order."""
+        series_path = self._series_path(symbol, timeframe)
+        if not series_path.is_dir():
+            return []
+        # A partition whose first write was interrupted has no version to read yet
+        return sorted(int(p.name) for p in series_path.iterdir()
+                      if p.name.isdigit() and ((p / "CURRENT").exists() or (p / "time.npy").exists()))
+
+    def _version_path(self, symbol: str, timeframe: int, year: int) -> Path:
+        partition_path = self._series_path(symbol, timeframe) / str(year)
+        pointer_path = partition_path / "CURRENT"
+        # Partitions written before versioning hold their columns directly
+        return partition_path / pointer_path.read_text().strip() if pointer_path.exists() else partition_path
+
+    def _load_partition(self, symbol: str, timeframe: int, year: int, mmap: bool = True) -> dict[str, np.ndarray]:
+        version_path = self._version_path(symbol, timeframe, year)
+        mmap_mode = "r" if mmap else None
+        return {name: np.load(version_path / f"{name}.npy", mmap_mode=mmap_mode) for name in RATES_DTYPE.names}
+
+    def _write_partition(self, symbol: str, timeframe: int, year: int, columns: dict[str, np.ndarray]):
+        partition_path = self._series_path(symbol, timeframe) / str(year)
+        partition_path.mkdir(parents=True, exist_ok=True)
+        versions = [int(p.name) for p in partition_path.iterdir() if p.is_dir() and p.name.isdigit()]
+        current = self._version_path(symbol, timeframe, year)
+        version_path = partition_path / str(max(versions, default=0) + 1)
+
+        version_path.mkdir()
+        for name in RATES_DTYPE.names:
+            np.save(version_path / f"{name}.npy", np.ascontiguousarray(columns[name], dtype=RATES_DTYPE[name]))
+
+        # Readers switch to the complete new version at once, and files still mapped by them are never replaced,
+        # which Windows refuses; only the small pointer file is
+        pointer_tmp = partition_path / "CURRENT.tmp"
+        pointer_tmp.write_text(version_path.name)
+        os.replace(pointer_tmp, partition_path / "CURRENT")
+
+        # Older versions go once nothing maps them; on Windows a mapped one stays until a later write
+        for path in partition_path.iterdir():
+            if path.is_dir() and path.name.isdigit() and path != version_path:
+                shutil.rmtree(path, ignore_errors=True)
+        if current == partition_path:
+            for name in RATES_DTYPE.names:
+                try:
+                    (partition_path / f"{name}.npy").unlink(missing_ok=True)
+                except OSError:
+                    pass
+
+    def append(self, symbol: str, timeframe: int, rates: np.ndarray | pd.DataFrame) -> int:
+        """Merge bars into the store.
+
+        Bars whose time is already stored replace the stored bar (the newest download wins), which
+        makes it safe to re-append overlapping ranges or a bar that was still forming.
+
+        Args:
+            symbol (str): Trading instrument (e.g., "EURUSD").
+            timeframe (int): MT5 timeframe constant.
+            rates (np.ndarray | pd.DataFrame): Bars as returned by `mt5.copy_rates_*`, or a frame with the
+                same columns.
+
+        Returns:
+            int: Number of bars that were not stored before.
+        """
+        if isinstance(rates, pd.DataFrame):
+            rates = rates.reset_index() if "time" not in rates.columns else rates
+            columns = {name: rates[name].to_numpy() for name in RATES_DTYPE.names if name in rates.columns}
+        else:
+            columns = {name: rates[name] for name in RATES_DTYPE.names if name in rates.dtype.names}
+        if len(columns.get("time", ())) == 0:
+            return 0
+
+        times = columns["time"]
+        if np.issubdtype(times.dtype, np.datetime64):
+            times = times.astype("datetime64[s]").astype(np.int64)
+        n = len(times)
+        columns = {name: np.asarray(columns.get(name, np.zeros(n, dtype=RATES_DTYPE[name])), dtype=RATES_DTYPE[name])
+                   for name in RATES_DTYPE.names}
+        columns["time"] = np.asarray(times, dtype=np.int64)
+
+        years = columns["time"].astype("datetime64[s]").astype("datetime64[Y]").astype(np.int64) + 1970
+        stored_years = set(self.partitions(symbol, timeframe))
+
+        added = 0
+        for year in np.unique(years):
+            selected = years == year
+            new = {name: values[selected] for name, values in columns.items()}
+
+            stored_count = 0
+            if year in stored_years:
+                existing = self._load_partition(symbol, timeframe, year, mmap=False)
+                stored_count = len(existing["time"])
+                new = {name: np.concatenate((existing[name], new[name])) for name in RATES_DTYPE.names}
+
+            # Sort by time and keep the last occurrence of each timestamp
+            order = np.argsort(new["time"], kind="stable")
+            sorted_time = new["time"][order]
+            keep = np.ones(len(order), dtype=bool)
+            keep[:-1] = sorted_time[:-1] != sorted_time[1:]
+            order = order[keep]
+            new = {name: values[order] for name, values in new.items()}
+            added += len(order) - stored_count
+
+            self._write_partition(symbol, timeframe, int(year), new)
+
+        logging.info(f"Stored {n} bars for {symbol} {timeframe} ({added} new) in {self.root}")
+        return added
+
+    def read_arrays(self, symbol: str, timeframe: int, date_from: datetime | int | None = None,
+                    date_to: datetime | int | None = None) -> dict[str, np.ndarray]:
+        """Return the stored bars within [date_from, date_to] as one array per column.
+
+        Args:
+            symbol (str): Trading instrument (e.g., "EURUSD").
+            timeframe (int): MT5 timeframe constant.
+            date_from (datetime | int, optional): First bar time (inclusive); defaults to the first stored bar.
+            date_to (datetime | int, optional): Last bar time (inclusive); defaults to the last stored bar.
+
+        Returns:
+            dict[str, np.ndarray]: Columns of `RATES_DTYPE`. Read-only memory-mapped views when the range
+            lies in one partition, concatenated copies otherwise.
+        """
+        start = to_epoch(date_from) if date_from is not None else None
+        end = to_epoch(date_to) if date_to is not None else None
+        first_year = datetime.fromtimestamp(start, timezone.utc).year if start is not None else None
+        last_year = datetime.fromtimestamp(end, timezone.utc).year if end is not None else None
+
+        slices = []
+        for year in self.partitions(symbol, timeframe):
+            if (first_year is not None and year < first_year) or (last_year is not None and year > last_year):
+                continue
+            partition = self._load_partition(symbol, timeframe, year)
+            lo = np.searchsorted(partition["time"], start, side="left") if start is not None else 0
+            hi = np.searchsorted(partition["time"], end, side="right") if end is not None else len(partition["time"])
+            if hi > lo:
+                slices.append({name: values[lo:hi] for name, values in partition.items()})
+
+        if not slices:
+            return {name: np.empty(0, dtype=RATES_DTYPE[name]) for name in RATES_DTYPE.names}
+        if len(slices) == 1:
+            return slices[0]
+        return {name: np.concatenate([s[name] for s in slices]) for name in RATES_DTYPE.names}
+
+    def read(self, symbol: str, timeframe: int, date_from: datetime | int | None = None,
+             date_to: datetime | int | None = None, compact: bool = False) -> pd.DataFrame:
+        """Return the stored bars within [date_from, date_to] as an OHLCV frame indexed by time (see
+        `rates_to_frame` for `compact`)."""
+        return rates_to_frame(self.read_arrays(symbol, timeframe, date_from, date_to), compact)
+
+    def coverage(self, symbol: str, timeframe: int) -> list[tuple[int, int]]:
+        """Return the sorted, disjoint [start, end] epoch ranges known to be completely stored."""
+        coverage_path = self._series_path(symbol, timeframe) / "coverage.json"
+        if not coverage_path.exists():
+            return []
+        return [(int(start), int(end)) for start, end in json.loads(coverage_path.read_text())]
+
+    def add_coverage(self, symbol: str, timeframe: int, start: int, end: int):
+        """Record that every bar within [start, end] (epoch seconds) is stored."""
+        if end < start:
+            return
+        ranges = sorted(self.coverage(symbol, timeframe) + [(start, end)])
+
+        # Merge overlapping or adjacent ranges
+        merged = [ranges[0]]
+        for range_start, range_end in ranges[1:]:
+            last_start, last_end = merged[-1]
+            if range_start <= last_end + 1:
+                merged[-1] = (last_start, max(last_end, range_end))
+            else:
+                merged.append((range_start, range_end))
+
+        series_path = self._series_path(symbol, timeframe)
+        series_path.mkdir(parents=True, exist_ok=True)
+        (series_path / "coverage.json").write_text(json.dumps(merged))
+
+    def missing_ranges(self, symbol: str, timeframe: int, start: int, end: int) -> list[tuple[int, int]]:
+        """Return the parts of [start, end] (epoch seconds) that are not covered yet."""
+        missing = []
+        cursor = start
+        for range_start, range_end in self.coverage(symbol, timeframe):
+            if range_end < cursor:
+                continue
+            if range_start > end:
+                break
+            if range_start > cursor:
+                missing.append((cursor, range_start - 1))
+            cursor = range_end + 1
+        if cursor <= end:
+            missing.append((cursor, end))
+        return missing
+
+    def time_range(self, symbol: str, timeframe: int) -> tuple[int, int] | None:
+        """Return the (first, last) stored bar times in epoch seconds, or None if nothing is stored."""
+        years = self.partitions(symbol, timeframe)
+        if not years:
+            return None
+        first = self._load_partition(symbol, timeframe, years[0])["time"]
+        last = self._load_partition(symbol, timeframe, years[-1])["time"]
+        return int(first[0]), int(last[-1])
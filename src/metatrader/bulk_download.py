@@ -0,0 +1,170 @@
+"""
+Bulk history download into a `BarStore`.
+
+Every (symbol, timeframe) range is reduced to the parts the store does not cover yet and split into chunks of
+at most `chunk_bars` bars, which keeps each `copy_rates_range` request under the terminal's limits. Chunks run
+on a thread pool: terminal calls are serialized by the MT5 gateway, while converting and writing one chunk
+overlaps with fetching the next. A chunk is written straight to the store and then recorded in the series'
+coverage, which is the checkpoint: running the same download again only fetches what an interrupted or
+failed run left out.
+"""
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable
+
+from latency import span
+from metatrader.bar_store import BarStore, to_epoch
+from metatrader.gateway import mt5
+from metatrader.resampler import timeframe_seconds
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Chunk:
+    symbol: str
+    timeframe: int
+    # Bar times covered, in epoch seconds, both inclusive
+    start: int
+    end: int
+    # Whether the chunk ends the requested range, so its newest bar may still be forming
+    last: bool = False
+
+
+@dataclass(frozen=True)
+class DownloadReport:
+    chunks: int
+    failed: list[Chunk]
+    bars: int
+    seconds: float
+
+    @property
+    def bars_per_second(self) -> float:
+        return self.bars / self.seconds if self.seconds > 0 else 0.0
+
+
+def plan_chunks(store: BarStore, symbols: Iterable[str], timeframes: Iterable[int], date_from: datetime | int,
+                date_to: datetime | int, chunk_bars: int = 50_000) -> list[Chunk]:
+    """Split the ranges missing from `store` into chunks of at most `chunk_bars` bars.
+
+    Args:
+        store (BarStore): Store the bars are downloaded into.
+        symbols (Iterable[str]): Symbols to download.
+        timeframes (Iterable[int]): MT5 timeframes to download for every symbol.
+        date_from (datetime | int): First bar time.
+        date_to (datetime | int): Last bar time.
+        chunk_bars (int): Maximum number of bars per chunk.
+
+    Returns:
+        list[Chunk]: The chunks, oldest first within every series.
+    """
+    start, end = to_epoch(date_from), to_epoch(date_to)
+    timeframes = list(timeframes)
+    chunks = []
+    for symbol in symbols:
+        for timeframe in timeframes:
+            span_seconds = chunk_bars * timeframe_seconds(timeframe)
+            for gap_start, gap_end in store.missing_ranges(symbol, timeframe, start, end):
+                for chunk_start in range(gap_start, gap_end + 1, span_seconds):
+                    chunk_end = min(chunk_start + span_seconds - 1, gap_end)
+                    chunks.append(Chunk(symbol, timeframe, chunk_start, chunk_end, last=chunk_end == end))
+    return chunks
+
+
+class BulkDownloader:
+    """Download many (symbol, timeframe) histories into a `BarStore` with bounded concurrency."""
+
+    def __init__(self, store: BarStore, max_workers: int = 4, chunk_bars: int = 50_000, retries: int = 2,
+                 retry_delay: float = 1.0):
+        """
+        Args:
+            store (BarStore): Destination store; its coverage is the checkpoint of the download.
+            max_workers (int): Chunks processed at the same time.
+            chunk_bars (int): Maximum number of bars requested at once.
+            retries (int): Further attempts of a chunk whose request failed.
+            retry_delay (float): Seconds before the first retry, doubled on every further one.
+        """
+        self.store = store
+        self.max_workers = max_workers
+        self.chunk_bars = chunk_bars
+        self.retries = retries
+        self.retry_delay = retry_delay
+        # Writes of one series read and rewrite its partitions and coverage, so they are serialized
+        self._series_locks = defaultdict(threading.Lock)
+
+    def _fetch(self, chunk: Chunk):
+        delay = self.retry_delay
+        for attempt in range(self.retries + 1):
+            with span("bulk_download", chunk.symbol):
+                rates = mt5.copy_rates_range(chunk.symbol, chunk.timeframe,
+                                             datetime.fromtimestamp(chunk.start, timezone.utc),
+                                             datetime.fromtimestamp(chunk.end, timezone.utc))
+            if rates is not None:
+                return rates
+            if attempt < self.retries:
+                logger.warning(f"Failed to fetch {chunk.symbol} {chunk.timeframe} bars ({mt5.last_error()}), "
+                               f"retrying in {delay:.1f}s")
+                time.sleep(delay)
+                delay *= 2
+        return None
+
+    def download_chunk(self, chunk: Chunk) -> int | None:
+        """Fetch one chunk, store it and record it as covered.
+
+        Returns:
+            int | None: Number of bars fetched, None if the request failed.
+        """
+        rates = self._fetch(chunk)
+        if rates is None:
+            logger.error(f"Failed to fetch {chunk.symbol} {chunk.timeframe} bars "
+                         f"{datetime.fromtimestamp(chunk.start, timezone.utc)} - "
+                         f"{datetime.fromtimestamp(chunk.end, timezone.utc)}")
+            return None
+
+        with self._series_locks[(chunk.symbol, chunk.timeframe)]:
+            if len(rates):
+                self.store.append(chunk.symbol, chunk.timeframe, rates)
+            if not chunk.last:
+                self.store.add_coverage(chunk.symbol, chunk.timeframe, chunk.start, chunk.end)
+            elif len(rates):
+                # The newest bar may still be forming: leave it uncovered so the next download refreshes it
+                self.store.add_coverage(chunk.symbol, chunk.timeframe, chunk.start, int(rates["time"][-1]) - 1)
+        return len(rates)
+
+    def run(self, symbols: Iterable[str], timeframes: Iterable[int], date_from: datetime | int,
+            date_to: datetime | int) -> DownloadReport:
+        """Download every symbol and timeframe between `date_from` and `date_to` that the store is missing.
+
+        Returns:
+            DownloadReport: Chunks processed, the chunks that failed, bars fetched and the time it took.
+        """
+        chunks = plan_chunks(self.store, symbols, timeframes, date_from, date_to, self.chunk_bars)
+        logger.info(f"Downloading {len(chunks)} chunks with {self.max_workers} workers")
+
+        started = time.monotonic()
+        bars = 0
+        failed = []
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="download") as executor:
+            futures = {executor.submit(self.download_chunk, chunk): chunk for chunk in chunks}
+            for done, future in enumerate(as_completed(futures), start=1):
+                try:
+                    count = future.result()
+                except Exception:
+                    logger.exception(f"Failed to store {futures[future].symbol} bars")
+                    count = None
+                if count is None:
+                    failed.append(futures[future])
+                    continue
+                bars += count
+                elapsed = time.monotonic() - started
+                logger.info(f"{done}/{len(chunks)} chunks, {bars} bars, {bars / elapsed:.0f} bars/s")
+
+        report = DownloadReport(chunks=len(chunks), failed=failed, bars=bars, seconds=time.monotonic() - started)
+        logger.info(f"Downloaded {report.bars} bars in {report.seconds:.1f}s ({report.bars_per_second:.0f} bars/s), "
+                    f"{len(failed)} of {len(chunks)} chunks failed")
+        return report
@@ -0,0 +1,32 @@
+"""
+Serialized access to the MetaTrader5 module.
+
+The MetaTrader5 package talks to a single terminal through one IPC channel and is not safe to call from
+several threads at once. `mt5` is a drop-in stand-in for the module: constants are passed through and
+every function call is made while holding one process-wide lock, so strategy code can run concurrently
+while terminal calls are queued one after another.
+"""
+import threading
+
+import MetaTrader5
+
+
+class MT5Gateway:
+    def __init__(self, module):
+        self._module = module
+        self.lock = threading.RLock()
+
+    def __getattr__(self, name: str):
+        # Resolved on every access, so patched module attributes (e.g. in tests) are picked up
+        attr = getattr(self._module, name)
+        if not callable(attr):
+            return attr
+
+        def locked(*args, **kwargs):
+            with self.lock:
+                return attr(*args, **kwargs)
+
+        return locked
+
+
+mt5 = MT5Gateway(MetaTrader5)
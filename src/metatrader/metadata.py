@@ -0,0 +1,99 @@
+"""
+Time-bounded cache of the symbol and account metadata needed to size an order.
+
+Contract specifications (point, tick value, volume limits, filling mode) practically never change during a
+session, so they are kept for a long TTL and only refetched when invalidated. The account balance changes
+when trades are closed, so it is kept for a short TTL and invalidated after every order sent through
+`place_order`.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from latency import span
+from metatrader.gateway import mt5
+
+
+@dataclass(frozen=True)
+class SymbolSpec:
+    """Static contract fields of a symbol used for order sizing."""
+    point: float
+    trade_tick_value: float
+    volume_min: float
+    volume_step: float
+    filling_mode: int
+
+
+class MetadataCache:
+    """Caches symbol specifications and the account balance with separate TTLs (in seconds)."""
+
+    def __init__(self, symbol_ttl: float = 3600.0, account_ttl: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.symbol_ttl = symbol_ttl
+        self.account_ttl = account_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._symbols = {}  # symbol -> (expiry, SymbolSpec)
+        self._balance = None  # (expiry, balance)
+
+    def symbol_spec(self, symbol: str) -> SymbolSpec | None:
+        """
+        Get the contract specification of `symbol`, fetching it from the terminal when missing or expired.
+        Returns None when the symbol is not available or not visible; such results are not cached.
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._symbols.get(symbol)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        with span("symbol_info", symbol):
+            symbol_info = mt5.symbol_info(symbol)
+        if symbol_info is None or not symbol_info.visible:
+            logging.error(f"Symbol {symbol} not available or visible.")
+            return None
+
+        spec = SymbolSpec(point=symbol_info.point,
+                          trade_tick_value=symbol_info.trade_tick_value or 1.0,
+                          volume_min=symbol_info.volume_min,
+                          volume_step=symbol_info.volume_step,
+                          filling_mode=symbol_info.filling_mode)
+        with self._lock:
+            self._symbols[symbol] = (now + self.symbol_ttl, spec)
+        return spec
+
+    def balance(self) -> float | None:
+        """
+        Get the account balance, fetching it from the terminal when missing or expired.
+        Returns None when the account information is not available.
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._balance
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        with span("account_info"):
+            account_info = mt5.account_info()
+        if account_info is None:
+            logging.error("Failed to retrieve account information.")
+            return None
+
+        with self._lock:
+            self._balance = (now + self.account_ttl, account_info.balance)
+        return account_info.balance
+
+    def invalidate_symbol(self, symbol: str | None = None):
+        """Drop the cached specification of `symbol`, or of every symbol when None."""
+        with self._lock:
+            if symbol is None:
+                self._symbols.clear()
+            else:
+                self._symbols.pop(symbol, None)
+
+    def invalidate_account(self):
+        """Drop the cached balance, e.g. after a trade was opened or closed."""
+        with self._lock:
+            self._balance = None
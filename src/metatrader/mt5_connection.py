@@ -1,16 +1,29 @@
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 
-import MetaTrader5 as mt5
 import pandas as pd
 
+from latency import span
+from metatrader.bar_store import BarStore, rates_to_frame, to_epoch
+from metatrader.gateway import mt5
+from metatrader.resampler import TIMEFRAME_M1, Resampler
+from metatrader.tick_store import TickStore, day_ranges
+
 
 class MT5Connection:
-    def __init__(self, account: int, password: str, server: str):
+    def __init__(self, account: int, password: str, server: str, cache: BarStore | None = None):
+        """
+        Args:
+            account (int): Trading account id.
+            password (str): Trading account password.
+            server (str): MetaTrader 5 server.
+            cache (BarStore, optional): Local bar store used as a read-through cache by `fetch_rates_range`.
+        """
         self.account = account
         self.password = password
         self.server = server
+        self.cache = cache
 
     def __enter__(self):
         if mt5.initialize():
@@ -36,53 +49,124 @@ class MT5Connection:
         return True
 
     @staticmethod
-    def _process_rates(rates: pd.DataFrame) -> pd.DataFrame:
-        # Convert timestamp to datetime
-        rates = rates[["time", "open", "high", "low", "close", "tick_volume"]].rename(columns={
-            "open": "Open",
-            "high": "High",
-            "low": "Low",
-            "close": "Close",
-            "tick_volume": "Volume"
-        })
-
-        rates["time"] = pd.to_datetime(rates["time"], unit="s")
-        rates.set_index("time", inplace=True)
-        return rates
-
-    def fetch_rates(self, symbol: str, timeframe: int, start_pos: int, count: int):
-        rates = mt5.copy_rates_from_pos(symbol, timeframe, start_pos, count)
+    def _process_rates(rates, compact: bool = False) -> pd.DataFrame:
+        """Build the OHLCV frame indexed by time from `copy_rates_*` output (a structured array or a DataFrame).
+
+        Args:
+            rates: Bars as returned by the terminal.
+            compact (bool): Prices as float32 and volume as int32, roughly halving the memory per bar
+                (see `rates_to_frame`).
+        """
+        return rates_to_frame(rates, compact)
+
+    def fetch_rates(self, symbol: str, timeframe: int, start_pos: int, count: int, compact: bool = False):
+        with span("fetch_rates", symbol):
+            rates = mt5.copy_rates_from_pos(symbol, timeframe, start_pos, count)
         if rates is None:
             logging.error("Failed to fetch rates")
             return None
-        df = pd.DataFrame(rates)
-        return self._process_rates(df)
+        with span("process_rates", symbol):
+            return self._process_rates(rates, compact)
+
+    def fetch_rates_range(self, symbol: str, timeframe: int, date_from: datetime, date_to: datetime,
+                          compact: bool = False):
+        if self.cache is not None:
+            return self._fetch_rates_range_cached(symbol, timeframe, date_from, date_to, compact)
 
-    def fetch_rates_range(self, symbol: str, timeframe: int, date_from: datetime, date_to: datetime):
         rates = mt5.copy_rates_range(symbol, timeframe, date_from, date_to)
         if rates is None:
             logging.error("Failed to fetch rates")
             return None
 
-        df = pd.DataFrame(rates)
-        return self._process_rates(df)
+        return self._process_rates(rates, compact)
+
+    def _fetch_rates_range_cached(self, symbol: str, timeframe: int, date_from: datetime, date_to: datetime,
+                                  compact: bool = False):
+        start = to_epoch(date_from)
+        end = to_epoch(date_to)
+        if not self._fill_cache(symbol, timeframe, start, end):
+            return None
+        return self.cache.read(symbol, timeframe, start, end, compact)
+
+    def _fill_cache(self, symbol: str, timeframe: int, start: int, end: int) -> bool:
+        """Ask the terminal for the parts of [start, end] the cache does not hold yet; False if a request failed."""
+        for gap_start, gap_end in self.cache.missing_ranges(symbol, timeframe, start, end):
+            rates = mt5.copy_rates_range(symbol, timeframe, datetime.fromtimestamp(gap_start, timezone.utc),
+                                         datetime.fromtimestamp(gap_end, timezone.utc))
+            if rates is None:
+                logging.error("Failed to fetch rates")
+                return False
+            logging.info(f"Fetched {len(rates)} {symbol} bars missing from the cache")
+            self.cache.append(symbol, timeframe, rates)
+
+            if gap_end < end:
+                # Followed by cached data, so the whole gap is now known
+                self.cache.add_coverage(symbol, timeframe, gap_start, gap_end)
+            elif len(rates) > 0:
+                # The newest bar may still be forming: leave it uncovered so the next call refreshes it
+                self.cache.add_coverage(symbol, timeframe, gap_start, int(rates["time"][-1]) - 1)
+        return True
+
+    def fetch_resampled_range(self, symbol: str, timeframe: int, date_from: datetime, date_to: datetime,
+                              compact: bool = False, base_timeframe: int = TIMEFRAME_M1):
+        """Bars of `timeframe` opened between `date_from` and `date_to`, derived from the cached base bars.
+
+        Only the base (M1) bars missing from the cache are downloaded, so every timeframe of a symbol shares one
+        download and one copy on disk (see `metatrader.resampler`). Without a cache the terminal serves
+        `timeframe` directly.
+        """
+        if self.cache is None:
+            return self.fetch_rates_range(symbol, timeframe, date_from, date_to, compact)
+
+        start = to_epoch(date_from)
+        end = to_epoch(date_to)
+        if not self._fill_cache(symbol, base_timeframe, start, end):
+            return None
+        rates = Resampler.from_store(self.cache, symbol, start, end, base_timeframe).rates(timeframe)
+        # As with the terminal, a bar that opened before `date_from` is not part of the range
+        rates = rates[rates["time"] >= start]
+        with span("process_rates", symbol):
+            return self._process_rates(rates, compact)
 
     def download_rates(self, dst_path: Path, symbol: str, timeframe: int, start_pos: int, count: int):
-        # Fetch rates
-        rates_frame = self.fetch_rates(symbol=symbol, timeframe=timeframe, start_pos=start_pos, count=count)
+        """Download `count` bars starting at `start_pos` into the bar store rooted at `dst_path`."""
+        rates = mt5.copy_rates_from_pos(symbol, timeframe, start_pos, count)
+        if rates is None:
+            logging.error("Failed to fetch rates")
+            return
 
-        # Save as CSV to dst_path
-        out_file = dst_path / f"{symbol}_{timeframe}_s{start_pos}_c{count}.csv"
-        rates_frame.to_csv(out_file, index=True)
-        logging.info(f"Rates saved to {out_file}")
+        BarStore(dst_path).append(symbol, timeframe, rates)
 
     def download_rates_range(self, dst_path: Path, symbol: str, timeframe: int, date_from: datetime, date_to: datetime):
-        # Fetch rates
-        rates_frame = self.fetch_rates_range(symbol=symbol, timeframe=timeframe, date_from=date_from,
-                                             date_to=date_to)
-
-        # Save as CSV to dst_path
-        file_name = f"{symbol}_{timeframe}_{date_from.strftime('%d_%m_%Y')}-{date_to.strftime('%d_%m_%Y')}.csv"
-        out_file = dst_path / file_name
-        rates_frame.to_csv(out_file, index=True)
-        logging.info(f"Rates saved to {out_file}")
+        """Download the bars between `date_from` and `date_to` into the bar store rooted at `dst_path`."""
+        rates = mt5.copy_rates_range(symbol, timeframe, date_from, date_to)
+        if rates is None:
+            logging.error("Failed to fetch rates")
+            return
+
+        BarStore(dst_path).append(symbol, timeframe, rates)
+
+    def download_ticks_range(self, dst_path: Path, symbol: str, date_from: datetime, date_to: datetime):
+        """Download the ticks between `date_from` and `date_to` into the tick store rooted at `dst_path`.
+
+        Ticks are requested one UTC day at a time, so a long range never has to fit in memory at once and an
+        interrupted download keeps the days already stored.
+
+        Returns:
+            int | None: Number of ticks added to the store, None if a request failed.
+        """
+        info = mt5.symbol_info(symbol)
+        if info is None:
+            logging.error(f"Failed to get symbol info for {symbol}")
+            return None
+
+        store = TickStore(dst_path)
+        added = 0
+        for day_start, day_end in day_ranges(date_from, date_to):
+            with span("fetch_ticks", symbol):
+                ticks = mt5.copy_ticks_range(symbol, day_start, day_end, mt5.COPY_TICKS_ALL)
+            if ticks is None:
+                logging.error(f"Failed to fetch ticks: {mt5.last_error()}")
+                return None
+            added += store.append(symbol, ticks, info.point)
+        return added
@@ -1,10 +1,12 @@
 import logging
 
-import MetaTrader5 as mt5
+from latency import span
+from metatrader.gateway import mt5
+from metatrader.metadata import MetadataCache
 
 
 def place_order(symbol: str, action: str, risk_per_trade: float = 0.02, risk_in_pips: int = 20,
-                reward_to_risk_ratio: float = 2) -> bool:
+                reward_to_risk_ratio: float = 2, tick=None, metadata: MetadataCache | None = None) -> bool:
     """Place a trading order (BUY or SELL) with proper risk management.
 
     Warning: This function assumes that 1 pip is equivalent to 10 ticks.
@@ -15,6 +17,9 @@ def place_order(symbol: str, action: str, risk_per_trade: float = 0.02, risk_in_
         risk_per_trade (float): Fraction of account balance to risk per trade (e.g., 0.02 for 2%).
         risk_in_pips (int): Distance (in pips) between the entry price and the stop-loss (SL).
         reward_to_risk_ratio (float): Ratio of take-profit (TP) to stop-loss (e.g., 2 for 2:1 RR).
+        tick: Latest tick of the symbol if the caller already has one; fetched from the terminal otherwise.
+        metadata (MetadataCache | None): Cache of symbol specifications and account balance. When None, both
+            are fetched from the terminal on every call.
 
     Returns:
         bool: True if the order was successfully placed, False otherwise.
@@ -22,27 +27,27 @@ def place_order(symbol: str, action: str, risk_per_trade: float = 0.02, risk_in_
     # Determine the order type (BUY or SELL)
     action_type = mt5.ORDER_TYPE_BUY if action.upper() == "BUY" else mt5.ORDER_TYPE_SELL
 
-    # Fetch symbol info
-    symbol_info = mt5.symbol_info(symbol)
-    if symbol_info is None or not symbol_info.visible:
-        logging.error(f"Symbol {symbol} not available or visible.")
+    # Fetch symbol specification and account balance
+    if metadata is None:
+        metadata = MetadataCache(symbol_ttl=0, account_ttl=0)
+    symbol_spec = metadata.symbol_spec(symbol)
+    if symbol_spec is None:
         return False
 
-    # Fetch account information
-    account_info = mt5.account_info()
-    if account_info is None:
-        logging.error("Failed to retrieve account information.")
+    balance = metadata.balance()
+    if balance is None:
         return False
 
     # Fetch current price
-    tick = mt5.symbol_info_tick(symbol)
+    if tick is None:
+        with span("symbol_info_tick", symbol):
+            tick = mt5.symbol_info_tick(symbol)
     if tick is None:
         logging.error(f"Failed to fetch current price for {symbol}.")
         return False
 
-    balance = account_info.balance
-    tick_size = symbol_info.point
-    tick_value = symbol_info.trade_tick_value or 1.0
+    tick_size = symbol_spec.point
+    tick_value = symbol_spec.trade_tick_value
     pip_size = tick_size * 10  # Usually in FX, a pip equals 10 ticks
 
     # Compute stop loss and take profit
@@ -57,8 +62,8 @@ def place_order(symbol: str, action: str, risk_per_trade: float = 0.02, risk_in_
     lot_size = (balance * risk_per_trade) / (risk_int_ticks * tick_value)
 
     # Adjust for the symbol's minimum lot size and round to match the volume step
-    lot_size = max(lot_size, symbol_info.volume_min)
-    lot_size = round(lot_size / symbol_info.volume_step) * symbol_info.volume_step
+    lot_size = max(lot_size, symbol_spec.volume_min)
+    lot_size = round(lot_size / symbol_spec.volume_step) * symbol_spec.volume_step
 
     # Create a trade request
     request = {
@@ -73,11 +78,13 @@ def place_order(symbol: str, action: str, risk_per_trade: float = 0.02, risk_in_
         "magic": 234000,  # Custom magic number
         "comment": "Algo trading",
         "type_time": mt5.ORDER_TIME_GTC,  # Good till cancel
-        "type_filling": symbol_info.filling_mode
+        "type_filling": symbol_spec.filling_mode
     }
 
-    # Send the trade request
-    result = mt5.order_send(request)
+    # Send the trade request; the balance may change once the order is filled
+    with span("order_send", symbol):
+        result = mt5.order_send(request)
+    metadata.invalidate_account()
     if result.retcode == mt5.TRADE_RETCODE_DONE:
         logging.info(
             f"Order executed: {action} {lot_size} {symbol}. Entry: {entry_price}, SL: {stop_loss}, TP: {take_profit}")
@@ -87,7 +94,9 @@ def place_order(symbol: str, action: str, risk_per_trade: float = 0.02, risk_in_
         if result.retcode == mt5.TRADE_RETCODE_INVALID_FILL:
             logging.info("Retry order with filling mode mt5.ORDER_FILLING_FOK")
             request["type_filling"] = mt5.ORDER_FILLING_FOK
-            result = mt5.order_send(request)
+            with span("order_send_fok", symbol):
+                result = mt5.order_send(request)
+            metadata.invalidate_account()
 
             if result.retcode == mt5.TRADE_RETCODE_DONE:
                 logging.info(f"{action} {lot_size} {symbol}. "
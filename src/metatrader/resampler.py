@@ -0,0 +1,201 @@
+"""
+Higher-timeframe bars derived locally from stored base (M1) bars.
+
+MT5 bar times are the broker's server time written as epoch seconds, so every bar of a timeframe up to D1
+starts at a multiple of its length from server midnight, weeks start on Sunday 00:00 and months on the
+first day of the month. Deriving them from M1 with those boundaries gives the same bars as the terminal
+would serve, without downloading every timeframe:
+
+    resampler = Resampler.from_store(store, "USDCAD")
+    h4 = resampler.frame(mt5.TIMEFRAME_H4)
+
+Derived views are computed on first use and cached; `append` adds new base bars and only re-aggregates
+the last bar of every cached view onwards. As with the terminal, the newest derived bar holds whatever
+base bars have arrived so far.
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from metatrader.bar_store import RATES_DTYPE, BarStore, rates_to_frame
+
+# MT5 timeframe constants (same values as the MetaTrader5 package)
+TIMEFRAME_M1 = 1
+TIMEFRAME_W1 = 0x8001
+TIMEFRAME_MN1 = 0xC001
+
+# Epoch day 0 was a Thursday; weekly bars start on Sundays
+_SUNDAY_OFFSET = 3 * 86400
+_WEEK = 7 * 86400
+
+
+def timeframe_seconds(timeframe: int) -> int:
+    """Duration of an MT5 timeframe constant in seconds (months are taken as 30 days)."""
+    if timeframe < 0x4000:
+        return timeframe * 60
+    if timeframe < 0x8000:
+        return (timeframe & 0xFF) * 3600
+    if timeframe < 0xC000:
+        return 7 * 86400
+    return 30 * 86400
+
+
+def bar_open_times(times: np.ndarray, timeframe: int, session_offset: int = 0) -> np.ndarray:
+    """Open time of the `timeframe` bar each of the given bar times falls in.
+
+    Args:
+        times (np.ndarray): Bar times in epoch seconds of server time.
+        timeframe (int): MT5 timeframe constant.
+        session_offset (int): Seconds to add to `times` to get server time, for bars stored in another zone.
+
+    Returns:
+        np.ndarray: int64 open times, in the zone of `times`.
+    """
+    server = np.asarray(times, dtype=np.int64) + session_offset
+    if timeframe == TIMEFRAME_MN1:
+        opens = server.astype("datetime64[s]").astype("datetime64[M]").astype("datetime64[s]").astype(np.int64)
+    elif timeframe == TIMEFRAME_W1:
+        opens = server - (server - _SUNDAY_OFFSET) % _WEEK
+    else:
+        seconds = timeframe_seconds(timeframe)
+        opens = server - server % seconds
+    return opens - session_offset
+
+
+def resample(rates: np.ndarray, timeframe: int, session_offset: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Aggregate time-sorted bars into `timeframe` bars.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The bars (`RATES_DTYPE`) and the index of the first source bar of each.
+    """
+    if len(rates) == 0:
+        return np.zeros(0, dtype=RATES_DTYPE), np.zeros(0, dtype=np.int64)
+    opens = bar_open_times(rates["time"], timeframe, session_offset)
+    starts = np.flatnonzero(np.r_[True, opens[1:] != opens[:-1]])
+    ends = np.r_[starts[1:], len(rates)]
+
+    bars = np.zeros(len(starts), dtype=RATES_DTYPE)
+    bars["time"] = opens[starts]
+    bars["open"] = rates["open"][starts]
+    bars["high"] = np.maximum.reduceat(rates["high"], starts)
+    bars["low"] = np.minimum.reduceat(rates["low"], starts)
+    bars["close"] = rates["close"][ends - 1]
+    bars["tick_volume"] = np.add.reduceat(rates["tick_volume"], starts)
+    bars["spread"] = np.minimum.reduceat(rates["spread"], starts)
+    bars["real_volume"] = np.add.reduceat(rates["real_volume"], starts)
+    return bars, starts
+
+
+class _View:
+    """Derived bars of one timeframe, in buffers that grow by doubling."""
+    __slots__ = ("bars", "starts", "size")
+
+    def __init__(self, bars: np.ndarray, starts: np.ndarray):
+        self.bars = bars
+        self.starts = starts
+        self.size = len(bars)
+
+    def replace_tail(self, position: int, bars: np.ndarray, starts: np.ndarray):
+        """Overwrite the bars from `position` on with the given ones."""
+        size = position + len(bars)
+        if size > len(self.bars):
+            capacity = max(2 * len(self.bars), size)
+            self.bars = np.resize(self.bars, capacity)
+            self.starts = np.resize(self.starts, capacity)
+        self.bars[position:size] = bars
+        self.starts[position:size] = starts
+        self.size = size
+
+
+class Resampler:
+    """Base bars of one symbol and the higher-timeframe views derived from them."""
+
+    def __init__(self, rates: np.ndarray | dict[str, np.ndarray], base_timeframe: int = TIMEFRAME_M1,
+                 session_offset: int = 0):
+        """
+        Args:
+            rates (np.ndarray | dict[str, np.ndarray]): Base bars sorted by time, as a `RATES_DTYPE` array or
+                the columns returned by `BarStore.read_arrays`.
+            base_timeframe (int): MT5 timeframe of the base bars.
+            session_offset (int): Seconds to add to the bar times to get the broker's server time, when the
+                bars are not stored in server time.
+        """
+        self.base_timeframe = base_timeframe
+        self.session_offset = session_offset
+        self._base = self._to_records(rates)
+        self._size = len(self._base)
+        self._views = {}
+
+    @classmethod
+    def from_store(cls, store: BarStore, symbol: str, date_from: datetime | int | None = None,
+                   date_to: datetime | int | None = None, base_timeframe: int = TIMEFRAME_M1,
+                   session_offset: int = 0) -> "Resampler":
+        """Resampler over the base bars of `symbol` kept in `store`."""
+        return cls(store.read_arrays(symbol, base_timeframe, date_from, date_to), base_timeframe, session_offset)
+
+    @staticmethod
+    def _to_records(rates: np.ndarray | dict[str, np.ndarray]) -> np.ndarray:
+        records = np.zeros(len(rates["time"]), dtype=RATES_DTYPE)
+        for name in RATES_DTYPE.names:
+            if isinstance(rates, dict) and name not in rates:
+                continue
+            records[name] = rates[name]
+        return records
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def base(self) -> np.ndarray:
+        """The base bars."""
+        return self._base[:self._size]
+
+    def rates(self, timeframe: int) -> np.ndarray:
+        """Bars of `timeframe` (at least the base timeframe) in the layout of `mt5.copy_rates_*`.
+
+        The returned array is a view on the cache: an append that rebuilds its last bar overwrites that bar in
+        place (unless the cache had to grow), while new bars are not added to it. Copy it to keep a snapshot.
+        """
+        if timeframe == self.base_timeframe:
+            return self.base
+        if timeframe_seconds(timeframe) < timeframe_seconds(self.base_timeframe):
+            raise ValueError(f"Timeframe {timeframe} is shorter than the base timeframe {self.base_timeframe}")
+        view = self._views.get(timeframe)
+        if view is None:
+            view = self._views[timeframe] = _View(*resample(self.base, timeframe, self.session_offset))
+        return view.bars[:view.size]
+
+    def frame(self, timeframe: int) -> pd.DataFrame:
+        """Bars of `timeframe` as the OHLCV frame used by the strategies."""
+        bars = self.rates(timeframe)
+        return rates_to_frame({name: bars[name] for name in RATES_DTYPE.names})
+
+    def append(self, rates: np.ndarray | dict[str, np.ndarray]) -> int:
+        """Add new base bars and update the cached views.
+
+        Bars not newer than the last base bar are ignored. Every view is re-aggregated from its last bar
+        on, so the cost is proportional to the new bars rather than to the history.
+
+        Returns:
+            int: Number of base bars added.
+        """
+        new = self._to_records(rates)
+        if self._size:
+            new = new[new["time"] > self._base["time"][self._size - 1]]
+        if len(new) == 0:
+            return 0
+
+        size = self._size + len(new)
+        if size > len(self._base):
+            self._base = np.resize(self._base, max(2 * len(self._base), size))
+        self._base[self._size:size] = new
+        self._size = size
+
+        for timeframe, view in self._views.items():
+            # The last derived bar may still be growing, so it is rebuilt with the new base bars
+            position = max(view.size - 1, 0)
+            first = int(view.starts[position]) if view.size else 0
+            bars, starts = resample(self._base[first:size], timeframe, self.session_offset)
+            view.replace_tail(position, bars, starts + first)
+        return len(new)
@@ -0,0 +1,298 @@
+"""
+Compressed on-disk store for MT5 ticks.
+
+Ticks are partitioned by symbol and UTC day, one file per day holding a sequence of independent blocks of at
+most `block_size` ticks:
+
+    <root>/<symbol>/<YYYY-MM-DD>.ticks
+
+Inside a block, prices are whole numbers of `symbol_info.point`: the bid and last are delta-encoded from the
+first tick and the ask is kept as the spread over the bid. Timestamps are delta-encoded milliseconds. Every
+encoded column is narrowed to the smallest integer type holding its values and byte-shuffled (all first
+bytes, then all second bytes, ...), which leaves long runs of zeros, and the block is zlib-compressed. Quote
+ticks take 2-3 bytes instead of the 60 of `copy_ticks_*` output.
+
+A day file is always written to a temporary file and renamed over the previous one, so an interrupted
+download leaves the day as it was rather than ending in a partial block.
+
+Decoding is a decompression, a few `np.cumsum` and one multiplication per price column, block by block, so
+`iter_blocks` scans a day of ticks with memory bounded by one block.
+"""
+import logging
+import math
+import os
+import struct
+import zlib
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+from metatrader.bar_store import to_epoch
+
+# Layout of the structured arrays returned by mt5.copy_ticks_*
+TICK_DTYPE = np.dtype([
+    ("time", "<i8"),
+    ("bid", "<f8"),
+    ("ask", "<f8"),
+    ("last", "<f8"),
+    ("volume", "<u8"),
+    ("time_msc", "<i8"),
+    ("flags", "<u4"),
+    ("volume_real", "<f8"),
+])
+
+# Block header: magic, tick count, payload length, point, first time_msc, first bid and last in points, and
+# the type code of every encoded column (see _CODES)
+_COLUMNS = ("time_msc", "bid", "spread", "last", "volume", "flags", "volume_real")
+_HEADER = struct.Struct(f"<4sIIdqqq{len(_COLUMNS)}s")
+_MAGIC = b"TBK1"
+
+# Fixed-width column types by their one-byte code. numpy's `dtype.char` is not portable ("l" is C long: 8 bytes
+# on Linux, 4 on Windows), so files carry these codes; "l" and "L" read as the 8 bytes they were when written
+_CODES = {
+    b"b": np.dtype("<i1"), b"h": np.dtype("<i2"), b"i": np.dtype("<i4"), b"q": np.dtype("<i8"),
+    b"B": np.dtype("<u1"), b"H": np.dtype("<u2"), b"I": np.dtype("<u4"), b"Q": np.dtype("<u8"),
+    b"d": np.dtype("<f8"), b"l": np.dtype("<i8"), b"L": np.dtype("<u8"),
+}
+_CODE_OF = {dtype: code for code, dtype in reversed(_CODES.items())}
+
+_SIGNED = (np.int8, np.int16, np.int32, np.int64)
+_UNSIGNED = (np.uint8, np.uint16, np.uint32, np.uint64)
+
+
+def _narrow(values: np.ndarray, signed: bool) -> np.ndarray:
+    """`values` in the smallest integer type that holds them all."""
+    if len(values) == 0:
+        return values.astype(np.int8 if signed else np.uint8)
+    low, high = values.min(), values.max()
+    for dtype in _SIGNED if signed else _UNSIGNED:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return values.astype(dtype)
+    return values
+
+
+def _shuffle(values: np.ndarray) -> bytes:
+    values = np.ascontiguousarray(values)
+    return values.view(np.uint8).reshape(len(values), values.itemsize).T.tobytes()
+
+
+def _unshuffle(buffer: bytes, offset: int, count: int, dtype: np.dtype) -> tuple[np.ndarray, int]:
+    size = count * dtype.itemsize
+    planes = np.frombuffer(buffer, dtype=np.uint8, count=size, offset=offset).reshape(dtype.itemsize, count)
+    return np.ascontiguousarray(planes.T).view(dtype).reshape(count), offset + size
+
+
+def _digits(point: float) -> int:
+    return max(0, round(-math.log10(point)))
+
+
+def encode_block(ticks: np.ndarray, point: float, level: int = 6) -> bytes:
+    """Encode time-sorted ticks (`TICK_DTYPE`) whose prices are whole numbers of `point`."""
+    time_msc = ticks["time_msc"].astype(np.int64)
+    bid = np.rint(ticks["bid"] / point).astype(np.int64)
+    ask = np.rint(ticks["ask"] / point).astype(np.int64)
+    last = np.rint(ticks["last"] / point).astype(np.int64)
+
+    columns = {
+        "time_msc": _narrow(np.diff(time_msc, prepend=time_msc[0]), signed=False),
+        "bid": _narrow(np.diff(bid, prepend=bid[0]), signed=True),
+        "spread": _narrow(ask - bid, signed=True),
+        "last": _narrow(np.diff(last, prepend=last[0]), signed=True),
+        "volume": _narrow(ticks["volume"].astype(np.uint64), signed=False),
+        "flags": _narrow(ticks["flags"].astype(np.uint64), signed=False),
+        "volume_real": ticks["volume_real"].astype(np.float64),
+    }
+    payload = zlib.compress(b"".join(_shuffle(columns[name]) for name in _COLUMNS), level)
+    codes = b"".join(_CODE_OF[columns[name].dtype.newbyteorder("<")] for name in _COLUMNS)
+    header = _HEADER.pack(_MAGIC, len(ticks), len(payload), point, int(time_msc[0]), int(bid[0]), int(last[0]),
+                          codes)
+    return header + payload
+
+
+def decode_block(header: tuple, payload: bytes) -> np.ndarray:
+    """Decode one block back into a `TICK_DTYPE` array."""
+    _, count, _, point, time0, bid0, last0, codes = header
+    buffer = zlib.decompress(payload)
+    columns = {}
+    offset = 0
+    for name, code in zip(_COLUMNS, codes):
+        columns[name], offset = _unshuffle(buffer, offset, count, _CODES[bytes([code])])
+
+    digits = _digits(point)
+    ticks = np.empty(count, dtype=TICK_DTYPE)
+    time_msc = time0 + np.cumsum(columns["time_msc"], dtype=np.int64)
+    bid = bid0 + np.cumsum(columns["bid"], dtype=np.int64)
+    ticks["time_msc"] = time_msc
+    ticks["time"] = time_msc // 1000
+    ticks["bid"] = np.round(bid * point, digits)
+    ticks["ask"] = np.round((bid + columns["spread"]) * point, digits)
+    ticks["last"] = np.round((last0 + np.cumsum(columns["last"], dtype=np.int64)) * point, digits)
+    ticks["volume"] = columns["volume"]
+    ticks["flags"] = columns["flags"]
+    ticks["volume_real"] = columns["volume_real"]
+    return ticks
+
+
+class TickStore:
+    """Day-partitioned, block-compressed tick files (see the module docstring for the format)."""
+
+    def __init__(self, root: Path, block_size: int = 1 << 16, level: int = 6):
+        self.root = Path(root)
+        self.block_size = block_size
+        self.level = level
+
+    def _day_path(self, symbol: str, day: datetime) -> Path:
+        return self.root / symbol / f"{day:%Y-%m-%d}.ticks"
+
+    def days(self, symbol: str) -> list[Path]:
+        """The day files of `symbol`, oldest first."""
+        symbol_path = self.root / symbol
+        return sorted(symbol_path.glob("*.ticks")) if symbol_path.exists() else []
+
+    @staticmethod
+    def _read_blocks(path: Path, data: bytes | None = None) -> Iterator[tuple[tuple, bytes]]:
+        """Yield the (header, payload) of every block of the day file at `path`, whose bytes may be given."""
+        if data is None:
+            data = path.read_bytes()
+        offset = 0
+        while offset < len(data):
+            header = _HEADER.unpack_from(data, offset)
+            if header[0] != _MAGIC:
+                raise ValueError(f"Corrupt tick file {path} at byte {offset}")
+            start = offset + _HEADER.size
+            offset = start + header[2]
+            yield header, data[start:offset]
+
+    @staticmethod
+    def _merge(stored: np.ndarray, ticks: np.ndarray) -> tuple[np.ndarray, int]:
+        """Merge `ticks` into the time-sorted `stored` ticks of a day.
+
+        Ticks are only told apart by their millisecond, so each millisecond keeps the ticks of whichever side
+        holds more of them: a re-downloaded range adds nothing and a backfilled one adds its missing ticks.
+
+        Returns:
+            tuple[np.ndarray, int]: The merged ticks, sorted by `time_msc`, and the number of ticks added.
+        """
+        stored_times, stored_counts = np.unique(stored["time_msc"], return_counts=True)
+        times, counts = np.unique(ticks["time_msc"], return_counts=True)
+        idx = np.minimum(np.searchsorted(stored_times, times), len(stored_times) - 1)
+        already = np.where(stored_times[idx] == times, stored_counts[idx], 0)
+        replaced = times[counts > already]
+
+        keep = ~np.isin(stored["time_msc"], replaced)
+        take = np.isin(ticks["time_msc"], replaced)
+        merged = np.concatenate((stored[keep], ticks[take]))
+        return merged[np.argsort(merged["time_msc"], kind="stable")], len(merged) - len(stored)
+
+    def _encode(self, ticks: np.ndarray, point: float) -> bytes:
+        return b"".join(encode_block(ticks[start:start + self.block_size], point, self.level)
+                        for start in range(0, len(ticks), self.block_size))
+
+    @staticmethod
+    def _write_day(path: Path, data: bytes):
+        """Replace the day file at `path` with `data`, so an interrupted write never leaves a partial block."""
+        temp = path.with_name(path.name + ".tmp")
+        temp.write_bytes(data)
+        os.replace(temp, path)
+
+    def append(self, symbol: str, ticks: np.ndarray, point: float) -> int:
+        """Store new ticks of `symbol`.
+
+        Ticks newer than the newest stored tick of their day are appended as new blocks. A download that reaches
+        back before it, such as a backfill or a repeated range, is merged with the stored day instead (see
+        `_merge`), which rewrites the day file. Either way the file is written to a temporary file first and
+        renamed over the day file.
+
+        Args:
+            symbol (str): Trading instrument (e.g., "EURUSD").
+            ticks (np.ndarray): Ticks in the layout of `mt5.copy_ticks_*`, sorted by `time_msc`.
+            point (float): `symbol_info(symbol).point`; every price must be a whole number of points.
+
+        Returns:
+            int: Number of ticks added.
+        """
+        if len(ticks) == 0:
+            return 0
+        days = ticks["time_msc"] // 86_400_000
+        boundaries = np.flatnonzero(np.diff(days)) + 1
+        added = 0
+        for day_ticks in np.split(ticks, boundaries):
+            day = datetime.fromtimestamp(int(day_ticks["time_msc"][0]) // 1000, timezone.utc)
+            path = self._day_path(symbol, day)
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+            data = path.read_bytes() if path.exists() else b""
+            blocks = list(self._read_blocks(path, data))
+            if not blocks:
+                self._write_day(path, self._encode(day_ticks, point))
+                added += len(day_ticks)
+                continue
+
+            last_block = decode_block(*blocks[-1])
+            last_time = last_block["time_msc"][-1]
+            if day_ticks["time_msc"][0] < last_time:
+                stored = np.concatenate([decode_block(*block) for block in blocks])
+                merged, count = self._merge(stored, day_ticks)
+                if count:
+                    logging.info(f"Merged {count} earlier {symbol} ticks into {path.name}")
+                    self._write_day(path, self._encode(merged, point))
+                    added += count
+                continue
+
+            # As many ticks of the newest stored millisecond as are already stored are skipped
+            already = int(np.count_nonzero(last_block["time_msc"] == last_time))
+            newer = np.searchsorted(day_ticks["time_msc"], last_time, side="right")
+            day_ticks = day_ticks[min(already, newer):]
+            if len(day_ticks) == 0:
+                continue
+            self._write_day(path, data + self._encode(day_ticks, point))
+            added += len(day_ticks)
+
+        logging.info(f"Stored {added} {symbol} ticks in {self.root}")
+        return added
+
+    def iter_blocks(self, symbol: str, date_from: datetime | int | None = None,
+                    date_to: datetime | int | None = None) -> Iterator[np.ndarray]:
+        """Yield the stored ticks within [date_from, date_to] (epoch seconds or datetimes) block by block."""
+        start = to_epoch(date_from) * 1000 if date_from is not None else None
+        end = to_epoch(date_to) * 1000 + 999 if date_to is not None else None
+        first_day = datetime.fromtimestamp(start // 1000, timezone.utc).date() if start is not None else None
+        last_day = datetime.fromtimestamp(end // 1000, timezone.utc).date() if end is not None else None
+
+        for path in self.days(symbol):
+            day = datetime.strptime(path.stem, "%Y-%m-%d").date()
+            if (first_day is not None and day < first_day) or (last_day is not None and day > last_day):
+                continue
+            for header, payload in self._read_blocks(path):
+                ticks = decode_block(header, payload)
+                if start is not None and ticks["time_msc"][-1] < start:
+                    continue
+                if end is not None and ticks["time_msc"][0] > end:
+                    break
+                lo = np.searchsorted(ticks["time_msc"], start, side="left") if start is not None else 0
+                hi = np.searchsorted(ticks["time_msc"], end, side="right") if end is not None else len(ticks)
+                if hi > lo:
+                    yield ticks[lo:hi]
+
+    def read(self, symbol: str, date_from: datetime | int | None = None,
+             date_to: datetime | int | None = None) -> np.ndarray:
+        """Return the stored ticks within [date_from, date_to] as one `TICK_DTYPE` array."""
+        blocks = list(self.iter_blocks(symbol, date_from, date_to))
+        return np.concatenate(blocks) if blocks else np.empty(0, dtype=TICK_DTYPE)
+
+    def size(self, symbol: str) -> int:
+        """Bytes on disk for `symbol`."""
+        return sum(path.stat().st_size for path in self.days(symbol))
+
+
+def day_ranges(date_from: datetime | int, date_to: datetime | int) -> Iterator[tuple[datetime, datetime]]:
+    """Split [date_from, date_to] into UTC days, the unit in which ticks are downloaded and stored."""
+    start = datetime.fromtimestamp(to_epoch(date_from), timezone.utc)
+    end = datetime.fromtimestamp(to_epoch(date_to), timezone.utc)
+    while start <= end:
+        next_day = datetime.combine(start.date() + timedelta(days=1), datetime.min.time(), timezone.utc)
+        yield start, min(next_day - timedelta(milliseconds=1), end)
+        start = next_day
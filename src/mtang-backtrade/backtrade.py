@@ -1,16 +1,21 @@
 import numpy as np
 from dotenv import load_dotenv
 from pathlib import Path
-from memory_profiler import profile
 from itertools import islice
 import pandas as pd
 from collections import deque
 from dataclasses import dataclass
+from datetime import datetime
 from enum import Enum
 import matplotlib.pyplot as plt
 
 from tqdm import tqdm
 
+from backtest.fills import LOSS, WIN, resolve_exits
+from backtest.trades import BUY, SELL, TradeBook, TradeOutcomes
+from backtest.vectorized import rsi, crossed_above, crossed_below
+from metatrader import BarStore
+
 load_dotenv()
 
 
@@ -20,19 +25,21 @@ class OrderType(Enum):
     SELL = 1
 
 
-@dataclass()
+@dataclass(slots=True)
 class Order:
     type: OrderType
     price: float
     sl: float
     tp: float
 
-    def __eq__(self, other):
-        return self.type == other.type and self.sl == other.sl and self.tp == other.tp and self.price == other.price
-
 
 def load_rates(src: Path) -> pd.DataFrame:
-    return pd.read_csv(src).set_index("time")
+    return pd.read_csv(src, parse_dates=["time"]).set_index("time")
+
+
+def load_store_rates(root: Path, symbol: str, timeframe: int, date_from: datetime | None = None,
+                     date_to: datetime | None = None) -> pd.DataFrame:
+    return BarStore(root).read(symbol, timeframe, date_from, date_to)
 
 
 def cross_over(points: list[float], target: float) -> bool:
@@ -41,15 +48,18 @@ def cross_over(points: list[float], target: float) -> bool:
     return points[-1] > target > points[-2] or points[-1] < target < points[-2]
 
 
-def backtrade_rsi_1(rates: pd.DataFrame, rsi_window: int, lower_bound: int, upper_bound: int):
+def backtrade_rsi_1(rates: pd.DataFrame, rsi_window: int, lower_bound: int, upper_bound: int) -> TradeBook:
     sl_pct = 0.1
     tp_pct = 0.1
 
     rsi_list = []
 
-    orders = []
-    losses = 0
-    wins = 0
+    # Every order is a row of the book; the open ones are also kept as arrays scanned on each bar
+    book = TradeBook()
+    open_ids = np.empty(0, dtype=np.int64)
+    open_sign = np.empty(0)
+    open_sl = np.empty(0)
+    open_tp = np.empty(0)
 
     buffer = np.empty(rsi_window)
     buffer[:] = np.nan
@@ -76,55 +86,115 @@ def backtrade_rsi_1(rates: pd.DataFrame, rsi_window: int, lower_bound: int, uppe
             if len(rsi_list) > 0 and rsi < upper_bound < rsi_list[-1]:
                 sl = current_price + sl_pct * current_price
                 tp = current_price - tp_pct * current_price
-                orders.append(Order(OrderType.SELL, price=current_price, sl=sl, tp=tp))
+                open_ids = np.append(open_ids, book.open(SELL, idx, current_price, sl, tp))
+                open_sign, open_sl, open_tp = np.append(open_sign, -1.0), np.append(open_sl, sl), np.append(open_tp, tp)
 
             # Check for BUY orders
             if len(rsi_list) > 0 and rsi < lower_bound < rsi_list[-1]:
                 sl = current_price - sl_pct * current_price
                 tp = current_price + tp_pct * current_price
-                orders.append(Order(OrderType.BUY, price=current_price, sl=sl, tp=tp))
-
-            complete_orders = []
-            for entry in orders:
-                if entry.type == OrderType.SELL:
-                    if current_price >= entry.sl:
-                        losses += 1
-                        complete_orders.append(entry)
-                    elif current_price <= entry.tp:
-                        wins += 1
-                        complete_orders.append(entry)
-                if entry.type == OrderType.BUY:
-                    if current_price <= entry.sl:
-                        losses += 1
-                        complete_orders.append(entry)
-                    elif current_price >= entry.tp:
-                        wins += 1
-                        complete_orders.append(entry)
-
-            for entry in complete_orders:
-                orders.remove(entry)
+                open_ids = np.append(open_ids, book.open(BUY, idx, current_price, sl, tp))
+                open_sign, open_sl, open_tp = np.append(open_sign, 1.0), np.append(open_sl, sl), np.append(open_tp, tp)
+
+            if len(open_ids):
+                # A stop-loss is checked before the take-profit, as for a single order
+                lost = open_sign * (current_price - open_sl) <= 0
+                won = ~lost & (open_sign * (current_price - open_tp) >= 0)
+                done = lost | won
+                if done.any():
+                    book.close(open_ids[lost], idx, current_price, LOSS)
+                    book.close(open_ids[won], idx, current_price, WIN)
+                    keep = ~done
+                    open_ids, open_sign = open_ids[keep], open_sign[keep]
+                    open_sl, open_tp = open_sl[keep], open_tp[keep]
 
             rsi_list.append(rsi)
         buffer[buffer_idx % rsi_window] = current_price
         buffer_idx += 1
 
-    print(f"Wins: {wins}, Losses: {losses}")
-    print(f"Win Rate: {wins / (wins + losses):.2f}")
+    print(f"Wins: {book.wins}, Losses: {book.losses}")
+    print(f"Win Rate: {book.win_rate:.2f}")
+    return book
 
 
-def backtrade_rsi_2(rates: pd.DataFrame, rsi_window: int, upper_bound: int, lower_bound: int):
-    sl_pct = 0.1
-    tp_pct = 0.1
-
-    delta = rates["Close"].diff()
-    avg_u = delta.where(delta > 0, 0).ewm(span=rsi_window).mean()
-    avg_d = (-delta.where(delta < 0, 0)).ewm(span=rsi_window).mean()
-
-    losses = 0
-    wins = 0
-
-    print(f"Wins: {wins}, Losses: {losses}")
-    print(f"Win Rate: {wins / (wins + losses):.2f}")
+@dataclass()
+class BacktestResult(TradeOutcomes):
+    """Trades produced by a vectorized backtest, one array element per trade.
+
+    `outcome` is 1 for a take-profit (win), -1 for a stop-loss (loss) and 0 for a trade that is still
+    open at the end of the data; open trades have `exit_idx == -1` and a NaN `exit_price`.
+    """
+    entry_idx: np.ndarray
+    direction: np.ndarray
+    entry_price: np.ndarray
+    sl: np.ndarray
+    tp: np.ndarray
+    exit_idx: np.ndarray
+    exit_price: np.ndarray
+    outcome: np.ndarray
+
+    def to_frame(self, index: pd.Index | None = None) -> pd.DataFrame:
+        """Return the trades as a DataFrame, mapping bar positions to `index` labels when given."""
+        frame = pd.DataFrame({
+            "entry_idx": self.entry_idx,
+            "direction": [OrderType(d).name for d in self.direction],
+            "entry_price": self.entry_price,
+            "sl": self.sl,
+            "tp": self.tp,
+            "exit_idx": self.exit_idx,
+            "exit_price": self.exit_price,
+            "outcome": self.outcome,
+        })
+        if index is not None:
+            frame["entry_time"] = index[self.entry_idx]
+            frame["exit_time"] = pd.Series(index[self.exit_idx], dtype=index.dtype).where(self.exit_idx >= 0)
+        return frame
+
+
+def backtrade_rsi_2(rates: pd.DataFrame, rsi_window: int, lower_bound: int, upper_bound: int,
+                    sl_pct: float = 0.1, tp_pct: float = 0.1) -> BacktestResult:
+    """Vectorized RSI crossover backtest evaluated on closing prices.
+
+    RSI is computed once over the whole close array, BUY entries are the bars where it crosses above
+    `lower_bound` and SELL entries the bars where it crosses below `upper_bound`, the same rules as
+    `ta.check_rsi_signal`. All trades are then resolved in bulk against the closes that follow their
+    entry bars, see `backtest.fills.resolve_exits`.
+
+    Args:
+        rates (pd.DataFrame): Rates with a "Close" column.
+        rsi_window (int): RSI period.
+        lower_bound (int): RSI level whose upward crossing opens a BUY.
+        upper_bound (int): RSI level whose downward crossing opens a SELL.
+        sl_pct (float): Stop-loss distance as a fraction of the entry price.
+        tp_pct (float): Take-profit distance as a fraction of the entry price.
+
+    Returns:
+        BacktestResult: Entries, exits and outcome of every generated trade.
+    """
+    close = rates["Close"].to_numpy(dtype=np.float64)
+    rsi_values = rsi(close, rsi_window)
+
+    buy_idx = np.flatnonzero(crossed_above(rsi_values, lower_bound))
+    sell_idx = np.flatnonzero(crossed_below(rsi_values, upper_bound))
+
+    entry_idx = np.concatenate((buy_idx, sell_idx))
+    direction = np.concatenate((np.full(len(buy_idx), OrderType.BUY.value, dtype=np.int8),
+                                np.full(len(sell_idx), OrderType.SELL.value, dtype=np.int8)))
+    order = np.argsort(entry_idx, kind="stable")
+    entry_idx = entry_idx[order]
+    direction = direction[order]
+
+    entry_price = close[entry_idx]
+    sign = np.where(direction == OrderType.BUY.value, 1.0, -1.0)
+    sl = entry_price - sign * sl_pct * entry_price
+    tp = entry_price + sign * tp_pct * entry_price
+
+    exits = resolve_exits(close, close, entry_idx, direction == OrderType.BUY.value, sl, tp)
+    # Trades are evaluated on closes, so they exit at the close that crossed the level
+    exit_price = np.where(exits.exit_idx >= 0, close[exits.exit_idx], np.nan)
+
+    return BacktestResult(entry_idx=entry_idx, direction=direction, entry_price=entry_price, sl=sl, tp=tp,
+                          exit_idx=exits.exit_idx, exit_price=exit_price, outcome=exits.outcome)
 
 
 def main():
@@ -135,9 +205,11 @@ def main():
     from time import perf_counter
 
     time_start = perf_counter()
-    backtrade_rsi_1(rates, 14, 30, 70)
-    # backtrade_rsi_2(rates, 14, 30, 70)
+    # backtrade_rsi_1(rates, 14, 30, 70)
+    result = backtrade_rsi_2(rates, 14, 30, 70)
     time_end = perf_counter()
+    print(f"Wins: {result.wins}, Losses: {result.losses}")
+    print(f"Win Rate: {result.win_rate:.2f}")
     print(f"Time elapsed: {time_end - time_start:.2f} seconds")
 
     # rsi_slice = rsi[-30:]
@@ -0,0 +1,87 @@
+"""
+Seeded synthetic market data shaped like the MetaTrader 5 API output.
+
+Used to benchmark and test the engines offline: the same seed always gives the same bars and ticks.
+"""
+import numpy as np
+import pandas as pd
+
+from metatrader.bar_store import RATES_DTYPE, rates_to_frame
+from metatrader.tick_store import TICK_DTYPE
+
+# COPY_TICKS flags of a quote tick: TICK_FLAG_BID | TICK_FLAG_ASK
+_QUOTE_FLAGS = 2 | 4
+
+# 2020-01-01 00:00:00 UTC
+DEFAULT_START = 1_577_836_800
+
+
+def synthetic_rates(n_bars: int, seed: int = 0, start: int = DEFAULT_START, timeframe_seconds: int = 60,
+                    start_price: float = 1.35, volatility: float = 2e-4, digits: int = 5) -> np.ndarray:
+    """Generate bars following a geometric random walk.
+
+    Every bar opens at the previous close; highs and lows extend beyond the open/close range by a
+    half-normal amount of the same scale as the close-to-close moves.
+
+    Args:
+        n_bars (int): Number of bars.
+        seed (int): Random seed.
+        start (int): Open time of the first bar, in epoch seconds.
+        timeframe_seconds (int): Bar duration in seconds.
+        start_price (float): Open of the first bar.
+        volatility (float): Standard deviation of the close-to-close log returns.
+        digits (int): Decimal places prices are rounded to.
+
+    Returns:
+        np.ndarray: Bars in the layout of `mt5.copy_rates_*` (`RATES_DTYPE`).
+    """
+    rng = np.random.default_rng(seed)
+    close = np.round(start_price * np.exp(np.cumsum(rng.normal(0.0, volatility, n_bars))), digits)
+    open_ = np.concatenate(([round(start_price, digits)], close[:-1]))
+
+    rates = np.empty(n_bars, dtype=RATES_DTYPE)
+    rates["time"] = start + timeframe_seconds * np.arange(n_bars, dtype=np.int64)
+    rates["open"] = open_
+    rates["close"] = close
+    wick_scale = volatility * close
+    rates["high"] = np.round(np.maximum(open_, close) + np.abs(rng.normal(0.0, wick_scale)), digits)
+    rates["low"] = np.round(np.minimum(open_, close) - np.abs(rng.normal(0.0, wick_scale)), digits)
+    rates["tick_volume"] = rng.integers(1, 500, n_bars)
+    rates["spread"] = rng.integers(0, 20, n_bars)
+    rates["real_volume"] = 0
+    return rates
+
+
+def synthetic_frame(n_bars: int, seed: int = 0, compact: bool = False, **kwargs) -> pd.DataFrame:
+    """`synthetic_rates` as the OHLCV frame used by the strategies and `Backtest` (see `rates_to_frame`)."""
+    rates = synthetic_rates(n_bars, seed, **kwargs)
+    return rates_to_frame({name: rates[name] for name in RATES_DTYPE.names}, compact)
+
+
+def synthetic_ticks(n_ticks: int, seed: int = 0, start: int = DEFAULT_START, mean_interval_ms: float = 250.0,
+                    start_price: float = 1.35, digits: int = 5) -> np.ndarray:
+    """Generate quote ticks: the bid moves by whole points and the spread varies between 1 and 3 points.
+
+    Args:
+        n_ticks (int): Number of ticks.
+        seed (int): Random seed.
+        start (int): Time of the first tick, in epoch seconds.
+        mean_interval_ms (float): Mean time between ticks, in milliseconds (exponentially distributed).
+        start_price (float): Bid of the first tick.
+        digits (int): Decimal places of the quotes; one point is 10 ** -digits.
+
+    Returns:
+        np.ndarray: Ticks in the layout of `mt5.copy_ticks_*` (`TICK_DTYPE`).
+    """
+    rng = np.random.default_rng(seed)
+    point = 10.0 ** -digits
+    bid_points = round(start_price / point) + np.cumsum(rng.integers(-2, 3, n_ticks))
+    spread_points = rng.integers(1, 4, n_ticks)
+
+    ticks = np.zeros(n_ticks, dtype=TICK_DTYPE)
+    ticks["time_msc"] = start * 1000 + np.cumsum(rng.exponential(mean_interval_ms, n_ticks).astype(np.int64))
+    ticks["time"] = ticks["time_msc"] // 1000
+    ticks["bid"] = np.round(bid_points * point, digits)
+    ticks["ask"] = np.round((bid_points + spread_points) * point, digits)
+    ticks["flags"] = _QUOTE_FLAGS
+    return ticks
@@ -1,6 +1,6 @@
 import MetaTrader5 as mt5
+import numpy as np
 import pandas as pd
-import talib
 
 # Constants
 RSI_OVERSOLD = 30
@@ -66,7 +66,8 @@ def check_rsi_signal(rates: pd.DataFrame,
     overbought condition). If no crossover event is detected, the function returns HOLD.
 
     Args:
-        rates (pd.DataFrame): DataFrame containing historical closing prices in a column named "Close".
+        rates (pd.DataFrame): DataFrame containing historical closing prices in a column named "Close"
+            (float64, or float32 from a compact fetch).
         timeperiod (int, optional): The number of periods used to calculate RSI. Defaults to 14.
         lower_bound (int, optional): The lower RSI threshold indicating oversold conditions. Defaults to RSI_OVERSOLD.
         upper_bound (int, optional): The upper RSI threshold indicating overbought conditions. Defaults to RSI_OVERBOUGHT.
@@ -78,12 +79,36 @@ def check_rsi_signal(rates: pd.DataFrame,
             - "HOLD": No RSI crossover detected; no immediate trading action recommended.
 
     """
-    rsi_values = talib.RSI(rates["Close"], timeperiod=timeperiod)  # Calculate RSI
+    # Imported on use: the live loop only needs the streaming RSI
+    import talib
+
+    # TA-Lib only takes float64, so compact (float32) closes are converted explicitly
+    close = rates["Close"].to_numpy(dtype=np.float64)
+    rsi_values = talib.RSI(close, timeperiod=timeperiod)  # Calculate RSI
 
     # Get the last two RSI values to detect crossovers
-    latest_rsi = rsi_values.iloc[-1]  # most recent RSI value
-    prev_rsi = rsi_values.iloc[-2]  # previous RSI value
+    latest_rsi = rsi_values[-1]  # most recent RSI value
+    prev_rsi = rsi_values[-2]  # previous RSI value
+
+    return rsi_crossover_signal(prev_rsi, latest_rsi, lower_bound, upper_bound)
+
+
+def rsi_crossover_signal(prev_rsi: float,
+                         latest_rsi: float,
+                         lower_bound: int = RSI_OVERSOLD,
+                         upper_bound: int = RSI_OVERBOUGHT) -> str:
+    """Generate a trading signal ("BUY", "SELL", or "HOLD") from the last two RSI values.
+
+    Args:
+        prev_rsi (float): RSI value of the previous bar.
+        latest_rsi (float): RSI value of the most recent bar.
+        lower_bound (int, optional): The lower RSI threshold indicating oversold conditions. Defaults to RSI_OVERSOLD.
+        upper_bound (int, optional): The upper RSI threshold indicating overbought conditions. Defaults to RSI_OVERBOUGHT.
 
+    Returns:
+        str: "BUY" when RSI crosses above the lower bound, "SELL" when it crosses below the upper bound,
+            "HOLD" otherwise.
+    """
     signal = "HOLD"
 
     # Check for crossover above lower bound (buy signal)
@@ -0,0 +1,114 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from src.metatrader.bar_store import RATES_DTYPE, BarStore, to_epoch
+
+
+def create_rates(start: datetime, count: int, step: int = 60, close: float = 1.35):
+    """
+    Create a structured rates array shaped like the output of mt5.copy_rates_*.
+    """
+    rates = np.zeros(count, dtype=RATES_DTYPE)
+    rates["time"] = to_epoch(start) + step * np.arange(count)
+    rates["open"] = rates["high"] = rates["low"] = rates["close"] = close
+    rates["tick_volume"] = 1
+    return rates
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BarStore(tmp_path)
+
+
+def test_append_and_read_across_partitions(store):
+    """
+    Test that a range spanning a year boundary is split into partitions and read back in order.
+    """
+    rates = create_rates(datetime(2023, 12, 31, 23, 0), 120)
+    assert store.append("USDCAD", 1, rates) == 120
+
+    assert store.partitions("USDCAD", 1) == [2023, 2024]
+    columns = store.read_arrays("USDCAD", 1)
+    np.testing.assert_array_equal(columns["time"], rates["time"])
+    assert store.time_range("USDCAD", 1) == (int(rates["time"][0]), int(rates["time"][-1]))
+
+
+def test_append_deduplicates_and_keeps_latest(store):
+    """
+    Test that overlapping appends keep one bar per timestamp, taking the newest values.
+    """
+    store.append("USDCAD", 1, create_rates(datetime(2024, 1, 1), 10, close=1.0))
+    added = store.append("USDCAD", 1, create_rates(datetime(2024, 1, 1, 0, 5), 10, close=2.0))
+
+    assert added == 5
+    columns = store.read_arrays("USDCAD", 1)
+    assert len(columns["time"]) == 15
+    assert np.all(np.diff(columns["time"]) == 60)
+    np.testing.assert_array_equal(columns["close"], [1.0] * 5 + [2.0] * 10)
+
+
+def test_range_query_returns_slice(store):
+    """
+    Test inclusive range queries and that a single-partition read is memory-mapped.
+    """
+    store.append("USDCAD", 1, create_rates(datetime(2024, 3, 1), 1_000))
+
+    columns = store.read_arrays("USDCAD", 1, datetime(2024, 3, 1, 1, 0), datetime(2024, 3, 1, 2, 0))
+    assert len(columns["time"]) == 61
+    assert columns["time"][0] == to_epoch(datetime(2024, 3, 1, 1, 0))
+    assert isinstance(columns["close"].base, np.memmap)
+
+    frame = store.read("USDCAD", 1, datetime(2024, 3, 1, 1, 0), datetime(2024, 3, 1, 2, 0))
+    assert list(frame.columns) == ["Open", "High", "Low", "Close", "Volume"]
+    assert frame.index[0] == datetime(2024, 3, 1, 1, 0)
+
+    assert len(store.read_arrays("EURUSD", 1)["time"]) == 0
+
+
+def test_compact_frame_halves_memory(store):
+    """
+    Test that a compact read keeps the frame's shape and values at roughly half the memory per bar.
+    """
+    rates = create_rates(datetime(2024, 3, 1), 1_000, close=1.35123)
+    store.append("USDCAD", 1, rates)
+
+    full = store.read("USDCAD", 1)
+    compact = store.read("USDCAD", 1, compact=True)
+    assert list(compact.columns) == list(full.columns)
+    assert compact["Close"].dtype == np.float32 and compact["Volume"].dtype == np.int32
+    assert (compact.index == full.index).all()
+    np.testing.assert_allclose(compact["Close"], full["Close"], rtol=1e-7)
+    assert compact.memory_usage().sum() <= 0.6 * full.memory_usage().sum()
+
+
+def test_rewrite_keeps_mapped_reads_and_survives_interruption(store, mocker):
+    """
+    Test that rewriting a partition leaves views mapped before it intact, that an interrupted rewrite keeps the
+    previous version readable, and that partitions written without versions are still read and upgraded.
+    """
+    store.append("USDCAD", 1, create_rates(datetime(2024, 1, 1), 10, close=1.0))
+    mapped = store.read_arrays("USDCAD", 1)
+    store.append("USDCAD", 1, create_rates(datetime(2024, 1, 1), 10, close=2.0))
+    np.testing.assert_array_equal(mapped["close"], [1.0] * 10)
+    np.testing.assert_array_equal(store.read_arrays("USDCAD", 1)["close"], [2.0] * 10)
+
+    mocker.patch("os.replace", side_effect=OSError)
+    with pytest.raises(OSError):
+        store.append("USDCAD", 1, create_rates(datetime(2024, 1, 1), 20, close=3.0))
+    np.testing.assert_array_equal(store.read_arrays("USDCAD", 1)["close"], [2.0] * 10)
+    with pytest.raises(OSError):
+        store.append("USDCAD", 1, create_rates(datetime(2025, 1, 1), 10))
+    assert store.partitions("USDCAD", 1) == [2024]
+    mocker.stopall()
+
+    legacy = store.root / "EURUSD" / "1" / "2024"
+    legacy.mkdir(parents=True)
+    rates = create_rates(datetime(2024, 1, 1), 10)
+    for name in RATES_DTYPE.names:
+        np.save(legacy / f"{name}.npy", rates[name])
+    assert store.partitions("EURUSD", 1) == [2024]
+    assert store.append("EURUSD", 1, create_rates(datetime(2024, 1, 1, 0, 10), 5)) == 5
+    assert len(store.read_arrays("EURUSD", 1)["time"]) == 15
+    assert sorted(p.name for p in legacy.iterdir()) == ["1", "CURRENT"]
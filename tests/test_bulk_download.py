@@ -0,0 +1,61 @@
+import sys
+
+import numpy as np
+import pytest
+
+from src.fake_mt5 import FakeTerminal, install
+from src.metatrader.bar_store import BarStore
+from src.metatrader.bulk_download import BulkDownloader, plan_chunks
+from src.synthetic import DEFAULT_START
+
+TIMEFRAME_M1 = 1
+TIMEFRAME_H1 = 0x4001
+
+
+@pytest.fixture
+def terminal():
+    """
+    Install a fake MetaTrader5 module over 5000 closed M1 bars of two symbols, restoring the previous module after.
+    """
+    gateway = sys.modules["metatrader.gateway"]
+    previous = gateway.mt5._module, sys.modules.get("MetaTrader5")
+    terminal = FakeTerminal.synthetic(["EURUSD", "USDCAD"], n_bars=5_000, speed=None)
+    terminal.advance(5_000 * 60)
+    install(terminal)
+    yield terminal
+    gateway.mt5._module = previous[0]
+    sys.modules["MetaTrader5"] = previous[1]
+
+
+def test_plan_skips_covered_ranges(tmp_path):
+    store = BarStore(tmp_path)
+    store.add_coverage("EURUSD", TIMEFRAME_M1, DEFAULT_START, DEFAULT_START + 999 * 60)
+    chunks = plan_chunks(store, ["EURUSD"], [TIMEFRAME_M1, TIMEFRAME_H1], DEFAULT_START,
+                         DEFAULT_START + 2_999 * 60, chunk_bars=1_000)
+
+    m1 = [(c.start, c.end, c.last) for c in chunks if c.timeframe == TIMEFRAME_M1]
+    gap_start = DEFAULT_START + 999 * 60 + 1
+    assert m1 == [(gap_start, gap_start + 1_000 * 60 - 1, False),
+                  (gap_start + 1_000 * 60, DEFAULT_START + 2_999 * 60, True)]
+    assert len([c for c in chunks if c.timeframe == TIMEFRAME_H1]) == 1
+
+
+def test_interrupted_download_resumes(tmp_path, terminal):
+    store = BarStore(tmp_path)
+    end = DEFAULT_START + 4_999 * 60
+    terminal.failure_rate = {"copy_rates_range": 0.5}
+    downloader = BulkDownloader(store, max_workers=3, chunk_bars=400, retries=0)
+    first = downloader.run(["EURUSD", "USDCAD"], [TIMEFRAME_M1, TIMEFRAME_H1], DEFAULT_START, end)
+    assert first.chunks == 2 * (13 + 1) and 0 < len(first.failed) < first.chunks
+
+    terminal.failure_rate = {}
+    second = downloader.run(["EURUSD", "USDCAD"], [TIMEFRAME_M1, TIMEFRAME_H1], DEFAULT_START, end)
+    # Only the failed chunks are fetched again, plus the forming-bar tails left uncovered
+    assert second.chunks <= len(first.failed) + 4 and not second.failed
+    assert second.bars_per_second > 0
+
+    for symbol in ("EURUSD", "USDCAD"):
+        stored = store.read_arrays(symbol, TIMEFRAME_M1)
+        np.testing.assert_array_equal(stored["close"], terminal.rates[symbol]["close"])
+        assert len(store.read_arrays(symbol, TIMEFRAME_H1)["time"]) == 84
+        assert store.missing_ranges(symbol, TIMEFRAME_M1, DEFAULT_START, end - 60) == []
@@ -0,0 +1,58 @@
+import json
+import time
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.cli import RUNNERS, _date_to, build_parser
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+
+def test_subcommands():
+    parser = build_parser()
+    args = parser.parse_args(["optimize", "emaadx", "--plot"])
+    assert (args.command, args.strategy, args.plot) == ("optimize", "emaadx", True)
+    assert set(RUNNERS) == {"rsi", "emaadx", "support_resistance"}
+    args = parser.parse_args(["optimize", "rsi", "--walk-forward", "--anchored", "--compact"])
+    assert (args.walk_forward, args.anchored, args.compact, args.plot) == (True, True, True, False)
+
+    args = parser.parse_args(["download", "USDCAD", "M1", "--from", "2024-06-01"])
+    assert args.date_from.year == 2024 and args.store.name == "bars"
+    args = parser.parse_args(["download", "USDCAD,EURUSD", "M1,H4", "--from", "2024-06-01", "--workers", "8"])
+    assert (args.symbol, args.timeframe, args.workers) == (["USDCAD", "EURUSD"], ["M1", "H4"], 8)
+    args = parser.parse_args(["ticks", "EURUSD", "--from", "2024-06-01"])
+    assert args.symbol == ["EURUSD"] and args.store.name == "ticks"
+    with pytest.raises(SystemExit):
+        parser.parse_args(["backtest", "unknown"])
+
+
+def test_range_ends_when_the_command_runs():
+    """
+    Test that a missing --to resolves to the time the command runs, as an aware UTC datetime.
+    """
+    args = build_parser().parse_args(["ticks", "EURUSD", "--from", "2024-06-01"])
+    assert args.date_to is None
+    date_to = _date_to(args)
+    assert date_to.utcoffset().total_seconds() == 0 and abs(date_to.timestamp() - time.time()) < 1
+
+    args = build_parser().parse_args(["download", "USDCAD", "M1", "--from", "2024-06-01", "--to", "2024-06-02"])
+    assert _date_to(args) == args.date_to
+
+
+def test_live_path_does_not_import_backtest_or_plotting_stacks():
+    """
+    Test in a fresh interpreter that the modules of `cli.py live` leave the heavy packages unloaded.
+    """
+    code = f"""
+import json, sys
+sys.path.insert(0, {str(SRC)!r})
+from fake_mt5 import FakeTerminal, install
+install(FakeTerminal({{}}))
+import cli, main
+print(json.dumps([m for m in ("backtesting", "matplotlib", "scipy", "talib") if m in sys.modules]))
+"""
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+
+from src.fake_mt5 import FakeMetaTrader5, FakeTerminal
+
+
+@pytest.fixture
+def terminal():
+    """
+    Fixture with a stopped-clock terminal over two synthetic symbols.
+    """
+    return FakeTerminal.synthetic(["EURUSD", "USDCAD"], n_bars=600, speed=None)
+
+
+def test_only_opened_bars_are_visible(terminal):
+    """
+    Test that bars appear as the clock advances and that the forming bar only shows its open.
+    """
+    mt5 = FakeMetaTrader5(terminal)
+    base = terminal.rates["EURUSD"]
+    terminal.advance(30 * 60 + 30)
+
+    rates = mt5.copy_rates_from_pos("EURUSD", mt5.TIMEFRAME_M1, 0, 100)
+    assert len(rates) == 31
+    np.testing.assert_array_equal(rates[:30], base[:30])
+    assert rates["close"][-1] == rates["high"][-1] == base["open"][30]
+
+    # Higher timeframes are aggregated from the closed base bars
+    rates = mt5.copy_rates_from_pos("EURUSD", mt5.TIMEFRAME_M15, 1, 2)
+    assert rates["high"][0] == base["high"][:15].max()
+    assert rates["close"][1] == base["close"][29]
+    assert rates["tick_volume"][1] == base["tick_volume"][15:30].sum()
+
+    assert mt5.symbol_info_tick("EURUSD").bid == base["open"][30]
+
+
+def test_order_send_retcodes(terminal):
+    mt5 = FakeMetaTrader5(terminal, filling_modes=[FakeMetaTrader5.ORDER_FILLING_FOK])
+    terminal.advance(600)
+    tick = mt5.symbol_info_tick("USDCAD")
+    request = {"action": mt5.TRADE_ACTION_DEAL, "symbol": "USDCAD", "volume": 0.1, "type": mt5.ORDER_TYPE_BUY,
+               "price": tick.ask, "deviation": 10, "type_filling": mt5.ORDER_FILLING_IOC}
+
+    assert mt5.order_send(request).retcode == mt5.TRADE_RETCODE_INVALID_FILL
+    assert mt5.order_send({**request, "type_filling": mt5.ORDER_FILLING_FOK}).retcode == mt5.TRADE_RETCODE_DONE
+    assert mt5.order_send({**request, "type_filling": mt5.ORDER_FILLING_FOK,
+                           "price": tick.ask + 0.01}).retcode == mt5.TRADE_RETCODE_REQUOTE
+    assert len(terminal.orders) == 1
+
+
+def test_failure_rate():
+    terminal = FakeTerminal.synthetic(["EURUSD"], n_bars=10, speed=None, failure_rate={"symbol_info": 1.0})
+    mt5 = FakeMetaTrader5(terminal)
+    assert mt5.symbol_info("EURUSD") is None
+    assert mt5.last_error()[0] < 0
+    assert mt5.symbol_info_tick("EURUSD") is not None
+
+
+def test_ticks_replay_the_opened_bars(terminal):
+    """
+    Test that ticks follow the OHLC of the closed bars and that the forming bar only has its open tick.
+    """
+    mt5 = FakeMetaTrader5(terminal)
+    base = terminal.rates["EURUSD"]
+    start = int(base["time"][0])
+    terminal.advance(10 * 60 + 30)
+
+    ticks = mt5.copy_ticks_range("EURUSD", start, start + 3600, mt5.COPY_TICKS_ALL)
+    assert len(ticks) == 10 * 4 + 1
+    assert (np.diff(ticks["time_msc"]) > 0).all() and (ticks["ask"] > ticks["bid"]).all()
+    bars = ticks["bid"][:40].reshape(10, 4)
+    np.testing.assert_array_equal(bars[:, 0], base["open"][:10])
+    np.testing.assert_array_equal(bars[:, 3], base["close"][:10])
+    np.testing.assert_array_equal(bars.max(axis=1), base["high"][:10])
+    np.testing.assert_array_equal(bars.min(axis=1), base["low"][:10])
+    assert ticks["bid"][-1] == base["open"][10]
+
+    # Both ends of the range are inclusive
+    ticks = mt5.copy_ticks_range("EURUSD", start + 60, start + 75, mt5.COPY_TICKS_ALL)
+    assert list(ticks["time_msc"]) == [(start + 60) * 1000, (start + 75) * 1000]
+    assert mt5.copy_ticks_range("GBPUSD", start, start + 60, mt5.COPY_TICKS_ALL) is None
+
+
+def test_download_ticks_from_the_fake(terminal, tmp_path):
+    """
+    Test that the tick download path runs against the fake terminal.
+    """
+    import sys
+    from datetime import datetime, timedelta, timezone
+
+    from src.fake_mt5 import install
+    from src.metatrader.tick_store import TickStore
+
+    gateway = sys.modules.get("metatrader.gateway")
+    previous = (gateway.mt5._module if gateway else None), sys.modules.get("MetaTrader5")
+    install(terminal)
+    try:
+        from metatrader.mt5_connection import MT5Connection
+
+        terminal.advance(120 * 60)
+        date_from = datetime.fromtimestamp(terminal.rates["EURUSD"]["time"][0], timezone.utc)
+        date_to = date_from + timedelta(days=1)
+        assert MT5Connection(0, "", "").download_ticks_range(tmp_path, "EURUSD", date_from, date_to) == 481
+        assert len(TickStore(tmp_path).read("EURUSD", date_from, date_to)) == 481
+    finally:
+        if previous[0] is not None:
+            sys.modules["metatrader.gateway"].mt5._module = previous[0]
+        sys.modules["MetaTrader5"] = previous[1]
+
+
+def test_symbol_calls_can_fail():
+    terminal = FakeTerminal.synthetic(["EURUSD", "USDCAD"], n_bars=10, speed=None,
+                                      failure_rate={"symbols_get": 1.0, "symbol_select": 1.0})
+    mt5 = FakeMetaTrader5(terminal)
+    assert mt5.symbols_get() is None and mt5.last_error()[0] < 0
+    assert not mt5.symbol_select("EURUSD")
+    assert mt5.symbols_total() == 2
+
+    mt5 = FakeMetaTrader5(FakeTerminal.synthetic(["EURUSD", "USDCAD", "GBPUSD"], n_bars=10, speed=None))
+    assert [info.name for info in mt5.symbols_get("*USD*,!GBP*")] == ["EURUSD", "USDCAD"]
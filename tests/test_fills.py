@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from src.backtest.fills import LOSS, OPEN, WIN, resolve_exits
+
+
+def brute_force_exits(high, low, entry_idx, is_long, sl, tp):
+    """
+    Reference implementation walking bar by bar over every trade.
+    """
+    exit_idx = np.full(len(entry_idx), -1)
+    outcome = np.full(len(entry_idx), OPEN)
+    for k, start in enumerate(entry_idx):
+        for j in range(start + 1, len(high)):
+            sl_hit = low[j] <= sl[k] if is_long[k] else high[j] >= sl[k]
+            tp_hit = high[j] >= tp[k] if is_long[k] else low[j] <= tp[k]
+            if sl_hit or tp_hit:
+                exit_idx[k] = j
+                outcome[k] = LOSS if sl_hit else WIN
+                break
+    return exit_idx, outcome
+
+
+@pytest.mark.parametrize("block_size", [1, 3, 16, 256])
+def test_resolve_exits_matches_brute_force(block_size):
+    """
+    Test that the block search finds the same first passage as a bar-by-bar scan.
+    """
+    rng = np.random.default_rng(7)
+    close = 1.3 + np.cumsum(rng.normal(0, 1e-3, 1_500))
+    high = close + rng.random(len(close)) * 1e-3
+    low = close - rng.random(len(close)) * 1e-3
+
+    entry_idx = rng.integers(0, len(close), 300)
+    is_long = rng.random(300) < 0.5
+    distance = rng.random(300) * 0.02
+    sl = np.where(is_long, close[entry_idx] - distance, close[entry_idx] + distance)
+    tp = np.where(is_long, close[entry_idx] + 2 * distance, close[entry_idx] - 2 * distance)
+
+    exits = resolve_exits(high, low, entry_idx, is_long, sl, tp, block_size=block_size)
+    expected_idx, expected_outcome = brute_force_exits(high, low, entry_idx, is_long, sl, tp)
+
+    np.testing.assert_array_equal(exits.exit_idx, expected_idx)
+    np.testing.assert_array_equal(exits.outcome, expected_outcome)
+
+
+def test_resolve_exits_prices():
+    """
+    Test exit prices: levels by default, the open when a level is gapped through, NaN while open.
+    """
+    open_ = np.array([1.00, 1.00, 0.95, 1.00])
+    high = np.array([1.01, 1.01, 0.96, 1.01])
+    low = np.array([0.99, 0.99, 0.94, 0.99])
+
+    exits = resolve_exits(high, low, entry_idx=np.array([0, 0, 3]), is_long=np.array([True, False, True]),
+                          sl=np.array([0.98, 1.05, 0.90]), tp=np.array([1.05, 0.97, 1.10]), open_=open_)
+
+    np.testing.assert_array_equal(exits.exit_idx, [2, 2, -1])
+    np.testing.assert_array_equal(exits.outcome, [LOSS, WIN, OPEN])
+    np.testing.assert_allclose(exits.exit_price[:2], [0.95, 0.95])
+    assert np.isnan(exits.exit_price[2])
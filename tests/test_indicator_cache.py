@@ -0,0 +1,124 @@
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from src.backtest.indicator_cache import IndicatorCache
+
+
+def create_indicator():
+    """
+    Create a mock indicator function returning a doubled copy of its input.
+    """
+    return MagicMock(side_effect=lambda values, period: values * 2, __name__="double", __qualname__="double")
+
+
+def test_identical_calls_compute_once():
+    """
+    Test that the same function, arguments and data hit the cache, and that other data misses it.
+    """
+    cache = IndicatorCache(maxsize=8)
+    indicator = create_indicator()
+    cached = cache(indicator)
+    data = np.arange(100, dtype=float)
+
+    first = cached(data, 14)
+    second = cached(data.copy(), 14)
+    cached(data + 1, 14)
+    cached(data, 10)
+
+    assert indicator.call_count == 3
+    np.testing.assert_array_equal(first, second)
+    assert first is not second, "Callers should get their own copy of a cached result"
+    assert cached.__name__ == "double"
+
+
+def test_lru_evicts_oldest():
+    cache = IndicatorCache(maxsize=2)
+    indicator = create_indicator()
+    cached = cache(indicator)
+    data = np.arange(10, dtype=float)
+
+    for period in (1, 2, 3, 1):
+        cached(data, period)
+
+    assert indicator.call_count == 4
+
+
+def test_shared_results_are_attached_by_other_caches():
+    """
+    Test that a second cache in the same namespace reuses the published result instead of computing it.
+    """
+    publisher = IndicatorCache(shared=True)
+    reader = IndicatorCache(shared=True)
+    indicator = create_indicator()
+    data = np.arange(1_000, dtype=float)
+
+    try:
+        expected = publisher(indicator)(data, 14)
+        names = publisher._registry_path().read_text().split()
+        result = reader(indicator)(data, 14)
+
+        assert indicator.call_count == 1
+        assert reader.hits == 1
+        assert len(names) == 1
+        np.testing.assert_array_equal(result, expected)
+    finally:
+        publisher.clear()
+        reader.clear()
+
+    # The published segments are found through the registry rather than by listing the system's shared memory
+    assert not publisher._registry_path().exists()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=names[0])
+
+
+def test_concurrent_threads_share_one_cache():
+    """
+    Test that threads hitting and evicting the same keys of one cache neither fail nor return wrong results.
+    """
+    cache = IndicatorCache(maxsize=2)
+    cached = cache(create_indicator())
+    data = np.arange(100, dtype=float)
+
+    def run(seed: int):
+        for period in np.random.default_rng(seed).integers(0, 4, 500):
+            np.testing.assert_array_equal(cached(data, int(period)), data * 2)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(run, range(8)))
+    assert cache.hits + cache.misses == 8 * 500 and len(cache._entries) == 2
+
+
+def test_optimize_workers_share_results():
+    """
+    Test that the process pool of a real optimization publishes the RSI once, that the final run of the best
+    parameters in this process attaches to it, and that the segments are gone after the block.
+    """
+    import sys
+    import tempfile
+    from pathlib import Path
+
+    from backtesting import Backtest
+
+    from src.backtest.strategies import RsiOscillator
+    from src.synthetic import synthetic_frame
+
+    # The strategies import the cache as `backtest.indicator_cache`
+    module = sys.modules["backtest.indicator_cache"]
+    bt = Backtest(synthetic_frame(2_000, seed=3), RsiOscillator, cash=10_000)
+
+    with module.shared_indicators() as cache:
+        namespace, hits, misses = cache._namespace, cache.hits, cache.misses
+        stats = bt.optimize(upper_bound=[60, 65, 70], lower_bound=[25, 30, 35], rsi_window=14)
+        segments = list(Path("/dev/shm").glob(f"mt{namespace}_*"))
+
+        assert stats["_strategy"].rsi_window == 14
+        assert len(segments) == 1, "Every combination shares one RSI"
+        assert (cache.hits - hits, cache.misses - misses) == (1, 0), "Pool workers should have computed the RSI for this process"
+
+    assert not cache.shared and cache._namespace != namespace
+    assert not list(Path("/dev/shm").glob(f"mt{namespace}_*"))
+    assert not (Path(tempfile.gettempdir()) / f"mt{namespace}.segments").exists()
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+import pytest
+import talib
+
+from src.indicators import (ADX, EMA, RSI, LevelIndex, PeakDetector, RollingMax, RollingMin,
+                            SupportResistanceLevels, support_resistance_orders)
+
+
+@pytest.fixture
+def bars():
+    """
+    Fixture with seeded random-walk high/low/close arrays.
+    """
+    rng = np.random.default_rng(3)
+    close = 1.35 + np.cumsum(rng.normal(0, 1e-3, 600))
+    high = close + rng.random(len(close)) * 1e-3
+    low = close - rng.random(len(close)) * 1e-3
+    return high, low, close
+
+
+def streamed(indicator, *columns):
+    """
+    Feed the columns bar by bar and collect every intermediate value.
+    """
+    return np.array([indicator.update(*values) for values in zip(*columns)])
+
+
+@pytest.mark.parametrize("period", [2, 10, 14])
+def test_rsi_matches_talib(bars, period):
+    _, _, close = bars
+    np.testing.assert_allclose(streamed(RSI(period), close), talib.RSI(close, period), atol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize("period", [5, 50])
+def test_ema_matches_talib(bars, period):
+    _, _, close = bars
+    np.testing.assert_allclose(streamed(EMA(period), close), talib.EMA(close, period), atol=1e-12, equal_nan=True)
+
+
+@pytest.mark.parametrize("period", [5, 14])
+def test_adx_matches_talib(bars, period):
+    high, low, close = bars
+    np.testing.assert_allclose(streamed(ADX(period), high, low, close), talib.ADX(high, low, close, period),
+                               atol=1e-9, equal_nan=True)
+
+
+def test_rsi_keeps_previous_value(bars):
+    """
+    Test that the previous RSI value is kept for crossover checks.
+    """
+    _, _, close = bars
+    rsi = RSI(10)
+    rsi.update_many(close[:-1])
+    last = rsi.value
+    rsi.update(close[-1])
+    assert rsi.prev_value == last
+
+
+def test_rolling_extremes(bars):
+    high, low, _ = bars
+    np.testing.assert_array_equal(streamed(RollingMax(10), high)[9:], pd.Series(high).rolling(10).max()[9:])
+    np.testing.assert_array_equal(streamed(RollingMin(10), low)[9:], pd.Series(low).rolling(10).min()[9:])
+
+
+@pytest.mark.parametrize("window, prominence", [(5, 0.0), (20, 2e-3)])
+def test_peaks_are_confirmed_causally(bars, window, prominence):
+    """
+    Test that the streaming peaks are the bars highest within `window` bars on each side, reported
+    exactly `window` bars later, and that they are never closer than `window` bars.
+    """
+    high, _, close = bars
+    detector = PeakDetector(window, prominence)
+    confirmed = [(bar, detector.update(value, bar)) for bar, value in enumerate(high)]
+    peaks = [(bar, peak) for bar, peak in confirmed if peak is not None]
+
+    expected = []
+    for i in range(window, len(high) - window):
+        span = high[i - window:i + window + 1]
+        base = max(high[i - window:i + 1].min(), high[i:i + window + 1].min())
+        if high[i] == span.max() and high[i] - base >= prominence and (not expected or i - expected[-1] > window):
+            expected.append(i)
+    assert [peak for _, peak in peaks] == expected
+    assert all(bar == peak + window for bar, peak in peaks)
+
+
+def test_level_index_lookup_and_expiry():
+    levels = LevelIndex(max_age=10)
+    for bar, price in enumerate([1.3, 1.1, 1.2]):
+        levels.add(price, bar)
+    assert list(levels) == [1.1, 1.2, 1.3]
+    assert levels.bisect(1.15) == 1 and levels.neighbors(1.15) == (1.1, 1.2)
+    assert np.isnan(levels.neighbors(1.0)[0])
+
+    levels.expire(11)
+    assert list(levels) == [1.1, 1.2]
+
+
+def test_support_resistance_levels(bars):
+    high, low, close = bars
+    tracker = SupportResistanceLevels(window=10)
+    tracker.update_many(high, low, close)
+
+    supports = PeakDetector(10)
+    resistances = PeakDetector(10)
+    expected = [level for h, l, c in zip(high, low, close)
+                for level in (supports.update(-l, c), resistances.update(h, c)) if level is not None]
+    assert list(tracker.levels) == sorted(expected)
+
+
+def test_levels_and_orders_are_causal(bars):
+    """
+    Test that the levels and orders of every bar are the same whether the data stops at that bar or goes on.
+    """
+    high, low, close = bars
+
+    def run(n_bars):
+        tracker = SupportResistanceLevels(window=5)
+        states = []
+        for i in range(n_bars):
+            levels = tracker.update(high[i], low[i], close[i])
+            orders = support_resistance_orders(levels, close[i], close[i - 1], 1e-3) if i else []
+            states.append((list(levels), orders))
+        return states
+
+    full = run(len(close))
+    assert any(orders for _, orders in full)
+    for n_bars in (50, 200, 451):
+        assert run(n_bars) == full[:n_bars]
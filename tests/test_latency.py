@@ -0,0 +1,51 @@
+import time
+
+from src.latency import LatencyRecorder
+
+
+def test_spans_are_recorded_per_stage_and_symbol(tmp_path):
+    recorder = LatencyRecorder(sample_rate=1)
+    for _ in range(10):
+        with recorder.span("fetch_rates", "USDCAD"):
+            time.sleep(0.001)
+    with recorder.span("account_info"):
+        pass
+
+    summary = recorder.summary()
+    assert set(summary) == {("fetch_rates", "USDCAD"), ("account_info", "*")}
+    stats = summary[("fetch_rates", "USDCAD")]
+    assert stats["count"] == 10
+    assert 0.001 <= stats["p50"] <= stats["p99"] <= stats["max"]
+
+    recorder.write(tmp_path / "latency.prom")
+    assert 'stage="fetch_rates",symbol="USDCAD",quantile="0.99"' in (tmp_path / "latency.prom").read_text()
+
+
+def test_reports_cover_their_own_window(tmp_path):
+    """
+    Test that a reset starts a new window of quantiles while the Prometheus count and sum keep accumulating.
+    """
+    recorder = LatencyRecorder(sample_rate=1)
+    recorder.record(("order_send", "USDCAD"), 50_000_000)
+    first = recorder.summary(reset=True)
+    recorder.record(("order_send", "USDCAD"), 1_000_000)
+    recorder.record(("order_send", "USDCAD"), 2_000_000)
+    second = recorder.summary(reset=True)
+
+    assert first[("order_send", "USDCAD")]["max"] == 0.05
+    stats = second[("order_send", "USDCAD")]
+    assert (stats["count"], stats["max"]) == (2, 0.002)
+    assert (stats["total_count"], stats["total_sum"]) == (3, 0.053)
+
+    recorder.write(tmp_path / "latency.prom", second)
+    text = (tmp_path / "latency.prom").read_text()
+    assert 'mtang_stage_latency_seconds_sum{stage="order_send",symbol="USDCAD"} 0.053000000' in text
+    assert 'mtang_stage_latency_seconds_count{stage="order_send",symbol="USDCAD"} 3' in text
+    assert recorder.summary()[("order_send", "USDCAD")]["count"] == 0
+
+
+def test_disabled_recorder_records_nothing():
+    recorder = LatencyRecorder(sample_rate=0)
+    with recorder.span("order_send", "USDCAD"):
+        pass
+    assert recorder.summary() == {}
@@ -0,0 +1,127 @@
+import sys
+
+import numpy as np
+import pytest
+
+from src.fake_mt5 import FakeTerminal, install
+from src.synthetic import DEFAULT_START
+
+TIMEFRAME_M1 = 1
+
+
+@pytest.fixture
+def main_module():
+    """
+    Import the live loop over a stopped-clock fake terminal, with fresh indicator state, and restore the
+    previous MetaTrader5 module after the test.
+    """
+    gateway = sys.modules.get("metatrader.gateway")
+    previous = (gateway.mt5._module if gateway else None), sys.modules.get("MetaTrader5")
+    terminal = FakeTerminal.synthetic(["EURUSD"], n_bars=300, speed=None, start=DEFAULT_START + 100 * 60 + 1)
+    install(terminal)
+
+    import main
+    main.rsi_states.clear()
+    main.level_states.clear()
+    main.evaluated_bars.clear()
+    yield main, terminal
+
+    if previous[0] is not None:
+        sys.modules["metatrader.gateway"].mt5._module = previous[0]
+    sys.modules["MetaTrader5"] = previous[1]
+
+
+def test_jobs_sharing_an_rsi_each_evaluate_every_bar(main_module, mocker):
+    """
+    Test that concurrent jobs with the same RSI but different bounds are all evaluated on every closed bar,
+    and that the shared RSI sees each bar exactly once.
+    """
+    main, terminal = main_module
+    from live import MultiSymbolScheduler, StrategyJob
+
+    signal = mocker.patch.object(main, "rsi_crossover_signal", return_value="HOLD")
+    bounds = [(30, 55), (25, 60), (20, 70)]
+    jobs = [StrategyJob("EURUSD", TIMEFRAME_M1, {"risk_per_trade": 0.02, "reward_to_risk_ratio": 1,
+                                                 "timeperiod": 10, "lower_bound": lower, "upper_bound": upper})
+            for lower, upper in bounds]
+    connection = main.MT5Connection(0, "", "")
+    scheduler = MultiSymbolScheduler(main.rsi_strategy, jobs, max_workers=len(jobs))
+    try:
+        for _ in range(5):
+            assert scheduler.run_cycle(connection) == 0
+            # A second cycle within the same bar evaluates nothing
+            scheduler.run_cycle(connection)
+            terminal.advance(60)
+    finally:
+        scheduler.shutdown()
+
+    evaluated = sorted((call.args[2], call.args[3]) for call in signal.call_args_list)
+    assert evaluated == sorted(bounds * 5)
+
+    # Warmed up once on RSI_WARMUP_BARS closed bars, then fed the four bars that closed since
+    (rsi, last_time), = main.rsi_states.values()
+    closes = terminal.rates["EURUSD"]["close"][100 - main.RSI_WARMUP_BARS:104]
+    expected = main.RSI(10)
+    expected.update_many(closes)
+    assert last_time.timestamp() == DEFAULT_START + 103 * 60
+    assert rsi.value == pytest.approx(expected.value) and np.isfinite(rsi.value)
+
+
+def test_live_levels_follow_the_closed_bars(main_module, mocker, monkeypatch):
+    """
+    Test that a support / resistance job sees, on every closed bar, the levels and closes a tracker fed the
+    same bars one by one would have.
+    """
+    main, terminal = main_module
+    from live import MultiSymbolScheduler, StrategyJob
+
+    monkeypatch.setattr(main, "LEVELS_WARMUP_BARS", 60)
+    seen = []
+
+    def record(levels, price, prev_price, level_pad):
+        seen.append((list(levels), price, prev_price))
+        return []
+
+    mocker.patch.object(main, "support_resistance_orders", side_effect=record)
+    job = StrategyJob("EURUSD", TIMEFRAME_M1, {"strategy": "support_resistance", "risk_per_trade": 0.02,
+                                               "window": 3, "prominence": 0.0, "level_pad": 1e-4})
+    connection = main.MT5Connection(0, "", "")
+    scheduler = MultiSymbolScheduler(main.run_strategy, [job], max_workers=1)
+    try:
+        for _ in range(5):
+            assert scheduler.run_cycle(connection) == 0
+            terminal.advance(60)
+    finally:
+        scheduler.shutdown()
+
+    rates = terminal.rates["EURUSD"]
+    tracker = main.SupportResistanceLevels(3)
+    tracker.update_many(rates["high"][40:99], rates["low"][40:99], rates["close"][40:99])
+    expected = []
+    for bar in range(99, 104):
+        tracker.update(rates["high"][bar], rates["low"][bar], rates["close"][bar])
+        expected.append((list(tracker.levels), rates["close"][bar], rates["close"][bar - 1]))
+    assert len(tracker.levels) and seen == expected
+
+
+def test_missed_bars_are_fed_to_the_rsi(main_module, mocker, caplog):
+    """
+    Test that the bars missed before a bar close event are fed to the streaming RSI instead of warming it up
+    again.
+    """
+    main, terminal = main_module
+    mocker.patch.object(main, "rsi_crossover_signal", return_value="HOLD")
+    connection = main.MT5Connection(0, "", "")
+    params = {"risk_per_trade": 0.02, "reward_to_risk_ratio": 1, "timeperiod": 10, "lower_bound": 30,
+              "upper_bound": 55}
+
+    main.rsi_strategy(connection, "EURUSD", TIMEFRAME_M1, **params)
+    terminal.advance(3 * 60)
+    main.rsi_strategy(connection, "EURUSD", TIMEFRAME_M1, missed=2, **params)
+
+    (rsi, last_time), = main.rsi_states.values()
+    expected = main.RSI(10)
+    expected.update_many(terminal.rates["EURUSD"]["close"][100 - main.RSI_WARMUP_BARS:103])
+    assert last_time.timestamp() == DEFAULT_START + 102 * 60
+    assert rsi.value == pytest.approx(expected.value)
+    assert "warming up the RSI again" not in caplog.text
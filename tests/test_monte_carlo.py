@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtest.monte_carlo import monte_carlo, trade_returns
+
+
+@pytest.fixture
+def trades():
+    """
+    Fixture with a trade table shaped like `stats["_trades"]`: a slightly positive edge over 500 trades.
+    """
+    rng = np.random.default_rng(7)
+    exit_time = pd.date_range("2024-01-01", periods=500, freq="h")
+    return pd.DataFrame({"PnL": rng.normal(5.0, 100.0, 500), "ExitTime": exit_time})
+
+
+def test_trade_returns_compound_to_the_final_equity(trades):
+    """
+    Test that the per-trade returns replay the run's equity, whatever the row order of the table.
+    """
+    returns = trade_returns(trades.sample(frac=1, random_state=0), cash=10_000)
+    assert 10_000 * np.prod(1 + returns) == pytest.approx(10_000 + trades["PnL"].sum())
+
+
+def test_permutation_keeps_the_return_and_spreads_the_drawdown(trades):
+    """
+    Test that reordering the trades leaves the final return unchanged and only spreads the drawdown.
+    """
+    result = monte_carlo(trades, cash=10_000, method="permutation", n_simulations=2_000, max_workers=1)
+    summary = result.summary
+
+    assert summary["Return [%]"] == pytest.approx(trades["PnL"].sum() / 10_000 * 100)
+    np.testing.assert_allclose(result.returns, summary["Return [%]"])
+    assert summary["Return Percentile [%]"] == 0
+    assert (summary["Max. Closed-trade Drawdown 95% CI Low [%]"] < summary["Median Max. Closed-trade Drawdown [%]"]
+            < summary["Max. Closed-trade Drawdown 95% CI High [%]"] <= 0)
+    assert 0 <= summary["Drawdown Percentile [%]"] <= 100
+
+
+def test_bootstrap_is_reproducible_across_workers(trades):
+    """
+    Test that the bootstrap distribution only depends on the seed, not on how batches are spread.
+    """
+    serial = monte_carlo(trades, n_simulations=3_000, batch_size=1_000, seed=3, max_workers=1)
+    pooled = monte_carlo(trades, n_simulations=3_000, batch_size=1_000, seed=3, max_workers=2)
+
+    np.testing.assert_array_equal(serial.returns, pooled.returns)
+    np.testing.assert_array_equal(serial.drawdowns, pooled.drawdowns)
+    summary = serial.summary
+    assert summary["Return 95% CI Low [%]"] < summary["Median Return [%]"] < summary["Return 95% CI High [%]"]
+    assert 0 < summary["Probability of Loss [%]"] < 100
+
+
+def test_rejects_unknown_method(trades):
+    with pytest.raises(ValueError):
+        monte_carlo(trades, method="jackknife")
+
+
+def test_log_monte_carlo_replays_from_the_backtest_cash():
+    """
+    Test that the runners' helper replays the trades of a run from the initial cash of its Backtest.
+    """
+    from backtesting import Backtest
+
+    from src.backtest.monte_carlo import log_monte_carlo
+    from src.backtest.strategies import RsiOscillator
+    from src.synthetic import synthetic_frame
+
+    bt = Backtest(synthetic_frame(3_000, seed=5), RsiOscillator, cash=50_000, finalize_trades=True)
+    stats = bt.run()
+    result = log_monte_carlo(bt, stats, n_simulations=200, max_workers=1)
+
+    assert len(stats["_trades"]) and result.summary["Trades"] == len(stats["_trades"])
+    assert result.summary["Return [%]"] == pytest.approx(stats["_trades"]["PnL"].sum() / 50_000 * 100)
@@ -0,0 +1,78 @@
+from datetime import datetime, timezone
+
+import MetaTrader5 as mt5
+import numpy as np
+import pytest
+
+from src.metatrader.bar_store import RATES_DTYPE, BarStore, to_epoch
+from src.metatrader.mt5_connection import MT5Connection
+
+
+def create_rates(start: int, end: int, step: int = 60):
+    """
+    Create the bars a terminal would return for [start, end].
+    """
+    times = np.arange(-(-start // step) * step, end + 1, step)
+    rates = np.zeros(len(times), dtype=RATES_DTYPE)
+    rates["time"] = times
+    rates["close"] = 1.35
+    return rates
+
+
+@pytest.fixture
+def mock_copy_rates_range(mocker):
+    """
+    Fixture serving synthetic M1 bars from a mocked mt5.copy_rates_range.
+    """
+    return mocker.patch.object(mt5, "copy_rates_range", create=True,
+                               side_effect=lambda symbol, timeframe, date_from, date_to:
+                               create_rates(to_epoch(date_from), to_epoch(date_to)))
+
+
+def test_fetch_rates_range_only_fetches_missing_tail(tmp_path, mock_copy_rates_range):
+    """
+    Test that a repeated fetch only requests the bars after the last cached (possibly forming) bar.
+    """
+    connection = MT5Connection(0, "", "", cache=BarStore(tmp_path))
+
+    first = connection.fetch_rates_range("USDCAD", 1, datetime(2024, 6, 1), datetime(2024, 6, 2))
+    assert len(first) == 24 * 60 + 1
+    assert mock_copy_rates_range.call_count == 1
+
+    second = connection.fetch_rates_range("USDCAD", 1, datetime(2024, 6, 1), datetime(2024, 6, 2, 0, 1))
+    assert len(second) == 24 * 60 + 2
+    assert mock_copy_rates_range.call_count == 2
+
+    _, _, date_from, date_to = mock_copy_rates_range.call_args.args
+    assert date_from == datetime(2024, 6, 2, tzinfo=timezone.utc)
+    assert date_to == datetime(2024, 6, 2, 0, 1, tzinfo=timezone.utc)
+
+
+def test_fetch_rates_range_serves_cached_range_locally(tmp_path, mock_copy_rates_range):
+    """
+    Test that a range inside the covered history is read from the cache without calling the terminal.
+    """
+    connection = MT5Connection(0, "", "", cache=BarStore(tmp_path))
+    connection.fetch_rates_range("USDCAD", 1, datetime(2024, 6, 1), datetime(2024, 6, 3))
+
+    rates = connection.fetch_rates_range("USDCAD", 1, datetime(2024, 6, 1, 12), datetime(2024, 6, 1, 13))
+
+    assert mock_copy_rates_range.call_count == 1
+    assert len(rates) == 61
+    assert rates.index[0] == datetime(2024, 6, 1, 12)
+
+
+def test_fetch_resampled_range_only_downloads_base_bars(tmp_path, mock_copy_rates_range):
+    """
+    Test that higher-timeframe bars are derived from cached M1 bars, so a second timeframe needs no download.
+    """
+    connection = MT5Connection(0, "", "", cache=BarStore(tmp_path))
+
+    h4 = connection.fetch_resampled_range("USDCAD", mt5.TIMEFRAME_H4, datetime(2024, 6, 1, 1), datetime(2024, 6, 3))
+    h1 = connection.fetch_resampled_range("USDCAD", mt5.TIMEFRAME_H1, datetime(2024, 6, 1, 4), datetime(2024, 6, 2))
+
+    assert mock_copy_rates_range.call_count == 1
+    assert mock_copy_rates_range.call_args.args[1] == 1
+    # The H4 bar opened before the start of the range is left out
+    assert h4.index[0] == datetime(2024, 6, 1, 4) and h4.index[-1] == datetime(2024, 6, 3) and len(h4) == 12
+    assert len(h1) == 21 and (h1.index[1:] - h1.index[:-1] == "1h").all()
@@ -3,6 +3,7 @@ from unittest.mock import MagicMock
 import MetaTrader5 as mt5
 import pytest
 
+from src.metatrader.metadata import MetadataCache
 from src.metatrader.order import place_order
 
 
@@ -63,6 +64,7 @@ def test_place_order_success_buy(mock_mt5):
         "tp": 1.40029,
         "deviation": 10,  # Maximum allowed deviation in points
         "magic": 234000,  # Custom magic number
+        "comment": "Algo trading",
         "type_time": mt5.ORDER_TIME_GTC,  # Good till cancel
         "type_filling": mt5.ORDER_FILLING_IOC,
     }
@@ -101,6 +103,7 @@ def test_place_order_success_sell(mock_mt5):
         "tp": 1.39274,
         "deviation": 10,  # Maximum allowed deviation in points
         "magic": 234000,  # Custom magic number
+        "comment": "Algo trading",
         "type_time": mt5.ORDER_TIME_GTC,  # Good till cancel
         "type_filling": mt5.ORDER_FILLING_IOC,
     }
@@ -185,5 +188,47 @@ def test_place_order_order_send_failed(mock_mt5):
     mt5.order_send.assert_called_once()
 
 
+def test_place_order_reuses_metadata_and_tick(mock_mt5):
+    """
+    Test that cached metadata and a passed-in tick avoid terminal round trips until the TTL expires.
+    """
+    now = [0.0]
+    metadata = MetadataCache(symbol_ttl=60, account_ttl=1, clock=lambda: now[0])
+    mt5.symbol_info.return_value = create_mock_symbol_info()
+    mt5.account_info.return_value = MagicMock(balance=1000.0)
+    mt5.order_send.return_value = MagicMock(retcode=mt5.TRADE_RETCODE_DONE)
+    tick = MagicMock(ask=1.39629, bid=1.39674)
+
+    for _ in range(3):
+        assert place_order(symbol="USDCAD", action="BUY", tick=tick, metadata=metadata) is True
+    now[0] = 61
+    assert place_order(symbol="USDCAD", action="SELL", tick=tick, metadata=metadata) is True
+
+    assert mt5.symbol_info.call_count == 2
+    # The balance is refreshed after every order sent
+    assert mt5.account_info.call_count == 4
+    mt5.symbol_info_tick.assert_not_called()
+
+
+def test_metadata_cache_expiry_and_invalidation(mock_mt5):
+    now = [0.0]
+    metadata = MetadataCache(symbol_ttl=60, account_ttl=1, clock=lambda: now[0])
+    mt5.symbol_info.return_value = create_mock_symbol_info()
+    mt5.account_info.return_value = MagicMock(balance=1000.0)
+
+    metadata.symbol_spec("USDCAD")
+    metadata.balance()
+    now[0] = 0.5
+    metadata.symbol_spec("USDCAD")
+    metadata.balance()
+    assert (mt5.symbol_info.call_count, mt5.account_info.call_count) == (1, 1)
+
+    now[0] = 2
+    metadata.balance()
+    metadata.invalidate_symbol("USDCAD")
+    metadata.symbol_spec("USDCAD")
+    assert (mt5.symbol_info.call_count, mt5.account_info.call_count) == (2, 2)
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from src.backtest.fills import OPEN
+from src.backtest.portfolio import Universe, backtest_portfolio, rsi_signals
+from src.backtest.sweep import sweep_rsi_oscillator
+from src.synthetic import synthetic_frame
+
+SYMBOLS = ["EURUSD", "GBPUSD", "USDCAD"]
+
+
+@pytest.fixture
+def frames():
+    """
+    Fixture with one synthetic M1 frame per symbol over the same bars.
+    """
+    return {symbol: synthetic_frame(5_000, seed=seed) for seed, symbol in enumerate(SYMBOLS)}
+
+
+def test_universe_aligns_missing_bars(frames):
+    """
+    Test that outer alignment keeps every bar and leaves NaN where a symbol has none, inner only common bars.
+    """
+    frames["GBPUSD"] = frames["GBPUSD"].drop(frames["GBPUSD"].index[100:110])
+    frames["USDCAD"] = frames["USDCAD"].iloc[500:]
+
+    outer = Universe.from_frames(frames)
+    assert outer.close.shape == (5_000, 3)
+    assert np.isnan(outer.close[100:110, 1]).all() and np.isnan(outer.close[:500, 2]).all()
+    np.testing.assert_array_equal(outer.close[:, 0], frames["EURUSD"]["Close"].to_numpy())
+
+    inner = Universe.from_frames(frames, how="inner")
+    assert len(inner.index) == 4_500 and not np.isnan(inner.close).any()
+
+    long_entries, short_entries = rsi_signals(outer, 10, 30, 70)
+    assert not (long_entries | short_entries)[~outer.valid].any()
+    assert long_entries[500:, 2].any()
+
+
+def test_per_symbol_trades_match_single_symbol_sweep(frames):
+    """
+    Test that every symbol of the universe gets the trades and win rate of a single-symbol sweep.
+    """
+    universe = Universe.from_frames(frames)
+    result = backtest_portfolio(universe, *rsi_signals(universe, 10, 25, 55))
+
+    for symbol in SYMBOLS:
+        sweep = sweep_rsi_oscillator(frames[symbol], [55], [25], [10]).iloc[0]
+        assert result.symbols.loc[symbol, "# Trades"] == sweep["# Trades"]
+        assert result.symbols.loc[symbol, "Win Rate [%]"] == pytest.approx(sweep["Win Rate [%]"])
+
+    assert result.summary["# Trades"] == result.symbols["# Trades"].sum()
+    assert (result.trades["Outcome"] != OPEN).all()
+    assert result.equity.iloc[-1] == pytest.approx(10_000 + result.trades["PnL"].sum())
+
+
+def test_trades_do_not_run_into_the_next_symbol():
+    """
+    Test that a trade still open at the end of its symbol's data is left out rather than resolved on the
+    bars of the following column.
+    """
+    flat = synthetic_frame(50, seed=0, volatility=1e-9)
+    moving = synthetic_frame(50, seed=1, volatility=1e-2)
+    universe = Universe.from_frames({"FLAT": flat, "MOVING": moving})
+
+    long_entries = np.zeros(universe.close.shape, dtype=bool)
+    long_entries[10, 0] = True
+    result = backtest_portfolio(universe, long_entries, np.zeros_like(long_entries))
+
+    assert len(result.trades) == 0
+    assert result.summary["Return [%]"] == 0
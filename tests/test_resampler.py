@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.metatrader.bar_store import BarStore
+from src.metatrader.resampler import TIMEFRAME_MN1, TIMEFRAME_W1, Resampler, bar_open_times
+from src.synthetic import synthetic_rates
+
+TIMEFRAME_M5 = 5
+TIMEFRAME_H1 = 0x4001
+TIMEFRAME_H4 = 0x4004
+TIMEFRAME_D1 = 0x4018
+
+
+@pytest.fixture
+def m1():
+    """
+    Fixture with 40 days of M1 bars starting mid-session on a Wednesday, with a gap.
+    """
+    rates = synthetic_rates(40 * 1440, seed=5, start=1_704_283_500)
+    return np.delete(rates, np.s_[3000:4500])
+
+
+@pytest.mark.parametrize("timeframe, rule", [(TIMEFRAME_M5, "5min"), (TIMEFRAME_H1, "1h"), (TIMEFRAME_H4, "4h"),
+                                             (TIMEFRAME_D1, "1D"), (TIMEFRAME_MN1, "MS")])
+def test_matches_pandas_resample(m1, timeframe, rule):
+    frame = pd.DataFrame({name: m1[name] for name in ("open", "high", "low", "close", "tick_volume")},
+                         index=pd.to_datetime(m1["time"], unit="s"))
+    expected = frame.resample(rule).agg({"open": "first", "high": "max", "low": "min", "close": "last",
+                                         "tick_volume": "sum"}).dropna()
+
+    bars = Resampler(m1).rates(timeframe)
+    np.testing.assert_array_equal(pd.to_datetime(bars["time"], unit="s"), expected.index)
+    for name in expected.columns:
+        np.testing.assert_array_equal(bars[name], expected[name].to_numpy(dtype=bars[name].dtype))
+
+
+def test_weeks_start_on_sunday():
+    # Wednesday 2024-01-03 12:00, Sunday 2024-01-07 00:00 and Saturday 2024-01-13 23:59 UTC
+    opens = bar_open_times(np.array([1_704_283_200, 1_704_585_600, 1_705_190_340]), TIMEFRAME_W1)
+    assert list(pd.to_datetime(opens, unit="s").strftime("%a %Y-%m-%d %H:%M")) == [
+        "Sun 2023-12-31 00:00", "Sun 2024-01-07 00:00", "Sun 2024-01-07 00:00"]
+
+    # Bars stored in UTC for a UTC+2 server start at 22:00 UTC
+    assert bar_open_times(np.array([1_704_283_200]), TIMEFRAME_D1, session_offset=7200)[0] % 86400 == 22 * 3600
+
+
+def test_incremental_append_matches_full_resample(m1):
+    resampler = Resampler(m1[:1000])
+    resampler.rates(TIMEFRAME_H4)
+    resampler.rates(TIMEFRAME_M5)
+    for start in range(1000, len(m1), 997):
+        resampler.append(m1[start:start + 997])
+    assert resampler.append(m1[-10:]) == 0
+
+    for timeframe in (TIMEFRAME_H4, TIMEFRAME_M5):
+        np.testing.assert_array_equal(resampler.rates(timeframe), Resampler(m1).rates(timeframe))
+
+
+def test_from_store(tmp_path, m1):
+    store = BarStore(tmp_path)
+    store.append("USDCAD", 1, m1)
+    h1 = Resampler.from_store(store, "USDCAD").frame(TIMEFRAME_H1)
+    np.testing.assert_array_equal(h1["High"].to_numpy(), Resampler(m1).rates(TIMEFRAME_H1)["high"])
+    assert list(h1.columns) == ["Open", "High", "Low", "Close", "Volume"]
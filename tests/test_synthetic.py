@@ -0,0 +1,24 @@
+import numpy as np
+
+from src.synthetic import synthetic_frame, synthetic_rates, synthetic_ticks
+
+
+def test_rates_are_reproducible_and_consistent():
+    rates = synthetic_rates(5_000, seed=1)
+    np.testing.assert_array_equal(rates, synthetic_rates(5_000, seed=1))
+    assert not np.array_equal(rates["close"], synthetic_rates(5_000, seed=2)["close"])
+
+    assert (rates["high"] >= np.maximum(rates["open"], rates["close"])).all()
+    assert (rates["low"] <= np.minimum(rates["open"], rates["close"])).all()
+    assert (np.diff(rates["time"]) == 60).all()
+
+    frame = synthetic_frame(100, seed=1)
+    assert list(frame.columns) == ["Open", "High", "Low", "Close", "Volume"]
+    np.testing.assert_array_equal(frame["Close"], rates["close"][:100])
+
+
+def test_ticks_are_ordered_quotes():
+    ticks = synthetic_ticks(10_000, seed=1)
+    assert (np.diff(ticks["time_msc"]) >= 0).all()
+    assert (ticks["ask"] > ticks["bid"]).all()
+    np.testing.assert_array_equal(ticks["time"], ticks["time_msc"] // 1000)
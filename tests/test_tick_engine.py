@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from src.backtest.tick_engine import BUY, SELL, M1RsiCrossSignal, PositionBook, run_tick_backtest
+from src.synthetic import synthetic_ticks
+
+
+def brute_force(ticks, entries, directions, sl_distance, tp_distance):
+    """
+    Reference implementation walking tick by tick over every position.
+    """
+    trades = []
+    for idx, direction in zip(entries, directions):
+        is_long = direction == BUY
+        price = ticks["ask"][idx] if is_long else ticks["bid"][idx]
+        sl = price - sl_distance if is_long else price + sl_distance
+        tp = price + tp_distance if is_long else price - tp_distance
+        for j in range(idx + 1, len(ticks)):
+            quote = ticks["bid"][j] if is_long else ticks["ask"][j]
+            if (quote <= sl or quote >= tp) if is_long else (quote >= sl or quote <= tp):
+                trades.append((j, idx, quote))
+                break
+    return sorted(trades)
+
+
+@pytest.mark.parametrize("chunk_size", [97, 1_000, 1 << 20])
+def test_matches_brute_force_across_chunks(chunk_size):
+    """
+    Test that positions carried over chunk boundaries close on the same tick and price as a tick-by-tick scan.
+    """
+    ticks = synthetic_ticks(5_000, seed=4)
+    rng = np.random.default_rng(4)
+    entries = np.sort(rng.choice(len(ticks), 300, replace=False))
+    directions = rng.integers(0, 2, len(entries)).astype(np.int8)
+
+    def signal(chunk, state={"offset": 0}):
+        lo, hi = state["offset"], state["offset"] + len(chunk)
+        state["offset"] = hi
+        selected = (entries >= lo) & (entries < hi)
+        return entries[selected] - lo, directions[selected]
+
+    result = run_tick_backtest(ticks, signal, sl_distance=0.0002, tp_distance=0.0003, chunk_size=chunk_size,
+                               capacity=4)
+    expected = brute_force(ticks, entries, directions, 0.0002, 0.0003)
+
+    trades = result.trades
+    actual = sorted(zip(trades.exit_idx.tolist(), trades.entry_idx.tolist(), trades.exit_price.tolist()))
+    assert actual == expected
+    assert result.open_positions == len(entries) - len(expected)
+
+
+def test_position_book_reuses_slots():
+    book = PositionBook(capacity=2)
+    ones = np.ones(3)
+    slots = book.open(np.array([BUY, SELL, BUY]), np.arange(3), ones, ones, ones, ones)
+    assert book.capacity >= 3 and len(book) == 3
+
+    book.close(slots[:2])
+    reused = book.open(np.array([SELL]), np.array([5]), ones[:1], ones[:1], ones[:1], ones[:1])
+    assert reused[0] in slots[:2]
+    assert sorted(book.open_slots()) == sorted([slots[2], reused[0]])
+
+
+def test_rsi_signal_state_is_carried_across_chunks():
+    ticks = synthetic_ticks(200_000, seed=2)
+    whole = run_tick_backtest(ticks, M1RsiCrossSignal(10, 30, 70), 0.0005, 0.0005)
+    chunked = run_tick_backtest(ticks, M1RsiCrossSignal(10, 30, 70), 0.0005, 0.0005, chunk_size=7_919)
+    assert len(whole.trades.entry_idx) > 0
+    np.testing.assert_array_equal(np.sort(whole.trades.entry_idx), np.sort(chunked.trades.entry_idx))
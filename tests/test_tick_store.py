@@ -0,0 +1,167 @@
+import time
+from datetime import datetime, timezone
+
+import MetaTrader5 as mt5
+import numpy as np
+import pytest
+
+from src.metatrader.bar_store import to_epoch
+from src.metatrader.mt5_connection import MT5Connection
+from src.metatrader.tick_store import _HEADER, TICK_DTYPE, TickStore, decode_block, encode_block
+from src.synthetic import synthetic_ticks
+
+POINT = 1e-5
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TickStore(tmp_path, block_size=10_000)
+
+
+def test_block_round_trip_is_lossless():
+    """
+    Test that encoding and decoding a block gives back the exact ticks, including trade fields.
+    """
+    ticks = synthetic_ticks(5_000, seed=3)
+    ticks["last"] = ticks["bid"]
+    ticks["volume"] = np.arange(len(ticks)) % 7
+    ticks["volume_real"] = ticks["volume"] * 0.5
+    ticks["flags"][::3] = 2
+
+    block = encode_block(ticks, POINT)
+    header = _HEADER.unpack_from(block)
+    decoded = decode_block(header, block[_HEADER.size:])
+
+    assert decoded.dtype == TICK_DTYPE
+    np.testing.assert_array_equal(decoded, ticks)
+
+
+def test_int64_columns_decode_on_every_platform():
+    """
+    Test that 64-bit columns are written with a fixed-width code and that blocks carrying numpy's "l" code,
+    as written on Linux, decode as 8-byte integers rather than the platform's C long.
+    """
+    ticks = synthetic_ticks(100, seed=4)
+    ticks["time_msc"][50:] += 1 << 33
+    ticks["time"] = ticks["time_msc"] // 1000
+    ticks["volume"][0] = 1 << 40
+    ticks["bid"][50:] = np.round(ticks["bid"][50:] + 30_000, 5)
+    ticks["ask"][50:] = np.round(ticks["ask"][50:] + 30_000, 5)
+
+    block = encode_block(ticks, POINT)
+    header = _HEADER.unpack_from(block)
+    assert header[-1][:2] == b"Qq" and header[-1][4:5] == b"Q"
+    np.testing.assert_array_equal(decode_block(header, block[_HEADER.size:]), ticks)
+
+    legacy = header[:-1] + (header[-1].replace(b"Q", b"L").replace(b"q", b"l"),)
+    np.testing.assert_array_equal(decode_block(legacy, block[_HEADER.size:]), ticks)
+
+
+def test_append_and_read_across_days(store):
+    """
+    Test that ticks spanning several days are split into day files and read back, whole and by range.
+    """
+    ticks = synthetic_ticks(100_000, seed=1, mean_interval_ms=5_000)
+    assert store.append("EURUSD", ticks, POINT) == len(ticks)
+    assert len(store.days("EURUSD")) > 1
+
+    np.testing.assert_array_equal(store.read("EURUSD"), ticks)
+
+    start, end = int(ticks["time"][20_000]), int(ticks["time"][60_000])
+    window = store.read("EURUSD", start, datetime.fromtimestamp(end, timezone.utc))
+    expected = ticks[(ticks["time"] >= start) & (ticks["time"] <= end)]
+    np.testing.assert_array_equal(window, expected)
+
+
+def test_append_skips_stored_ticks(store):
+    """
+    Test that overlapping appends only add the ticks not stored yet, including ticks sharing a millisecond.
+    """
+    ticks = synthetic_ticks(1_000, seed=2)
+    ticks["time_msc"][500:503] = ticks["time_msc"][499]
+    ticks["time"] = ticks["time_msc"] // 1000
+
+    assert store.append("EURUSD", ticks[:501], POINT) == 501
+    assert store.append("EURUSD", ticks[400:], POINT) == 499
+    assert store.append("EURUSD", ticks, POINT) == 0
+
+    np.testing.assert_array_equal(store.read("EURUSD"), ticks)
+
+
+def test_append_merges_backfilled_ticks(store):
+    """
+    Test that ticks older than the newest stored tick of their day are merged in rather than dropped.
+    """
+    ticks = synthetic_ticks(1_000, seed=3)
+
+    assert store.append("EURUSD", ticks[500:], POINT) == 500
+    assert store.append("EURUSD", ticks[:600], POINT) == 500
+    assert store.append("EURUSD", ticks[200:700], POINT) == 0
+
+    np.testing.assert_array_equal(store.read("EURUSD"), ticks)
+
+
+def test_interrupted_append_keeps_the_day_file(store, mocker):
+    """
+    Test that a day file is only replaced once the new one is completely written.
+    """
+    ticks = synthetic_ticks(1_000, seed=4)
+    store.append("EURUSD", ticks[:500], POINT)
+    path, = store.days("EURUSD")
+    before = path.read_bytes()
+
+    mocker.patch("os.replace", side_effect=OSError("disk full"))
+    with pytest.raises(OSError):
+        store.append("EURUSD", ticks[500:], POINT)
+
+    assert path.read_bytes() == before
+    np.testing.assert_array_equal(store.read("EURUSD"), ticks[:500])
+
+
+def test_compression_ratio(store):
+    """
+    Test that quote ticks take a fraction of their raw size on disk.
+    """
+    ticks = synthetic_ticks(200_000, seed=4)
+    store.append("EURUSD", ticks, POINT)
+
+    assert ticks.nbytes / store.size("EURUSD") > 10
+
+
+def test_scan_throughput(store):
+    """
+    Test that the store scans millions of ticks per second.
+    """
+    ticks = synthetic_ticks(500_000, seed=5, mean_interval_ms=50)
+    store = TickStore(store.root)
+    store.append("EURUSD", ticks, POINT)
+
+    started = time.perf_counter()
+    scanned = sum(len(block) for block in store.iter_blocks("EURUSD"))
+    elapsed = time.perf_counter() - started
+
+    assert scanned == len(ticks)
+    assert scanned / elapsed > 2_000_000
+
+
+def test_download_ticks_range_stores_every_day(tmp_path, mocker):
+    """
+    Test that a tick download is requested one day at a time and lands in the tick store.
+    """
+    ticks = synthetic_ticks(50_000, seed=6, mean_interval_ms=5_000)
+
+    def copy_ticks_range(symbol, date_from, date_to, flags):
+        times = ticks["time_msc"]
+        return ticks[(times >= to_epoch(date_from) * 1000) & (times <= date_to.timestamp() * 1000)]
+
+    mocker.patch.object(mt5, "symbol_info", create=True, return_value=mocker.Mock(point=POINT))
+    mocker.patch.object(mt5, "COPY_TICKS_ALL", -1, create=True)
+    fetch = mocker.patch.object(mt5, "copy_ticks_range", create=True, side_effect=copy_ticks_range)
+
+    date_from = datetime.fromtimestamp(int(ticks["time"][0]), timezone.utc)
+    date_to = datetime.fromtimestamp(int(ticks["time"][-1]) + 1, timezone.utc)
+    connection = MT5Connection(0, "", "")
+    assert connection.download_ticks_range(tmp_path, "EURUSD", date_from, date_to) == len(ticks)
+    assert fetch.call_count == len(TickStore(tmp_path).days("EURUSD"))
+
+    np.testing.assert_array_equal(TickStore(tmp_path).read("EURUSD"), ticks)
@@ -0,0 +1,50 @@
+import numpy as np
+
+from src.backtest.fills import LOSS, OPEN, WIN
+from src.backtest.tick_engine import TickTrades
+from src.backtest.trades import BUY, SELL, TradeBook
+
+
+def test_open_close_and_filter():
+    """
+    Test that trades are closed by id and selected by state and direction, across capacity growth.
+    """
+    book = TradeBook(capacity=2)
+    ids = book.open(np.array([BUY, SELL, BUY, SELL]), np.arange(4), 1.0, [0.9, 1.1, 0.9, 1.1], [1.1, 0.9, 1.1, 0.9])
+    last = book.open(BUY, 10, 1.0, 0.9, 1.1, volume=0.5)
+    assert list(ids) == [0, 1, 2, 3] and last == 4 and len(book) == 5
+
+    book.close(1, exit_idx=12, exit_price=0.9, outcome=WIN)
+    book.close(np.array([2, 4]), exit_idx=[13, 14], exit_price=0.9, outcome=LOSS)
+
+    assert (book.wins, book.losses) == (1, 2)
+    assert list(book.ids(state=OPEN)) == [0, 3]
+    assert list(book.ids(state=LOSS, direction=BUY)) == [2, 4]
+    assert book.records["volume"][4] == 0.5
+
+
+def test_frame_is_a_view():
+    book = TradeBook()
+    book.open(np.full(3, BUY), np.arange(3), 1.0, 0.9, 1.1)
+    frame = book.to_frame()
+    book.close(0, exit_idx=5, exit_price=1.1, outcome=WIN)
+
+    assert frame.loc[0, "exit_idx"] == 5
+    assert np.shares_memory(frame["entry_price"].to_numpy(), book.records)
+
+
+def test_outcome_statistics_are_shared():
+    """
+    Test that the tick engine trades and the trade book report wins, losses and win rate the same way.
+    """
+    outcome = np.array([WIN, LOSS, OPEN, WIN], dtype=np.int8)
+    trades = TickTrades(direction=np.zeros(4, dtype=np.int8), entry_idx=np.arange(4), exit_idx=np.arange(4),
+                        entry_price=np.ones(4), exit_price=np.ones(4), volume=np.ones(4), outcome=outcome)
+    book = TradeBook()
+    ids = book.open(np.zeros(4, dtype=np.int8), np.arange(4), 1.0, 0.9, 1.1)
+    book.close(ids[[0, 3]], exit_idx=5, exit_price=1.1, outcome=WIN)
+    book.close(ids[1], exit_idx=5, exit_price=0.9, outcome=LOSS)
+
+    for container in (trades, book):
+        assert (container.wins, container.losses, container.win_rate) == (2, 1, 2 / 3)
+    assert np.isnan(TradeBook().win_rate)
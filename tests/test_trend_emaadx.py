@@ -0,0 +1,38 @@
+import numpy as np
+
+from src.backtest.strategies.trend_EMAADX import bullish_engulfing, bullish_pin_bar, rising, swing_low
+from src.synthetic import synthetic_rates
+
+
+def test_masks_match_bar_by_bar_checks():
+    """
+    Test the vectorized patterns and swing lows against the bar-by-bar checks they replace.
+    """
+    rates = synthetic_rates(2_000, seed=4, volatility=1e-3)
+    open_, high, low, close = (rates[name] for name in ("open", "high", "low", "close"))
+
+    engulfing = [i >= 1 and close[i] > open_[i - 1] > close[i - 1] > open_[i] and close[i] > open_[i]
+                 for i in range(len(close))]
+    candle_range = high - low
+    pin_bar = [i >= 1 and abs(close[i] - open_[i]) < 0.33 * candle_range[i]
+               and min(open_[i], close[i]) - low[i] > 0.5 * candle_range[i]
+               and close[i] > open_[i] and close[i] > low[i] + 0.66 * candle_range[i]
+               for i in range(len(close))]
+    swing = [np.min(low[max(0, i - 10):i + 1]) for i in range(len(low))]
+
+    np.testing.assert_array_equal(bullish_engulfing(open_, close), engulfing)
+    np.testing.assert_array_equal(bullish_pin_bar(open_, high, low, close), pin_bar)
+    np.testing.assert_array_equal(swing_low(low, 10), swing)
+    assert any(pin_bar)
+
+
+def test_rising():
+    np.testing.assert_array_equal(rising(np.array([np.nan, 1.0, 2.0, 2.0, 1.0, 3.0])),
+                                  [False, False, True, False, False, True])
+
+
+def test_bullish_engulfing():
+    # Bearish 1.2 -> 1.1, then bullish 1.05 -> 1.3 engulfing it, then bullish 1.3 -> 1.35 not engulfing
+    open_ = np.array([1.2, 1.05, 1.3])
+    close = np.array([1.1, 1.3, 1.35])
+    np.testing.assert_array_equal(bullish_engulfing(open_, close), [False, True, False])
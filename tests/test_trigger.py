@@ -0,0 +1,112 @@
+import sys
+import threading
+
+import pytest
+
+from src.fake_mt5 import FakeTerminal, install
+from src.live.trigger import BarCloseTrigger, bar_open, next_bar_open
+from src.synthetic import DEFAULT_START
+
+TIMEFRAME_M1 = 1
+TIMEFRAME_M5 = 5
+TIMEFRAME_MN1 = 0xC001
+
+
+@pytest.fixture
+def fake_terminal():
+    """
+    Install a fake MetaTrader5 module over a stopped-clock terminal, and restore the previous one after the test.
+    """
+    gateway = sys.modules["metatrader.gateway"]
+    previous = gateway.mt5._module, sys.modules.get("MetaTrader5")
+
+    def create(**kwargs):
+        terminal = FakeTerminal.synthetic(["EURUSD", "USDCAD"], n_bars=100, **kwargs)
+        install(terminal)
+        return terminal
+
+    yield create
+    gateway.mt5._module = previous[0]
+    sys.modules["MetaTrader5"] = previous[1]
+
+
+def test_fires_once_per_close_and_reports_missed_bars(fake_terminal):
+    terminal = fake_terminal(speed=None, start=DEFAULT_START + 30)
+    events = []
+    trigger = BarCloseTrigger([("EURUSD", TIMEFRAME_M1), ("USDCAD", TIMEFRAME_M5)], events.append,
+                              clock=terminal.now)
+
+    assert trigger.poll() == []  # the bars in progress are learnt from the first ticks
+    terminal.advance(29)
+    assert trigger.poll() == []
+
+    terminal.advance(1)
+    (event,) = trigger.poll()
+    assert (event.symbol, event.bar_time, event.missed, event.delay) == ("EURUSD", DEFAULT_START, 0, 0.0)
+    assert trigger.poll() == []
+
+    # A stall over three closes
+    terminal.advance(3 * 60 + 5)
+    (event,) = trigger.poll()
+    assert (event.bar_time, event.missed, event.delay) == (DEFAULT_START + 3 * 60, 2, 5.0)
+
+    terminal.advance(60)
+    assert [(e.symbol, e.timeframe, e.bar_time) for e in trigger.poll()] == [
+        ("EURUSD", TIMEFRAME_M1, DEFAULT_START + 4 * 60), ("USDCAD", TIMEFRAME_M5, DEFAULT_START)]
+    assert events[-1].symbol == "USDCAD"
+
+
+def test_closed_market_is_not_missed(caplog):
+    """
+    Test that bars without ticks while the symbol was polled (closed market) are not reported as missed, while
+    a stall over the same bars is.
+    """
+    now = [DEFAULT_START + 30.0]
+    tick = [DEFAULT_START + 30.0]
+    trigger = BarCloseTrigger([("EURUSD", TIMEFRAME_M1)], lambda event: None, clock=lambda: now[0])
+    trigger._latest_tick_time = lambda symbol: tick[0]
+
+    trigger.poll()
+    # The last tick before the close, then an hour of polls without ticks
+    tick[0] = DEFAULT_START + 50.0
+    for minute in range(1, 62):
+        now[0] = DEFAULT_START + minute * 60 + 1
+        assert trigger.poll() == []
+    now[0] = tick[0] = DEFAULT_START + 61 * 60 + 2
+    (event,) = trigger.poll()
+    assert (event.bar_time, event.missed) == (DEFAULT_START, 0)
+    assert "without an event" not in caplog.text
+
+    # No poll at all for the next three minutes
+    now[0] = tick[0] = DEFAULT_START + 64 * 60 + 2
+    (event,) = trigger.poll()
+    assert (event.bar_time, event.missed) == (DEFAULT_START + 63 * 60, 2)
+
+
+def test_detects_the_close_within_milliseconds(fake_terminal):
+    terminal = fake_terminal(speed=1.0, start=DEFAULT_START + 59.5)
+    fired = threading.Event()
+    events = []
+
+    def on_close(event):
+        events.append((event, terminal.now() - (DEFAULT_START + 60)))
+        fired.set()
+
+    trigger = BarCloseTrigger([("EURUSD", TIMEFRAME_M1)], on_close)
+    stop = threading.Event()
+    thread = threading.Thread(target=trigger.run, args=(stop,))
+    thread.start()
+    try:
+        assert fired.wait(3)
+    finally:
+        stop.set()
+        thread.join()
+    event, delay = events[0]
+    assert event.bar_time == DEFAULT_START and delay < 0.05
+
+
+def test_monthly_bars():
+    # 2024-02-15 -> February opens on 2024-02-01 and is followed by March
+    opened = bar_open(1_707_955_200, TIMEFRAME_MN1)
+    assert opened == 1_706_745_600
+    assert next_bar_open(opened, TIMEFRAME_MN1) == 1_709_251_200
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+import talib
+
+from src.backtest.vectorized import crossed_above, crossed_below, rsi
+
+
+@pytest.fixture
+def close():
+    """
+    Fixture with a seeded random-walk price series.
+    """
+    rng = np.random.default_rng(42)
+    return 1.35 + np.cumsum(rng.normal(0, 1e-4, 5_000))
+
+
+@pytest.mark.parametrize("window", [2, 10, 14])
+def test_rsi_matches_talib(close, window):
+    """
+    Test that the vectorized RSI reproduces talib.RSI, including the NaN warm-up.
+    """
+    expected = talib.RSI(close, timeperiod=window)
+    result = rsi(close, window)
+
+    np.testing.assert_array_equal(np.isnan(result), np.isnan(expected))
+    np.testing.assert_allclose(result[window:], expected[window:], atol=1e-9)
+
+
+def test_rsi_two_dimensional(close):
+    """
+    Test that each column of a 2-D input is computed independently.
+    """
+    matrix = np.column_stack((close, close[::-1]))
+    result = rsi(matrix, 14)
+
+    np.testing.assert_allclose(result[14:, 0], talib.RSI(close, 14)[14:], atol=1e-9)
+    np.testing.assert_allclose(result[14:, 1], talib.RSI(close[::-1].copy(), 14)[14:], atol=1e-9)
+
+
+def test_crossing_masks():
+    """
+    Test that crossings are strict and flagged on the bar that completes them.
+    """
+    series = np.array([25.0, 35.0, 30.0, 28.0, 31.0, 29.0])
+
+    np.testing.assert_array_equal(crossed_above(series, 30), [False, True, False, False, True, False])
+    np.testing.assert_array_equal(crossed_below(series, 30), [False, False, False, False, False, True])
+
+
+def test_compact_prices_keep_rsi_signals():
+    """
+    Test that float32 (compact) quotes give the same RSI crossings as float64 ones, and that RsiOscillator
+    runs on them; fills at float32 prices may resolve a rare stop differently, so trades are compared loosely.
+    """
+    from backtesting import Backtest
+
+    from src.backtest.strategies import RsiOscillator
+    from src.synthetic import synthetic_frame
+
+    full = synthetic_frame(20_000, seed=3)
+    compact = synthetic_frame(20_000, seed=3, compact=True)
+
+    full_rsi = rsi(full["Close"].to_numpy(), 10)
+    compact_rsi = rsi(compact["Close"].to_numpy(), 10)
+    np.testing.assert_array_equal(crossed_above(compact_rsi, 30), crossed_above(full_rsi, 30))
+    np.testing.assert_array_equal(crossed_below(compact_rsi, 70), crossed_below(full_rsi, 70))
+
+    full_trades = Backtest(full, RsiOscillator, cash=10_000).run()["_trades"]
+    compact_trades = Backtest(compact, RsiOscillator, cash=10_000).run()["_trades"]
+    shared = np.intersect1d(compact_trades["EntryBar"], full_trades["EntryBar"])
+    assert len(shared) >= 0.99 * len(full_trades)
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from src.backtest.strategies import RsiOscillator
+from src.backtest.walk_forward import Fold, walk_forward, walk_forward_folds
+from src.synthetic import synthetic_frame
+
+
+def test_folds_tile_the_data():
+    """
+    Test that test windows directly follow their training window and tile the data after it.
+    """
+    rolling = walk_forward_folds(100, train_bars=40, test_bars=25)
+    assert rolling == [Fold(0, 40, 40, 65), Fold(25, 65, 65, 90), Fold(50, 90, 90, 100)]
+
+    anchored = walk_forward_folds(100, train_bars=40, test_bars=25, anchored=True)
+    assert [fold.train_start for fold in anchored] == [0, 0, 0]
+    assert [fold.test_start for fold in anchored] == [40, 65, 90]
+    assert walk_forward_folds(30, train_bars=40, test_bars=25) == []
+
+
+def test_walk_forward_chains_out_of_sample_equity():
+    data = synthetic_frame(3_000, seed=1)
+    result = walk_forward(data, RsiOscillator, dict(upper_bound=[60, 70], lower_bound=[30]), train_bars=1_000,
+                          test_bars=1_000, max_workers=1)
+
+    assert len(result.folds) == 2 and result.summary["Folds"] == 2
+    assert set(result.folds["upper_bound"]) <= {60, 70}
+    assert result.equity.index[0] == data.index[1_000] and result.equity.index[-1] == data.index[-1]
+    total = np.prod(1 + result.folds["Return [%]"] / 100)
+    assert np.isclose(result.summary["Return [%]"], (total - 1) * 100)
+
+
+def test_walk_forward_keeps_compact_dtypes():
+    """
+    Test that compact data reaches the fold workers as float32 rather than upcast to float64, and that mapping
+    it leaves the backtesting globals of this process alone.
+    """
+    import backtesting
+
+    from src.backtest import walk_forward as module
+
+    patched = backtesting.Pool, backtesting.backtesting._tqdm
+    data = synthetic_frame(500, seed=2, compact=True)
+    shm, layout = module._publish(data)
+    try:
+        module._map(shm.name, len(data), layout)
+        window = module._window(100, 200)
+        assert window["Close"].dtype == np.float32 and window["Volume"].dtype == np.int32
+        assert (window.index == data.index[100:200]).all()
+        np.testing.assert_array_equal(window["Close"], data["Close"].iloc[100:200])
+        assert (backtesting.Pool, backtesting.backtesting._tqdm) == patched
+        with pytest.raises(RuntimeError):
+            module._init_worker(shm.name, len(data), layout)
+    finally:
+        module._worker_data[0].close()
+        module._worker_data = None
+        shm.close()
+        shm.unlink()